@@ -0,0 +1,47 @@
+"""
+Intrepid Python SDK benchmark:
+
+- EpisodeRunner throughput against 1..N stand-in simulators, each episode
+  spawning a vehicle and stepping it in lockstep
+
+Usage: python benchmarks/bench_episodes.py [--episodes 64] [--instances 1 2 4 8] [--steps 20] [--rpc-latency 0.002]
+"""
+
+import argparse
+import asyncio
+import time
+
+from intrepid_python_sdk.simulator import EpisodeRunner, Position, Rotation, StandInPool
+
+
+async def episode(sim, steps):
+    vehicle = await sim.spawn_uav(1, Position(0, 0, 0), Rotation(0, 0, 0))
+    for _ in range(steps):
+        await sim.step()
+        await vehicle.local_position()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=64)
+    parser.add_argument("--instances", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--rpc-latency", type=float, default=0.002, help="stand-in latency per RPC (seconds)")
+    args = parser.parse_args()
+
+    print(f"{'INSTANCES':<12}{'EPISODES/S':>14}{'SPEEDUP':>10}")
+    baseline = None
+    for count in args.instances:
+        async with StandInPool(count, rpc_latency=args.rpc_latency) as endpoints:
+            runner = EpisodeRunner(endpoints, episode, simulator_kwargs={"lockstep": True})
+            start = time.perf_counter()
+            results = await runner.run([args.steps] * args.episodes)
+            elapsed = time.perf_counter() - start
+        assert all(result.ok() for result in results)
+        rate = args.episodes / elapsed
+        baseline = baseline or rate
+        print(f"{count:<12}{rate:>14.1f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
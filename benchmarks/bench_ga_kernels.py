@@ -0,0 +1,88 @@
+"""
+Intrepid Python SDK benchmark:
+
+- Geometric algebra kernels (intrepid_python_sdk.ga) over 1M rotors/vectors
+- Compared with a scalar Python loop over Rotor3/Vec3 models (run on a
+  subset and reported per element)
+
+Usage: python benchmarks/bench_ga_kernels.py [--count 1000000] [--scalar 20000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from intrepid_python_sdk import ga
+from intrepid_python_sdk.intrepid_types import Rotor3, Vec3
+
+
+def scalar_mul(a: Rotor3, b: Rotor3) -> Rotor3:
+    return Rotor3(
+        s=a.s * b.s - a.yz * b.yz - a.zx * b.zx - a.xy * b.xy,
+        yz=a.s * b.yz + b.s * a.yz - (a.zx * b.xy - a.xy * b.zx),
+        zx=a.s * b.zx + b.s * a.zx - (a.xy * b.yz - a.yz * b.xy),
+        xy=a.s * b.xy + b.s * a.xy - (a.yz * b.zx - a.zx * b.yz),
+    )
+
+
+def scalar_rotate(r: Rotor3, v: Vec3) -> Vec3:
+    tx = 2.0 * (v.y * r.xy - v.z * r.zx)
+    ty = 2.0 * (v.z * r.yz - v.x * r.xy)
+    tz = 2.0 * (v.x * r.zx - v.y * r.yz)
+    return Vec3(
+        x=v.x + r.s * tx - (r.zx * tz - r.xy * ty),
+        y=v.y + r.s * ty - (r.xy * tx - r.yz * tz),
+        z=v.z + r.s * tz - (r.yz * ty - r.zx * tx),
+    )
+
+
+def measure(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--scalar", type=int, default=20_000, help="elements of the scalar reference run")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    a = ga.normalize(rng.normal(size=(args.count, 4)))
+    b = ga.normalize(rng.normal(size=(args.count, 4)))
+    vectors = rng.normal(size=(args.count, 3))
+    bivectors = rng.normal(size=(args.count, 3))
+    euler = ga.rotor_to_euler(a)
+
+    kernels = {
+        "rotor_mul": lambda: ga.rotor_mul(a, b),
+        "rotate": lambda: ga.rotate(a, vectors),
+        "rotor_from_bivector": lambda: ga.rotor_from_bivector(bivectors),
+        "rotor_to_euler": lambda: ga.rotor_to_euler(a),
+        "rotor_from_euler": lambda: ga.rotor_from_euler(euler[:, 0], euler[:, 1], euler[:, 2]),
+        "rotor_to_quaternion": lambda: ga.rotor_to_quaternion(a),
+        "slerp": lambda: ga.slerp(a, b, 0.25),
+    }
+
+    print(f"{'KERNEL':<22}{'TOTAL (ms)':>12}{'PER ELEM (ns)':>16}")
+    for name, kernel in kernels.items():
+        elapsed = measure(kernel)
+        print(f"{name:<22}{elapsed * 1e3:>12.1f}{elapsed / args.count * 1e9:>16.1f}")
+
+    n = min(args.scalar, args.count)
+    rotors_a = [Rotor3(s=s, yz=yz, zx=zx, xy=xy) for s, yz, zx, xy in a[:n].tolist()]
+    rotors_b = [Rotor3(s=s, yz=yz, zx=zx, xy=xy) for s, yz, zx, xy in b[:n].tolist()]
+    points = [Vec3(x=x, y=y, z=z) for x, y, z in vectors[:n].tolist()]
+    print(f"\nscalar reference over {n} models")
+    for name, loop in {
+        "rotor_mul": lambda: [scalar_mul(x, y) for x, y in zip(rotors_a, rotors_b)],
+        "rotate": lambda: [scalar_rotate(x, v) for x, v in zip(rotors_a, points)],
+    }.items():
+        elapsed = measure(loop)
+        print(f"{name:<22}{elapsed / n * 1e9 * args.count / 1e6:>12.1f}{elapsed / n * 1e9:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Intrepid Python SDK benchmark:
+
+- IntrepidMessage is serialized/deserialized with CDR and with JSON
+- Payloads: scalar, nested map, float array
+
+Usage: python benchmarks/bench_message_codec.py [--repeat 2000]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from intrepid_python_sdk.intrepid_types import Vec3
+from intrepid_python_sdk.message import IntrepidMessage, Opcode
+
+
+def measure(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = {
+        "scalar": 42.0,
+        "map": {"target": Vec3(x=1, y=2, z=3), "mode": "hover", "armed": True, "ids": list(range(16))},
+        "float[10k]": [float(i) for i in range(10_000)],
+    }
+
+    print(f"{'PAYLOAD':<12}{'CODEC':<6}{'BYTES':>10}{'ENCODE (us)':>14}{'DECODE (us)':>14}")
+    for name, payload in payloads.items():
+        message = IntrepidMessage(Opcode.WRITE, payload, datetime.now(), "node/out", priority=1)
+        repeat = args.repeat if name != "float[10k]" else max(1, args.repeat // 20)
+        for codec, cdr in (("cdr", True), ("json", False)):
+            data = message.serialize(cdr=cdr)
+            encode = measure(lambda: message.serialize(cdr=cdr), repeat)
+            decode = measure(lambda: IntrepidMessage.deserialize(data, cdr=cdr), repeat)
+            print(f"{name:<12}{codec:<6}{len(data):>10}{encode:>14.1f}{decode:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
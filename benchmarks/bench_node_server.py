@@ -0,0 +1,143 @@
+"""
+Intrepid Python SDK benchmark:
+
+- Node server is started in a child process with the selected event loop
+- Client sends exec frames over one websocket connection
+- Latency is measured one frame at a time, throughput with pipelined frames
+
+Usage: python benchmarks/bench_node_server.py [--loops asyncio uvloop] [--frames 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+
+import aiohttp
+
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.intrepid_types import Vec3
+
+HOST = "127.0.0.1"
+
+
+def serve(port: int, loop: str):
+    service_handler = Intrepid()
+
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    def offset(points: list[Vec3], dz: float) -> list[Vec3]:
+        return [Vec3(x=p.x, y=p.y, z=p.z + dz) for p in points]
+
+    service_handler.register_node(add, name="bench/add")
+    service_handler.register_node(offset, name="bench/offset")
+    service_handler.start(HOST, port, loop=loop)
+
+
+def init_message(node: int, node_type: str, num_inputs: int) -> str:
+    return json.dumps({
+        "id": node,
+        "node": node,
+        "init": {
+            "node_id": f"bench{node}",
+            "node_type": node_type,
+            "exec_inputs": [{"label": "", "exec_id": 0}],
+            "exec_outputs": [{"label": "", "exec_id": 0}],
+            "data_inputs": [{"label": f"in{i}", "type": "any"} for i in range(num_inputs)],
+            "data_outputs": [{"label": "out", "type": "any"}],
+        },
+    })
+
+
+def exec_message(id: int, node: int, inputs: list) -> str:
+    return json.dumps({"id": id, "node": node, "exec": {"exec_id": id, "time": 0, "inputs": inputs}})
+
+
+async def run_client(port: int, frames: int, inputs: list, node_type: str, window: int) -> dict:
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                ws = await session.ws_connect(f"http://{HOST}:{port}/")
+                break
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.1)
+        else:
+            raise RuntimeError("node server did not start")
+
+        await ws.send_str(init_message(1, node_type, len(inputs)))
+        await ws.receive()
+
+        # Latency: one frame in flight
+        latencies = []
+        for i in range(frames // 10):
+            start = time.perf_counter()
+            await ws.send_str(exec_message(i, 1, inputs))
+            await ws.receive()
+            latencies.append(time.perf_counter() - start)
+
+        # Throughput: `window` frames in flight
+        start = time.perf_counter()
+        sent = received = 0
+        while received < frames:
+            while sent < frames and sent - received < window:
+                await ws.send_str(exec_message(sent, 1, inputs))
+                sent += 1
+            await ws.receive()
+            received += 1
+        elapsed = time.perf_counter() - start
+        await ws.close()
+
+    latencies.sort()
+    return {
+        "throughput": frames / elapsed,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def bench(loop: str, port: int, args) -> list:
+    server = multiprocessing.Process(target=serve, args=(port, loop), daemon=True)
+    server.start()
+    try:
+        results = []
+        cases = [
+            ("scalar", "bench/add", [1, 2]),
+            ("vec3[64]", "bench/offset", [[{"x": i, "y": i, "z": i} for i in range(64)], 1.0]),
+        ]
+        for name, node_type, inputs in cases:
+            result = asyncio.run(run_client(port, args.frames, inputs, node_type, args.window))
+            results.append((loop, name, result))
+        return results
+    finally:
+        server.terminate()
+        server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loops", nargs="+", default=["asyncio", "uvloop"])
+    parser.add_argument("--frames", type=int, default=20_000)
+    parser.add_argument("--window", type=int, default=32)
+    parser.add_argument("--port", type=int, default=9990)
+    args = parser.parse_args()
+
+    rows = []
+    for i, loop in enumerate(args.loops):
+        if loop == "uvloop":
+            try:
+                import uvloop  # noqa: F401
+            except ImportError:
+                print("uvloop is not installed, skipping")
+                continue
+        rows += bench(loop, args.port + i, args)
+
+    print(f"{'LOOP':<10}{'CASE':<12}{'FRAMES/S':>12}{'P50 (us)':>12}{'P99 (us)':>12}")
+    for loop, name, result in rows:
+        print(f"{loop:<10}{name:<12}{result['throughput']:>12.0f}{result['p50_us']:>12.1f}{result['p99_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Intrepid Python SDK benchmark:
+
+- Lockstep stepping throughput (Simulator.step) against the stand-in simulator
+- Same loop reading the state of every vehicle after each step
+- Free running sync loop (on_tick callback) for comparison
+
+Reports steps per second and the simulated time per wall clock second
+(real-time factor).
+
+Usage: python benchmarks/bench_step.py [--steps 2000] [--vehicles 50] [--step-ms 10] [--rpc-latency 0]
+"""
+
+import argparse
+import asyncio
+import time
+
+from intrepid_python_sdk.simulator import Simulator, SpawnSpec, StandInSimulator
+
+
+def report(name: str, steps: int, elapsed: float, step_ms: int):
+    print(f"{name:<28}{steps / elapsed:>14.0f}{steps * step_ms / 1e3 / elapsed:>14.1f}")
+
+
+async def bench_step(stand_in: StandInSimulator, args, read_states: bool):
+    sim = Simulator(stand_in.host, stand_in.port, step_duration=args.step_ms, lockstep=True)
+    await sim.connect()
+    vehicles = await sim.spawn_many([SpawnSpec.uav(i, [i, 0, 0]) for i in range(args.vehicles)])
+    await sim.step()
+
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        await sim.step()
+        if read_states:
+            await sim.get_states(vehicles, as_arrays=True)
+    elapsed = time.perf_counter() - start
+
+    await sim.disconnect()
+    return elapsed
+
+
+async def bench_sync_loop(stand_in: StandInSimulator, args):
+    sim = Simulator(stand_in.host, stand_in.port, step_duration=args.step_ms)
+    done = asyncio.Event()
+    count = 0
+
+    async def on_tick(sim):
+        nonlocal count
+        count += 1
+        if count == args.steps:
+            done.set()
+
+    sim.sync(on_tick)
+    start = time.perf_counter()
+    await sim.connect()
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    sim.set_lockstep(True)
+    await sim.disconnect()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--vehicles", type=int, default=50)
+    parser.add_argument("--step-ms", type=int, default=10, help="simulated milliseconds per step")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="stand-in latency per RPC (seconds)")
+    args = parser.parse_args()
+
+    print(f"{'LOOP':<28}{'STEPS/S':>14}{'REALTIME X':>14}")
+    async with StandInSimulator(rpc_latency=args.rpc_latency) as stand_in:
+        report("step", args.steps, await bench_step(stand_in, args, read_states=False), args.step_ms)
+    async with StandInSimulator(rpc_latency=args.rpc_latency) as stand_in:
+        report(f"step + {args.vehicles} states", args.steps, await bench_step(stand_in, args, read_states=True), args.step_ms)
+    async with StandInSimulator(rpc_latency=args.rpc_latency) as stand_in:
+        report("sync loop (on_tick)", args.steps, await bench_sync_loop(stand_in, args), args.step_ms)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
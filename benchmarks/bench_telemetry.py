@@ -0,0 +1,78 @@
+"""
+Intrepid Python SDK benchmark:
+
+- Lockstep stepping (Simulator.step) reading the state of every vehicle,
+  against the stand-in simulator
+- Same loop with a TelemetryRecorder of the vehicles attached
+- Per-vehicle JSON logging of vehicle.state() for comparison
+
+Reports milliseconds per step, the recorder time (state conversion and
+buffer copy) per step and the size of the telemetry written.
+
+Usage: python benchmarks/bench_telemetry.py [--steps 2000] [--vehicles 50] [--rpc-latency 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from intrepid_python_sdk.simulator import Simulator, SpawnSpec, StandInSimulator, TelemetryRecorder, read_telemetry
+
+
+async def bench(stand_in: StandInSimulator, args, mode: str, path: str):
+    sim = Simulator(stand_in.host, stand_in.port, step_duration=10, lockstep=True)
+    await sim.connect()
+    vehicles = await sim.spawn_many([SpawnSpec.uav(i, [i, 0, 0]) for i in range(args.vehicles)])
+    await sim.step()
+
+    recorder = None
+    log = None
+    if mode == "recorder":
+        recorder = TelemetryRecorder(path, vehicles)
+        sim.add_recorder(recorder)
+    elif mode == "json":
+        log = open(path, "w")
+
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        tick = await sim.step()
+        if log is not None:
+            for vehicle in vehicles:
+                log.write(json.dumps({"tick": tick, "vehicle": vehicle.id(), **(await vehicle.state())}) + "\n")
+        else:
+            await sim.get_states(vehicles)
+    elapsed = time.perf_counter() - start
+
+    await sim.disconnect()
+    if recorder is not None:
+        recorder.close()
+        assert len(read_telemetry(path)) == args.steps
+        return elapsed, recorder.record_seconds
+    if log is not None:
+        log.close()
+    return elapsed, 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--vehicles", type=int, default=50)
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="stand-in latency per RPC (seconds)")
+    args = parser.parse_args()
+
+    print(f"{'LOOP':<28}{'MS/STEP':>12}{'RECORD MS':>12}{'RECORD %':>12}{'FILE KB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("states", "recorder", "json"):
+            path = os.path.join(tmp, f"{mode}.out")
+            async with StandInSimulator(rpc_latency=args.rpc_latency) as stand_in:
+                elapsed, recording = await bench(stand_in, args, mode, path)
+            size = os.path.getsize(path) / 1024 if os.path.exists(path) else 0.0
+            print(f"{mode:<28}{elapsed / args.steps * 1e3:>12.3f}{recording / args.steps * 1e3:>12.3f}"
+                  f"{recording / elapsed * 100:>12.1f}{size:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,31 +1,27 @@
 import asyncio
-from intrepid_python_sdk.simulator import Simulator, ObstacleType, Position, Rotation
+from intrepid_python_sdk.simulator import Simulator, ObstacleType, Position, Rotation, SpawnSpec
 
 
 async def main():
     sim = Simulator()
     await sim.connect()
 
+    specs = []
     for i in range(10):
         src_x = 10 + i*10
         dst_x = src_x + 10
 
-        # Spawn UGV
-        position = Position(i+3, 1, 0)
-        rotation = Rotation(0,0,0)
-        ugv_vehicle = await sim.spawn_ugv(i, position, rotation)
-        print(ugv_vehicle)
-
-        # Spawn road segment
-        position_src = Position(src_x, 5, 0)
-        position_dst = Position(dst_x, 5, 0)
-        await sim.spawn_road(position_src, position_dst)
-
-        # Spawn generic entity
-        position = Position(src_x, 7, 0)
-        rotation = Rotation(0,0,0)
-        tree = await sim.spawn_entity(ObstacleType.TREE1, position, rotation)
-        print(tree)
+        # UGV
+        specs.append(SpawnSpec.ugv(i, Position(i+3, 1, 0), Rotation(0,0,0)))
+        # Road segment
+        specs.append(SpawnSpec.road(Position(src_x, 5, 0), Position(dst_x, 5, 0)))
+        # Generic entity
+        specs.append(SpawnSpec.obstacle(ObstacleType.TREE1, Position(src_x, 7, 0), Rotation(0,0,0)))
+
+    # Spawn everything in a single round trip
+    for handle in await sim.spawn_many(specs):
+        if handle is not None:
+            print(handle)
 
 
 if __name__ ==  '__main__':
@@ -1,26 +1,6 @@
 import asyncio
-from intrepid_python_sdk.simulator import Simulator, Camera, AbstractSensor
-import base64
-import numpy as np
+from intrepid_python_sdk.simulator import Simulator
 import cv2
-import time
-from base64 import b64decode
-
-
-
-# with open("image.png", "wb") as f:
-#     f.write(data)
-
-
-class MySensor:
-    pass
-
-# base64 to OpenCV
-def base64_cv2(base64_str):
-  imgString = base64.b64decode(base64_str)
-  nparr = np.fromstring(imgString, np.uint8)
-  cv2_img= cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-  return cv2_img
 
 
 async def main():
@@ -34,26 +14,15 @@ async def main():
                                         rotation=[0,0,0],
                                         size=[320, 240],
                                         fov_degrees=120)
-    _ = await camera.capture()
-
-    for i in range(30):
-        imgbuf = await camera.capture()
-        header, encoded = imgbuf.split("base64,", 1)
-        data = b64decode(encoded)
-        with open(f"image{i}.png", "wb") as f:
-            f.write(data)
-
-        im = cv2.imread(f"image{i}.png", cv2.IMREAD_UNCHANGED)
-        cv2.imshow("Camera Footage", im)
-        time.sleep(0.1)
-
-    # im = cv2.imread("image20.png", cv2.IMREAD_UNCHANGED)
-    # cv2.imshow("Camera Footage", im)
-    cv2.waitKey(0)
-    cv2.destroyAllWindows()
 
-    # img = base64_cv2(imgbuf)
-    # cv2.imshow(img)
+    # Frames are decoded in a worker pool, a slow loop gets the latest frame
+    async for frame in camera.stream(rate=10.0):
+        cv2.imshow("Camera Footage", cv2.cvtColor(frame.image, cv2.COLOR_RGB2BGR))
+        cv2.waitKey(1)
+        if frame.sequence >= 30:
+            break
+
+    cv2.destroyAllWindows()
 
     # print(sensor.capture())
 
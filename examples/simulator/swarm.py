@@ -0,0 +1,43 @@
+"""
+Control a swarm of vehicles from a single process: one controller per
+vehicle, all run concurrently on every tick over one connection.
+"""
+import asyncio
+import math
+
+from intrepid_python_sdk.simulator import Simulator, Position, Rotation, SpawnSpec, Vehicle
+
+NUM_VEHICLES = 50
+RADIUS = 20.0
+
+
+def circle_controller(phase: float):
+    async def controller(vehicle: Vehicle, sim: Simulator):
+        # served from the state read once for the whole swarm
+        position = await vehicle.local_position()
+        angle = math.atan2(position.y, position.x) + 0.1
+        await vehicle.position_control(Position(RADIUS * math.cos(angle + phase), RADIUS * math.sin(angle + phase), 5.0))
+    return controller
+
+
+async def main():
+    sim = Simulator()
+    await sim.connect()
+
+    specs = []
+    for i in range(NUM_VEHICLES):
+        angle = 2 * math.pi * i / NUM_VEHICLES
+        specs.append(SpawnSpec.uav(i, Position(RADIUS * math.cos(angle), RADIUS * math.sin(angle), 0), Rotation(0, 0, 0)))
+    for spec, vehicle in zip(specs, await sim.spawn_many(specs)):
+        if vehicle is None:
+            print(f"Vehicle {spec.vehicle_id} failed to spawn")
+            continue
+        sim.add_controller(vehicle, circle_controller(0.0))
+
+    sim.set_step_duration(100)
+
+
+if __name__ ==  '__main__':
+    asyncio.ensure_future(main())
+    loop = asyncio.get_event_loop()
+    loop.run_forever()
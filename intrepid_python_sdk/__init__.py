@@ -5,9 +5,12 @@ from typing import Callable, Dict, get_args, get_origin
 from collections.abc import Iterable
 import asyncio
 import inspect
+import itertools
+import atexit
+import contextlib
 import importlib_metadata
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
 import signal
 from .config_manager import ConfigManager
 from .constants import WS_HOST, WS_PORT, TAG_STATUS, TAG_HTTP_REQUEST, \
@@ -17,7 +20,7 @@ from .constants import WS_HOST, WS_PORT, TAG_STATUS, TAG_HTTP_REQUEST, \
 from .decorators import param_types_validator
 from .errors import InitializationParamError
 from .log_manager import LogLevel
-from .utils import log, log_exception, signal_handler
+from .utils import log, log_exception, signal_handler, new_event_loop
 from .status import Status
 from .node import Node, Type, IntrepidType, DataElement
 from .qos import Qos
@@ -30,7 +33,7 @@ from .message import IntrepidMessage, Opcode, InitRequest, ExecRequest, ExecResp
 # from simulator.simulator import Simulator
 
 import aiohttp
-from aiohttp import web, WSCloseCode
+from aiohttp import web, WSCloseCode, WSMsgType
 import asyncio
 import json
 from typing import Callable, Dict, Any
@@ -49,7 +52,13 @@ from .protocol import (
     InitCommand,
     OutgoingMessage,
 )
-from .intrepid_types import TYPE_MAP, Context
+from .intrepid_types import TYPE_MAP, Context, ModelArray
+from .tracing import FrameTrace, Tracer
+from .profiling import NodeProfiler
+from .loop_monitor import LoopLagMonitor
+from .delta import decode_exec_inputs
+from .binary_codec import BUFFER_KEY, StructCodec, compile_codec, pack_frame, unpack_frame
+from .dispatcher import OutboundDispatcher
 from . import constants
 from .constants import TAG_APP_NAME
 
@@ -72,6 +81,12 @@ log_format = "%(asctime)s - %(levelname)s - %(message)s"
 logging.basicConfig(format=log_format)
 logger = logging.getLogger(__name__)  # Create a logger instance
 
+# Shared no-op context used in place of a span when a frame is not traced
+_NO_SPAN = contextlib.nullcontext()
+
+
+def _span(frame: FrameTrace | None, name: str):
+    return frame.span(name) if frame is not None else _NO_SPAN
 
 
 class Intrepid:
@@ -97,18 +112,45 @@ class Intrepid:
     __restarted = None
     __original_callback = None
 
-    def __init__(self, *, namespace: str | None = None):
+    def __init__(
+        self,
+        *,
+        namespace: str | None = None,
+        tracer: Tracer | None = None,
+        profile: str | NodeProfiler | None = None,
+        loop_monitor: LoopLagMonitor | None = None,
+        dispatcher: OutboundDispatcher | None = None,
+    ):
         """
         Initialize the Intrepid SDK.
 
         @param node_id: Unique identifier of the node managed by this handler
         @param qos: Dictionary that specifies the QoS applied to this node (Not Implemented)
+        @param tracer: Optional span tracer that records every served frame (Chrome trace format)
+        @param profile: Optional node profiler, either a NodeProfiler or its mode ("sampling" or "cprofile")
+        @param loop_monitor: Optional event loop lag monitor that reports the nodes blocking the loop
+        @param dispatcher: Outbound queue of written messages, a default OutboundDispatcher if not set
         @return:
         """
 
         self.namespace = namespace
+        self.tracer = tracer
+        if tracer is not None:
+            atexit.register(tracer.close)
+        self.__connection_ids = itertools.count(1)
+        self.profiler = NodeProfiler(profile) if isinstance(profile, str) else profile
+        self.loop_monitor = loop_monitor
+        # written messages are sent to every connected peer, in priority order
+        self.dispatcher = dispatcher or OutboundDispatcher()
+        self.dispatcher.pause()
+        self.__peers: set[web.WebSocketResponse] = set()
+        self.__dispatcher_task = None
         self.qos = None
         self.type_names = TYPE_MAP.copy() # copy built-in types
+        # packed binary codecs of fixed layout types, used for arrays on binary connections
+        self.codecs: dict[type, StructCodec] = {}
+        for ty in self.type_names:
+            self.__compile_codec(ty)
         # self.__unix_socket_path = None
         self.__node = None
         self.__node_info = None
@@ -117,6 +159,11 @@ class Intrepid:
         self.__app = None
         self.__runner = self.create_runner()
 
+    def __compile_codec(self, ty: type):
+        codec = compile_codec(ty)
+        if codec is not None:
+            self.codecs[ty] = codec
+
     def __add_namespace(self, path: str) -> str:
         if self.namespace:
             return f"{self.namespace}/{path}"
@@ -129,6 +176,8 @@ class Intrepid:
         class ActiveNode(BaseModel):
             node: Intrepid.Node
             state: Any
+            # last decoded value of every data input, reused for inputs sent as unchanged
+            inputs: list[Any] = []
 
         active_nodes: dict[int, ActiveNode] = {}
 
@@ -173,127 +222,227 @@ class Intrepid:
                 fields=fields,
             )
 
-        async for message in websocket:
-            data = message.data
-            if self.debug_mode:
-                logger.info(f"<-- {data}")
-            command = IncomingMessage.model_validate_json(data)
+        tracer = self.tracer
+        connection_id = next(self.__connection_ids)
+        if tracer is not None:
+            tracer.name_connection(connection_id, f"connection {connection_id} ({request.remote})")
 
+        async for message in websocket:
+            frame = tracer.frame(connection_id) if tracer is not None else None
             try:
-                if command.discovery:
-                    reply = OutgoingMessage(
-                        id=command.id,
-                        node=command.node,
-                        discovery_ok=Discovery(
-                            options=DiscoveryOptions(
-                                init_timeout=self.init_timeout,
-                                exec_timeout=self.exec_timeout,
-                            ),
-                            types=[to_type_spec(type_name, ty) for type_name, ty in self.all_types.items()],
-                            nodes=[self.all_nodes[node].spec for node in self.all_nodes],
-                        )
-                    )
-                elif command.init:
-                    node = self.all_nodes[command.init.node_type]
-                    if node is None:
-                        reply = OutgoingMessage(
-                            id=command.id,
-                            node=command.node,
-                            error=f"node {command.init.node_type} not found",
-                        )
-                    else:
-                        assert_spec_matches(node.spec, command.init)
-                        active_nodes[command.node or 0] = ActiveNode(node=node, state=None)
+                # binary frames carry a JSON header followed by packed array buffers
+                binary = message.type == WSMsgType.BINARY
+                buffers = []
+                data = message.data
+                if self.debug_mode:
+                    logger.info(f"<-- {data}")
+                with _span(frame, "parse"):
+                    if binary:
+                        data, buffers = unpack_frame(data)
+                    command = IncomingMessage.model_validate_json(data)
+                    if frame is not None:
+                        frame.node = command.node or 0
+                        frame.args["id"] = command.id
+
+                out_buffers = []
+                try:
+                    if command.discovery:
                         reply = OutgoingMessage(
                             id=command.id,
                             node=command.node,
-                            init_ok=Empty(),
+                            discovery_ok=Discovery(
+                                options=DiscoveryOptions(
+                                    init_timeout=self.init_timeout,
+                                    exec_timeout=self.exec_timeout,
+                                ),
+                                types=[to_type_spec(type_name, ty) for type_name, ty in self.all_types.items()],
+                                nodes=[self.all_nodes[node].spec for node in self.all_nodes],
+                            )
                         )
-                elif command.exec:
-                    active_node = active_nodes[command.node or 0]
-                    state = active_node.state
-                    func = active_node.node.func
-                    context = None
-
-                    def deserialize_single_input(data: Any, annotation: Any) -> Any:
-                        if issubclass(annotation, BaseModel):
-                            return annotation.model_validate(data)
-                        else:
-                            return data
-
-                    def deserialize_any_input(data: Any, annotation: Any) -> Any:
-                        if get_origin(annotation) is list:
-                            inner_type = get_args(annotation)[0]
-                            return [deserialize_single_input(data, inner_type) for data in data]
+                    elif command.init:
+                        node = self.all_nodes[command.init.node_type]
+                        if node is None:
+                            reply = OutgoingMessage(
+                                id=command.id,
+                                node=command.node,
+                                error=f"node {command.init.node_type} not found",
+                            )
                         else:
-                            return deserialize_single_input(data, annotation)
-
-                    inputs = []
-                    for i, ty in enumerate(active_node.node.input_types):
-                        inputs.append(deserialize_any_input(command.exec.inputs[i], ty))
-
-                    if active_node.node.first_arg_is_context:
-                        async def debug_log_callback(message: str) -> None:
-                            debug_reply = OutgoingMessage(
-                                id=0,
+                            assert_spec_matches(node.spec, command.init)
+                            active_nodes[command.node or 0] = ActiveNode(node=node, state=None)
+                            if tracer is not None:
+                                tracer.name_node(connection_id, command.node or 0, command.init.node_type)
+                            reply = OutgoingMessage(
+                                id=command.id,
                                 node=command.node,
-                                debug_message=message,
+                                init_ok=Empty(),
+                            )
+                    elif command.exec:
+                        active_node = active_nodes[command.node or 0]
+                        state = active_node.state
+                        func = active_node.node.func
+                        context = None
+                        if frame is not None:
+                            frame.args["node_type"] = active_node.node.spec.type
+                            frame.args["exec_id"] = command.exec.exec_id
+
+                        def deserialize_single_input(data: Any, annotation: Any) -> Any:
+                            if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+                                return annotation.model_validate(data)
+                            elif isinstance(annotation, type) and issubclass(annotation, ModelArray):
+                                if isinstance(data, dict) and BUFFER_KEY in data:
+                                    return annotation.from_buffer(buffers[data[BUFFER_KEY]])
+                                return annotation.from_wire(data)
+                            else:
+                                return data
+
+                        def deserialize_any_input(data: Any, annotation: Any) -> Any:
+                            if get_origin(annotation) is list:
+                                inner_type = get_args(annotation)[0]
+                                if isinstance(data, dict) and BUFFER_KEY in data:
+                                    return self.codecs[inner_type].unpack(buffers[data[BUFFER_KEY]])
+                                return [deserialize_single_input(data, inner_type) for data in data]
+                            else:
+                                return deserialize_single_input(data, annotation)
+
+                        with _span(frame, "decode"):
+                            inputs = decode_exec_inputs(
+                                command.exec,
+                                active_node.node.input_types,
+                                active_node.inputs,
+                                deserialize_any_input,
                             )
-                            data = debug_reply.model_dump_json(exclude_none=True)
-                            if self.debug_mode:
-                                logger.info(f"--> {data}")
-                            await websocket.send_str(data)
-
-                        context = Context(state, debug_log_callback)
-                        inputs = [context] + inputs
 
-                    if inspect.iscoroutinefunction(func):
-                        result = await func(*inputs)
-                    else:
-                        result = func(*inputs)
+                        if active_node.node.first_arg_is_context:
+                            async def debug_log_callback(message: str) -> None:
+                                debug_reply = OutgoingMessage(
+                                    id=0,
+                                    node=command.node,
+                                    debug_message=message,
+                                )
+                                data = debug_reply.model_dump_json(exclude_none=True)
+                                if self.debug_mode:
+                                    logger.info(f"--> {data}")
+                                await websocket.send_str(data)
+
+                            context = Context(state, debug_log_callback)
+                            inputs = [context] + inputs
+
+                        running = (
+                            self.loop_monitor.running(active_node.node.spec.type, command.exec.exec_id)
+                            if self.loop_monitor is not None else _NO_SPAN
+                        )
+                        with _span(frame, "run"), running:
+                            if self.profiler is not None:
+                                result = await self.profiler.run(active_node.node.spec.type, func, inputs)
+                            elif inspect.iscoroutinefunction(func):
+                                result = await func(*inputs)
+                            else:
+                                result = func(*inputs)
+
+                        if active_node.node.empty_output:
+                            result = []
+                        elif active_node.node.tuple_output:
+                            result = result # already a list
+                        else:
+                            result = [result]
+
+                        if context is not None:
+                            active_nodes[command.node or 0].state = context.state
+
+                        result = list(result)
+                        for i, ty in enumerate(active_node.node.output_types):
+                            if isinstance(ty, type) and issubclass(ty, ModelArray):
+                                array = result[i] if isinstance(result[i], ModelArray) else ty(result[i])
+                                if binary:
+                                    out_buffers.append(array.to_buffer())
+                                    result[i] = {BUFFER_KEY: len(out_buffers) - 1}
+                                else:
+                                    result[i] = array.to_wire()
+                            elif binary:
+                                codec = self.codecs.get(get_args(ty)[0]) if get_origin(ty) is list else None
+                                if codec is not None:
+                                    out_buffers.append(codec.pack(result[i]))
+                                    result[i] = {BUFFER_KEY: len(out_buffers) - 1}
 
-                    if active_node.node.empty_output:
-                        result = []
-                    elif active_node.node.tuple_output:
-                        result = result # already a list
+                        reply = OutgoingMessage(
+                            id=command.id,
+                            node=command.node,
+                            exec_ok=ExecReply(
+                                exec_id=command.exec.exec_id,
+                                outputs=result,
+                            ),
+                        )
                     else:
-                        result = [result]
+                        reply = OutgoingMessage(
+                            id=command.id,
+                            node=command.node,
+                            error= constants.ERROR_UNSUPPORTED_COMMAND,
+                        )
 
-                    if context is not None:
-                        active_nodes[command.node or 0].state = context.state
+                    with _span(frame, "encode"):
+                        data = reply.model_dump_json(exclude_none=True)
 
+                except Exception as e:
                     reply = OutgoingMessage(
                         id=command.id,
                         node=command.node,
-                        exec_ok=ExecReply(
-                            exec_id=command.exec.exec_id,
-                            outputs=result,
-                        ),
-                    )
-                else:
-                    reply = OutgoingMessage(
-                        id=command.id,
-                        node=command.node,
-                        error= constants.ERROR_UNSUPPORTED_COMMAND,
+                        error=str(e),
                     )
+                    import traceback
+                    traceback.print_exc()
+                    data = reply.model_dump_json(exclude_none=True)
+                    out_buffers = []
+
+                if self.debug_mode:
+                    logger.info(f"--> {data}")
+                with _span(frame, "send"):
+                    if binary:
+                        await websocket.send_bytes(pack_frame(data, out_buffers))
+                    else:
+                        await websocket.send_str(data)
+            finally:
+                if frame is not None:
+                    frame.finish()
+        return websocket
 
-                data = reply.model_dump_json(exclude_none=True)
+    async def __messages_handler(self, request: Any):
+        """
+        Stream of the written messages (binary CDR batch frames, see
+        dispatcher.deserialize_batch), kept apart from the node protocol
+        socket. Only the peers connected here receive them.
+        """
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.__add_peer(websocket)
+        try:
+            # nothing is expected from the peer, wait until it disconnects
+            async for _ in websocket:
+                pass
+        finally:
+            self.__remove_peer(websocket)
+        return websocket
 
-            except Exception as e:
-                reply = OutgoingMessage(
-                    id=command.id,
-                    node=command.node,
-                    error=str(e),
-                )
-                import traceback
-                traceback.print_exc()
-                data = reply.model_dump_json(exclude_none=True)
-
-            if self.debug_mode:
-                logger.info(f"--> {data}")
-            await websocket.send_str(data)
+    def __add_peer(self, websocket: web.WebSocketResponse):
+        self.__peers.add(websocket)
+        self.dispatcher.resume()
 
-        return websocket
+    def __remove_peer(self, websocket: web.WebSocketResponse):
+        self.__peers.discard(websocket)
+        if not self.__peers:
+            self.dispatcher.pause()
+
+    async def __broadcast(self, frame: bytes):
+        for websocket in list(self.__peers):
+            if websocket.closed:
+                self.__remove_peer(websocket)
+                continue
+            try:
+                await websocket.send_bytes(frame)
+            except Exception as e:
+                # drop this peer only, the others still get the frame
+                logger.warning(f"failed to send outbound frame to a peer: {e}")
+                self.__remove_peer(websocket)
 
     async def restart_node(self):
         """
@@ -339,20 +488,83 @@ class Intrepid:
         # Close and clean up resources
         self.cleanup()
 
+    async def __profile_handler(self, request: Any):
+        node_type = request.query.get("node")
+        if node_type is None:
+            return web.json_response({"node_types": self.profiler.node_types()})
+        return web.Response(text=self.profiler.report(node_type))
+
+    async def __profile_dump_handler(self, request: Any):
+        # file I/O off the event loop
+        paths = await asyncio.get_running_loop().run_in_executor(None, self.profiler.dump)
+        return web.json_response({"files": paths})
+
+    async def __loop_lag_handler(self, request: Any):
+        return web.json_response(self.loop_monitor.stats())
+
     def create_runner(self):
         self.__app = web.Application()
         self.__app.add_routes([
             web.get('/', self.__websocket_handler),
+            web.get('/messages', self.__messages_handler),
         ])
+        if self.profiler is not None:
+            self.__app.add_routes([
+                web.get('/profile', self.__profile_handler),
+                web.post('/profile', self.__profile_dump_handler),
+            ])
+        if self.loop_monitor is not None:
+            self.__app.add_routes([
+                web.get('/loop_lag', self.__loop_lag_handler),
+            ])
         return web.AppRunner(self.__app)
 
     async def start_server(self, host, port):
+        """
+        Start the websocket server on the running event loop.
+
+        @return: the port the server listens on (port 0 binds a free port)
+        """
         logger.info("\nYou can now connect Intrepid Agent to host {}:{}".format(host, port))
+        if self.profiler is not None:
+            for node_type, node in self.all_nodes.items():
+                self.profiler.watch(node_type, node.func)
+            self.profiler.start()
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        if self.__dispatcher_task is None:
+            self.__dispatcher_task = asyncio.ensure_future(self.dispatcher.run(self.__broadcast))
         await self.__runner.setup()
         site = web.TCPSite(self.__runner, host, port)
         await site.start()
+        # bound port, port 0 picks a free one
+        return self.__runner.addresses[0][1]
+
+    async def stop_server(self):
+        """
+        Close the websocket server and stop the outbound dispatcher and the monitors.
+        """
+        if self.__dispatcher_task is not None:
+            self.__dispatcher_task.cancel()
+            try:
+                await self.__dispatcher_task
+            except asyncio.CancelledError:
+                pass
+            self.__dispatcher_task = None
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+        await self.__runner.cleanup()
+
+    def start(self, host=WS_HOST, port=WS_PORT, loop: str | None = "auto"):
+        """
+        Start the node server and run it forever.
 
-    def start(self, host=WS_HOST, port=WS_PORT):
+        @param host: interface the websocket server binds to
+        @param port: port the websocket server listens on
+        @param loop: event loop implementation, "asyncio", "uvloop" or "auto" (uvloop when installed)
+        """
         # if self.__callback is None and not ACTION_REGISTRY and not SENSOR_REGISTRY:
         #     log(TAG_HTTP_REQUEST, LogLevel.ERROR, ERROR_REGISTER_CALLBACK)
         #     sys.exit(1)
@@ -369,7 +581,9 @@ class Intrepid:
         for route in self.__app.router.routes():
             logger.debug(route)
 
-        loop = asyncio.get_event_loop()
+        loop = new_event_loop(loop)
+        asyncio.set_event_loop(loop)
+        logger.debug(f"Using event loop {type(loop).__module__}.{type(loop).__name__}")
         loop.run_until_complete(self.start_server(host, port))
         loop.run_forever()
 
@@ -392,6 +606,7 @@ class Intrepid:
         full_name = self.__add_namespace(name)
         self.type_names[type] = full_name
         self.all_types[full_name] = type
+        self.__compile_codec(type)
 
     def register_node(
         self,
@@ -419,7 +634,11 @@ class Intrepid:
                     raise ValueError(f"unsupported inner type in list: {inner_type}")
             else:
                 type_name = self.type_names.get(annotation)
-                type_container = DiscoveryPinContainer.SINGLE
+                # NumPy-backed arrays share the wire name of their element type
+                if isinstance(annotation, type) and issubclass(annotation, ModelArray):
+                    type_container = DiscoveryPinContainer.ARRAY
+                else:
+                    type_container = DiscoveryPinContainer.SINGLE
                 if type_name is None:
                     raise ValueError(f"unsupported type: {annotation}")
 
@@ -556,12 +775,18 @@ class Intrepid:
         return Intrepid.__get_instance().status
 
     # @staticmethod
-    def write(self, target, data):
+    def write(self, target, data, priority: int = 0):
         """
         Write data to node output target.
-        @return
+        Messages are queued on the outbound dispatcher and sent to the peers connected to /messages.
+        @param target: recipient of the message
+        @param data: payload
+        @param priority: transport priority, higher values are sent first
+        @return: the queued message
         """
-        return Intrepid.__get_instance().write(target, data)
+        msg = Intrepid.__get_instance().write(target, data, priority)
+        self.dispatcher.submit(msg)
+        return msg
 
     @staticmethod
     def stop():
@@ -695,18 +920,17 @@ class Intrepid:
 
         def stop(self):
             # Create STOP message
-            msg = IntrepidMessage(Opcode.STOP, None, datetime.now(), self.node_id).serialize()
+            msg = IntrepidMessage(Opcode.STOP, None, datetime.now(timezone.utc), None)
 
             # TODO send msg over websocket
             self.status = Status.NOT_INITIALIZED
+            return msg
 
-        def write(self, node_id, target, data):
-            recipient = node_id + '/' + target
-            msg = IntrepidMessage(Opcode.WRITE, payload=data, timestamp=datetime.now(), recipient=recipient, priority=0)
+        def write(self, target, data, priority=0):
+            msg = IntrepidMessage(Opcode.WRITE, payload=data, timestamp=datetime.now(timezone.utc), recipient=target, priority=priority)
             # logger.debug(msg)
             log(TAG_HTTP_REQUEST, LogLevel.DEBUG, msg)
-
-            # TODO send msg over websocket
+            return msg
 
         def __log(self, tag, level, message):
             try:
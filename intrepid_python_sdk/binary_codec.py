@@ -0,0 +1,182 @@
+import struct
+from typing import Any, List, Tuple
+
+from pydantic import BaseModel
+
+from .intrepid_types import Boolean, F32, F64, I8, I16, I32, I64, U8, U16, U32, U64
+
+# struct format of every fixed size scalar type
+SCALAR_FORMATS = {
+    bool: "?",
+    float: "d",
+    int: "q",
+    Boolean: "?",
+    F32: "f",
+    F64: "d",
+    I8: "b",
+    I16: "h",
+    I32: "i",
+    I64: "q",
+    U8: "B",
+    U16: "H",
+    U32: "I",
+    U64: "Q",
+}
+
+BUFFER_KEY = "$buffer"
+_LENGTH = struct.Struct("<I")
+
+
+class StructCodec:
+    """
+    Packed little-endian binary codec of a pydantic model with a fixed layout.
+
+    Arrays of models are encoded as one contiguous buffer of records, e.g. a
+    list[Vec3] of N elements becomes N * 24 bytes of float64.
+    """
+
+    def __init__(self, model: type, layout: List[Tuple[str, Any]]):
+        self.model = model
+        # list of (field name, struct format or nested layout)
+        self.layout = layout
+        self.format = "<" + _flat_format(layout)
+        self.struct = struct.Struct(self.format)
+        self.size = self.struct.size
+        self.num_fields = len(self.format) - 1
+        # single scalar format when every field has the same type (e.g. "d" for Vec3)
+        self.__uniform = self.format[1] if len(set(self.format[1:])) == 1 else None
+        self.__dtype = None
+
+    def __repr__(self):
+        return f"<StructCodec model={self.model.__name__} format='{self.format}' size={self.size}>"
+
+    @property
+    def dtype(self):
+        """
+        Equivalent NumPy structured dtype (requires numpy).
+        """
+        if self.__dtype is None:
+            import numpy as np
+            self.__dtype = np.dtype(_dtype_spec(self.layout))
+        return self.__dtype
+
+    def pack(self, values: List[BaseModel]) -> bytes:
+        flat = []
+        for value in values:
+            _flatten(value, self.layout, flat)
+        if self.__uniform is not None:
+            return struct.pack(f"<{len(flat)}{self.__uniform}", *flat)
+
+        buffer = bytearray(self.size * len(values))
+        for i in range(len(values)):
+            self.struct.pack_into(buffer, i * self.size, *flat[i * self.num_fields:(i + 1) * self.num_fields])
+        return bytes(buffer)
+
+    def unpack(self, buffer) -> List[BaseModel]:
+        if len(buffer) % self.size != 0:
+            raise ValueError(f"buffer of {len(buffer)} bytes is not a multiple of {self.size} bytes ({self.model.__name__})")
+        return [_build(self.model, self.layout, iter(record)) for record in self.struct.iter_unpack(buffer)]
+
+    def to_numpy(self, buffer):
+        """
+        View a buffer as a NumPy structured array without copying it.
+        """
+        import numpy as np
+        return np.frombuffer(buffer, dtype=self.dtype)
+
+
+def compile_codec(model: type) -> StructCodec | None:
+    """
+    Compile a pydantic model into a StructCodec.
+
+    Returns None when the model has no fixed layout, i.e. one of its fields
+    (or of its nested models) is not a fixed size scalar.
+    """
+    layout = _compile_layout(model)
+    if not layout:
+        return None
+    return StructCodec(model, layout)
+
+
+def pack_frame(header: str, buffers: List[bytes]) -> bytes:
+    """
+    Build a binary websocket frame: a JSON header followed by binary buffers.
+
+    Layout: u32 header length, header (UTF-8 JSON), then for every buffer
+    u32 length followed by its bytes. All integers are little-endian.
+    """
+    encoded = header.encode("utf-8")
+    parts = [_LENGTH.pack(len(encoded)), encoded]
+    for buffer in buffers:
+        parts.append(_LENGTH.pack(len(buffer)))
+        parts.append(buffer)
+    return b"".join(parts)
+
+
+def unpack_frame(data: bytes) -> Tuple[bytes, List[memoryview]]:
+    """
+    Split a binary websocket frame into its JSON header and buffers.
+    Buffers are returned as memoryviews over `data` (no copy).
+    """
+    view = memoryview(data)
+    (header_len,) = _LENGTH.unpack_from(view, 0)
+    offset = _LENGTH.size + header_len
+    header = bytes(view[_LENGTH.size:offset])
+    buffers = []
+    while offset < len(view):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        if offset + length > len(view):
+            raise ValueError("truncated binary frame")
+        buffers.append(view[offset:offset + length])
+        offset += length
+    return header, buffers
+
+
+def _compile_layout(model: type) -> List[Tuple[str, Any]] | None:
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        return None
+    layout = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if annotation in SCALAR_FORMATS:
+            layout.append((name, SCALAR_FORMATS[annotation]))
+            continue
+        nested = _compile_layout(annotation)
+        if nested is None:
+            return None
+        layout.append((name, (annotation, nested)))
+    return layout
+
+
+def _flat_format(layout) -> str:
+    return "".join(fmt if isinstance(fmt, str) else _flat_format(fmt[1]) for _, fmt in layout)
+
+
+def _dtype_spec(layout) -> list:
+    spec = []
+    for name, fmt in layout:
+        if isinstance(fmt, str):
+            spec.append((name, "<" + fmt))
+        else:
+            spec.append((name, _dtype_spec(fmt[1])))
+    return spec
+
+
+def _flatten(value: BaseModel, layout, out: list):
+    for name, fmt in layout:
+        if isinstance(fmt, str):
+            out.append(getattr(value, name))
+        else:
+            _flatten(getattr(value, name), fmt[1], out)
+
+
+def _build(model: type, layout, values) -> BaseModel:
+    fields = {}
+    for name, fmt in layout:
+        if isinstance(fmt, str):
+            fields[name] = next(values)
+        else:
+            fields[name] = _build(fmt[0], fmt[1], values)
+    # Values come from a typed buffer, validation is not needed
+    return model.model_construct(**fields)
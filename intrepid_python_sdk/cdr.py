@@ -0,0 +1,262 @@
+import struct
+import sys
+from typing import Any
+
+from pydantic import BaseModel
+
+# XCDR1 encapsulation header (representation identifier + options), little-endian plain CDR
+CDR_LE = b"\x00\x01\x00\x00"
+ENCAPSULATION_SIZE = len(CDR_LE)
+
+_NATIVE_LE = sys.byteorder == "little"
+
+_BOOL = struct.Struct("<?")
+_INT8 = struct.Struct("<b")
+_UINT8 = struct.Struct("<B")
+_INT16 = struct.Struct("<h")
+_UINT16 = struct.Struct("<H")
+_INT32 = struct.Struct("<i")
+_UINT32 = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+_UINT64 = struct.Struct("<Q")
+_FLOAT32 = struct.Struct("<f")
+_FLOAT64 = struct.Struct("<d")
+
+
+class CdrWriter:
+    """
+    XCDR1 little-endian encoder.
+
+    Primitives are aligned to their own size (8 bytes at most), relative to
+    the end of the encapsulation header. Strings are a uint32 length
+    (including the terminating NUL) followed by UTF-8 bytes and a NUL,
+    sequences a uint32 element count followed by the elements.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray(CDR_LE)
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
+
+    def align(self, size: int):
+        padding = -(len(self.buffer) - ENCAPSULATION_SIZE) % size
+        if padding:
+            self.buffer += b"\x00" * padding
+
+    def __write(self, packer: struct.Struct, value):
+        self.align(packer.size)
+        self.buffer += packer.pack(value)
+
+    def write_bool(self, value: bool):
+        self.__write(_BOOL, value)
+
+    def write_int8(self, value: int):
+        self.__write(_INT8, value)
+
+    def write_uint8(self, value: int):
+        self.__write(_UINT8, value)
+
+    def write_int16(self, value: int):
+        self.__write(_INT16, value)
+
+    def write_uint16(self, value: int):
+        self.__write(_UINT16, value)
+
+    def write_int32(self, value: int):
+        self.__write(_INT32, value)
+
+    def write_uint32(self, value: int):
+        self.__write(_UINT32, value)
+
+    def write_int64(self, value: int):
+        self.__write(_INT64, value)
+
+    def write_uint64(self, value: int):
+        self.__write(_UINT64, value)
+
+    def write_float32(self, value: float):
+        self.__write(_FLOAT32, value)
+
+    def write_float64(self, value: float):
+        self.__write(_FLOAT64, value)
+
+    def write_string(self, value: str):
+        encoded = value.encode("utf-8")
+        self.write_uint32(len(encoded) + 1)
+        self.buffer += encoded
+        self.buffer += b"\x00"
+
+    def write_octets(self, value: bytes):
+        self.write_uint32(len(value))
+        self.buffer += value
+
+    def write_float64_sequence(self, values):
+        self.write_uint32(len(values))
+        self.align(8)
+        self.buffer += struct.pack(f"<{len(values)}d", *values)
+
+
+class CdrReader:
+    """
+    XCDR1 little-endian decoder over a memoryview.
+
+    Octet and float64 sequences are returned as memoryviews over the input
+    buffer, so large payloads are not copied.
+    """
+
+    def __init__(self, data):
+        self.view = memoryview(data).cast("B")
+        if bytes(self.view[:ENCAPSULATION_SIZE]) != CDR_LE:
+            raise ValueError("unsupported CDR encapsulation, expected little-endian XCDR1")
+        self.offset = ENCAPSULATION_SIZE
+
+    def align(self, size: int):
+        self.offset += -(self.offset - ENCAPSULATION_SIZE) % size
+
+    def __read(self, packer: struct.Struct):
+        self.align(packer.size)
+        (value,) = packer.unpack_from(self.view, self.offset)
+        self.offset += packer.size
+        return value
+
+    def __take(self, size: int) -> memoryview:
+        if self.offset + size > len(self.view):
+            raise ValueError("truncated CDR buffer")
+        chunk = self.view[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+
+    def read_bool(self) -> bool:
+        return self.__read(_BOOL)
+
+    def read_int8(self) -> int:
+        return self.__read(_INT8)
+
+    def read_uint8(self) -> int:
+        return self.__read(_UINT8)
+
+    def read_int16(self) -> int:
+        return self.__read(_INT16)
+
+    def read_uint16(self) -> int:
+        return self.__read(_UINT16)
+
+    def read_int32(self) -> int:
+        return self.__read(_INT32)
+
+    def read_uint32(self) -> int:
+        return self.__read(_UINT32)
+
+    def read_int64(self) -> int:
+        return self.__read(_INT64)
+
+    def read_uint64(self) -> int:
+        return self.__read(_UINT64)
+
+    def read_float32(self) -> float:
+        return self.__read(_FLOAT32)
+
+    def read_float64(self) -> float:
+        return self.__read(_FLOAT64)
+
+    def read_string(self) -> str:
+        length = self.read_uint32()
+        if length == 0:
+            return ""
+        return str(self.__take(length)[:-1], "utf-8")
+
+    def read_octets(self) -> memoryview:
+        return self.__take(self.read_uint32())
+
+    def read_float64_sequence(self):
+        count = self.read_uint32()
+        self.align(8)
+        chunk = self.__take(8 * count)
+        if _NATIVE_LE:
+            return chunk.cast("d")
+        return memoryview(struct.pack(f"={count}d", *struct.unpack(f"<{count}d", chunk))).cast("d")
+
+
+# Payload union discriminators
+PAYLOAD_NONE = 0
+PAYLOAD_BOOL = 1
+PAYLOAD_INT64 = 2
+PAYLOAD_FLOAT64 = 3
+PAYLOAD_STRING = 4
+PAYLOAD_OCTETS = 5
+PAYLOAD_FLOAT64_SEQUENCE = 6
+PAYLOAD_SEQUENCE = 7
+PAYLOAD_MAP = 8
+
+
+def write_payload(writer: CdrWriter, value: Any):
+    """
+    Encode a payload as a tagged union (octet discriminator + value).
+
+    Lists made only of floats are encoded as a float64 sequence, pydantic
+    models as maps of their fields.
+    """
+    if value is None:
+        writer.write_uint8(PAYLOAD_NONE)
+    elif isinstance(value, bool):
+        writer.write_uint8(PAYLOAD_BOOL)
+        writer.write_bool(value)
+    elif isinstance(value, int):
+        writer.write_uint8(PAYLOAD_INT64)
+        writer.write_int64(value)
+    elif isinstance(value, float):
+        writer.write_uint8(PAYLOAD_FLOAT64)
+        writer.write_float64(value)
+    elif isinstance(value, str):
+        writer.write_uint8(PAYLOAD_STRING)
+        writer.write_string(value)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        writer.write_uint8(PAYLOAD_OCTETS)
+        writer.write_octets(value)
+    elif isinstance(value, BaseModel):
+        write_payload(writer, value.model_dump())
+    elif isinstance(value, dict):
+        writer.write_uint8(PAYLOAD_MAP)
+        writer.write_uint32(len(value))
+        for key, item in value.items():
+            writer.write_string(str(key))
+            write_payload(writer, item)
+    elif isinstance(value, (list, tuple)):
+        if value and all(type(item) is float for item in value):
+            writer.write_uint8(PAYLOAD_FLOAT64_SEQUENCE)
+            writer.write_float64_sequence(value)
+        else:
+            writer.write_uint8(PAYLOAD_SEQUENCE)
+            writer.write_uint32(len(value))
+            for item in value:
+                write_payload(writer, item)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__} as CDR payload")
+
+
+def read_payload(reader: CdrReader) -> Any:
+    kind = reader.read_uint8()
+    if kind == PAYLOAD_NONE:
+        return None
+    if kind == PAYLOAD_BOOL:
+        return reader.read_bool()
+    if kind == PAYLOAD_INT64:
+        return reader.read_int64()
+    if kind == PAYLOAD_FLOAT64:
+        return reader.read_float64()
+    if kind == PAYLOAD_STRING:
+        return reader.read_string()
+    if kind == PAYLOAD_OCTETS:
+        return reader.read_octets()
+    if kind == PAYLOAD_FLOAT64_SEQUENCE:
+        return reader.read_float64_sequence()
+    if kind == PAYLOAD_SEQUENCE:
+        return [read_payload(reader) for _ in range(reader.read_uint32())]
+    if kind == PAYLOAD_MAP:
+        result = {}
+        for _ in range(reader.read_uint32()):
+            key = reader.read_string()
+            result[key] = read_payload(reader)
+        return result
+    raise ValueError(f"unknown CDR payload kind: {kind}")
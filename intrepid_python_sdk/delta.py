@@ -0,0 +1,67 @@
+from typing import Any, Callable, List
+
+from .protocol import ExecCommand
+
+
+class ExecInputEncoder:
+    """
+    Reference encoder for delta-encoded exec inputs (sender side).
+
+    Keeps the inputs last sent to one active node. Inputs equal to the
+    previous exec are marked in `ExecCommand.unchanged` and sent as null, so
+    the node server reuses its cached value instead of decoding it again.
+    """
+
+    def __init__(self):
+        self.__last: List[Any] | None = None
+
+    def reset(self):
+        """
+        Forget the previous inputs, e.g. after the node has been re-initialized.
+        """
+        self.__last = None
+
+    def encode(self, exec_id: int, time: int, inputs: List[Any]) -> ExecCommand:
+        last = self.__last
+        self.__last = list(inputs)
+
+        if last is None or len(last) != len(inputs):
+            return ExecCommand(exec_id=exec_id, time=time, inputs=list(inputs))
+
+        unchanged = [i for i, (old, new) in enumerate(zip(last, inputs)) if old == new]
+        if not unchanged:
+            return ExecCommand(exec_id=exec_id, time=time, inputs=list(inputs))
+
+        skip = set(unchanged)
+        return ExecCommand(
+            exec_id=exec_id,
+            time=time,
+            inputs=[None if i in skip else value for i, value in enumerate(inputs)],
+            unchanged=unchanged,
+        )
+
+
+def decode_exec_inputs(command: ExecCommand, types: List[Any], cache: List[Any], decode: Callable[[Any, Any], Any]) -> List[Any]:
+    """
+    Decode the data inputs of an exec command (node server side).
+
+    Inputs listed in `command.unchanged` are taken from `cache` without being
+    validated again, all the others are decoded with `decode(data, type)`.
+    The cache is updated in place with the decoded inputs.
+
+    Cached values are handed to the node function as they are, so node
+    functions must not modify their inputs in place.
+    """
+    unchanged = set(command.unchanged or ())
+    if unchanged and len(cache) != len(types):
+        raise ValueError("inputs marked unchanged but no previous exec inputs are cached")
+
+    inputs = []
+    for i, ty in enumerate(types):
+        if i in unchanged:
+            inputs.append(cache[i])
+        else:
+            inputs.append(decode(command.inputs[i], ty))
+
+    cache[:] = inputs
+    return inputs
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, List
+
+from .cdr import CdrReader, CdrWriter
+from .message import IntrepidMessage
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundDispatcher:
+    """
+    Priority-ordered outbound queue of IntrepidMessage.
+
+    Messages are queued per priority (higher value is more urgent, as DDS
+    transport priority) and drained highest priority first. Consecutive
+    messages of the same priority are batched into one frame.
+
+    To keep low-priority traffic (e.g. telemetry) moving under load, a
+    non-empty queue that was passed over `starvation_limit` times in a row
+    gets the next frame. Messages with priority >= `control_priority` are
+    never passed over: they always go out before any other queued frame.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queued: int = 1024,
+        max_batch: int = 64,
+        max_batch_bytes: int = 64 * 1024,
+        starvation_limit: int = 8,
+        control_priority: int = 10,
+    ):
+        """
+        @param max_queued: capacity of every priority queue, the oldest message is dropped when full
+        @param max_batch: maximum number of messages in a frame
+        @param max_batch_bytes: a frame is closed once it reaches this size
+        @param starvation_limit: frames sent ahead of a waiting queue before that queue is served
+        @param control_priority: priorities from this value up are never delayed by lower ones
+        """
+        self.max_queued = max_queued
+        self.max_batch = max_batch
+        self.max_batch_bytes = max_batch_bytes
+        self.starvation_limit = starvation_limit
+        self.control_priority = control_priority
+        self.dropped = 0
+        self.sent_frames = 0
+        self.sent_messages = 0
+        # guards the queues, submit() may be called from other threads
+        self.__lock = threading.Lock()
+        self.__queues: Dict[int, deque] = {}
+        # frames sent ahead of every waiting queue since it was last served
+        self.__skipped: Dict[int, int] = {}
+        self.__paused = False
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__wakeup: asyncio.Event | None = None
+
+    def __len__(self):
+        with self.__lock:
+            return sum(len(queue) for queue in self.__queues.values())
+
+    def submit(self, message: IntrepidMessage):
+        """
+        Queue a message. Safe to call from any thread.
+        """
+        with self.__lock:
+            queue = self.__queues.get(message.priority)
+            if queue is None:
+                queue = self.__queues[message.priority] = deque(maxlen=self.max_queued)
+                self.__skipped[message.priority] = 0
+            if len(queue) == self.max_queued:
+                self.dropped += 1
+                logger.debug(f"outbound queue {message.priority} full, dropping oldest message")
+            queue.append(message)
+        self.__wake()
+
+    def pause(self):
+        """
+        Hold queued messages, e.g. while no peer is connected.
+        """
+        self.__paused = True
+
+    def resume(self):
+        self.__paused = False
+        self.__wake()
+
+    def next_frame(self) -> bytes | None:
+        """
+        Pop the next batch of messages and encode it as a frame, or None if
+        nothing is queued.
+
+        Frame layout (XCDR1): uint32 message count followed by the messages,
+        see IntrepidMessage.serialize.
+        """
+        with self.__lock:
+            priority = self.__next_priority()
+            if priority is None:
+                return None
+
+            queue = self.__queues[priority]
+            batch = []
+            writer = CdrWriter()
+            writer.write_uint32(0)
+            while queue and len(batch) < self.max_batch and len(writer.buffer) < self.max_batch_bytes:
+                message = queue.popleft()
+                message.write_cdr(writer)
+                batch.append(message)
+            writer.buffer[4:8] = len(batch).to_bytes(4, "little")
+
+            for other, skipped in self.__skipped.items():
+                if other < priority and self.__queues[other]:
+                    self.__skipped[other] = skipped + 1
+            self.__skipped[priority] = 0
+
+        self.sent_frames += 1
+        self.sent_messages += len(batch)
+        return writer.getvalue()
+
+    async def run(self, send: Callable[[bytes], Awaitable[None]]):
+        """
+        Drain the queues forever, passing every frame to `send`.
+        Messages submitted while a frame is being sent are ordered before the
+        next frame is picked, so a control write waits for one frame at most.
+        """
+        self.__loop = asyncio.get_running_loop()
+        self.__wakeup = asyncio.Event()
+        if len(self):
+            self.__wakeup.set()
+        while True:
+            await self.__wakeup.wait()
+            self.__wakeup.clear()
+            while not self.__paused:
+                frame = self.next_frame()
+                if frame is None:
+                    break
+                try:
+                    await send(frame)
+                except Exception as e:
+                    logger.warning(f"failed to send outbound frame: {e}")
+
+    def __next_priority(self) -> int | None:
+        ready = [priority for priority, queue in self.__queues.items() if queue]
+        if not ready:
+            return None
+        top = max(ready)
+        if top >= self.control_priority:
+            return top
+
+        starved = [priority for priority in ready if self.__skipped[priority] >= self.starvation_limit]
+        if starved:
+            return max(starved, key=lambda priority: (self.__skipped[priority], priority))
+        return top
+
+    def __wake(self):
+        if self.__wakeup is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.__loop:
+            self.__wakeup.set()
+        else:
+            self.__loop.call_soon_threadsafe(self.__wakeup.set)
+
+
+def deserialize_batch(data) -> List[IntrepidMessage]:
+    """
+    Decode a frame produced by OutboundDispatcher.next_frame.
+    """
+    reader = CdrReader(data)
+    return [IntrepidMessage.read_cdr(reader) for _ in range(reader.read_uint32())]
@@ -0,0 +1,169 @@
+"""
+Vectorised geometric algebra kernels over arrays of intrepid types.
+
+Layouts (last axis), matching the field order of the pydantic models:
+
+    Vec3     [x, y, z]
+    Bivec3   [yz, zx, xy]
+    Rotor3   [s, yz, zx, xy]
+
+A rotor R rotates a vector v as R v R~. The rotor rotating by an angle
+theta in the plane of the unit bivector B (e.g. e12 rotates x towards y) is
+R = cos(theta/2) - B sin(theta/2), and corresponds to the unit quaternion
+(w, x, y, z) = (s, -yz, -zx, -xy). The product a * b applies b first.
+
+Every kernel accepts a single element (shape (4,) / (3,)) or a batch
+(shape (N, 4) / (N, 3)) and broadcasts like NumPy. Batches are returned as
+Rotor3Array / Vec3Array / Bivec3Array.
+"""
+
+import numpy as np
+
+from .intrepid_types import Bivec3Array, Rotor3Array, Vec3Array
+
+
+def _wrap(array: np.ndarray, cls: type) -> np.ndarray:
+    return array.view(cls) if array.ndim == 2 else array
+
+
+def _split_rotor(rotor):
+    rotor = np.asarray(rotor, dtype=np.float64)
+    return rotor[..., 0], rotor[..., 1:]
+
+
+def _rotor(s, bivector) -> np.ndarray:
+    out = np.empty(np.broadcast_shapes(np.shape(s), bivector.shape[:-1]) + (4,))
+    out[..., 0] = s
+    out[..., 1:] = bivector
+    return _wrap(out, Rotor3Array)
+
+
+def reverse(rotor) -> np.ndarray:
+    """
+    Reverse R~ of a rotor (its inverse when normalised).
+    """
+    s, b = _split_rotor(rotor)
+    return _rotor(s, -b)
+
+
+def normalize(rotor) -> np.ndarray:
+    rotor = np.asarray(rotor, dtype=np.float64)
+    return _wrap(rotor / np.linalg.norm(rotor, axis=-1, keepdims=True), Rotor3Array)
+
+
+def rotor_mul(a, b) -> np.ndarray:
+    """
+    Geometric product a * b of two rotors (rotation b then a).
+    """
+    s1, b1 = _split_rotor(a)
+    s2, b2 = _split_rotor(b)
+    s = s1 * s2 - np.einsum("...i,...i->...", b1, b2)
+    bivector = s1[..., None] * b2 + s2[..., None] * b1 - np.cross(b1, b2)
+    return _rotor(s, bivector)
+
+
+def rotate(rotor, vectors) -> np.ndarray:
+    """
+    Rotate vectors by rotors, R v R~.
+    """
+    s, b = _split_rotor(rotor)
+    v = np.asarray(vectors, dtype=np.float64)
+    # quaternion vector part is -b
+    t = 2.0 * np.cross(v, b)
+    out = v + s[..., None] * t - np.cross(b, t)
+    return _wrap(out, Vec3Array)
+
+
+def rotor_from_bivector(bivector) -> np.ndarray:
+    """
+    Exponential exp(-B/2): rotation by |B| in the plane of B.
+    """
+    bivector = np.asarray(bivector, dtype=np.float64)
+    angle = np.linalg.norm(bivector, axis=-1)
+    # sin(angle/2) / angle, well defined at 0
+    scale = 0.5 * np.sinc(angle / (2.0 * np.pi))
+    return _rotor(np.cos(0.5 * angle), -scale[..., None] * bivector)
+
+
+def rotor_to_bivector(rotor) -> np.ndarray:
+    """
+    Logarithm, inverse of rotor_from_bivector for normalised rotors.
+    """
+    s, b = _split_rotor(rotor)
+    sin_half = np.linalg.norm(b, axis=-1)
+    angle = 2.0 * np.arctan2(sin_half, s)
+    scale = np.divide(angle, sin_half, out=np.full_like(angle, 2.0), where=sin_half > 1e-12)
+    return _wrap(-scale[..., None] * b, Bivec3Array)
+
+
+def rotor_from_quaternion(quaternion) -> np.ndarray:
+    """
+    @param quaternion: unit quaternions, scalar first (w, x, y, z)
+    """
+    q = np.asarray(quaternion, dtype=np.float64)
+    return _rotor(q[..., 0], -q[..., 1:])
+
+
+def rotor_to_quaternion(rotor) -> np.ndarray:
+    """
+    @return: unit quaternions, scalar first (w, x, y, z)
+    """
+    s, b = _split_rotor(rotor)
+    out = np.empty(s.shape + (4,))
+    out[..., 0] = s
+    out[..., 1:] = -b
+    return out
+
+
+def rotor_from_euler(roll, pitch, yaw) -> np.ndarray:
+    """
+    Rotor of intrinsic Z-Y-X (yaw, pitch, roll) Euler angles, in radians.
+    """
+    cr, sr = np.cos(0.5 * np.asarray(roll)), np.sin(0.5 * np.asarray(roll))
+    cp, sp = np.cos(0.5 * np.asarray(pitch)), np.sin(0.5 * np.asarray(pitch))
+    cy, sy = np.cos(0.5 * np.asarray(yaw)), np.sin(0.5 * np.asarray(yaw))
+    q = np.stack(np.broadcast_arrays(
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ), axis=-1)
+    return rotor_from_quaternion(q)
+
+
+def rotor_to_euler(rotor) -> np.ndarray:
+    """
+    Intrinsic Z-Y-X Euler angles of rotors.
+
+    @return: array of [roll, pitch, yaw] in radians, pitch in [-pi/2, pi/2]
+    """
+    q = rotor_to_quaternion(rotor)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    roll = np.arctan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2.0 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+    return np.stack([roll, pitch, yaw], axis=-1)
+
+
+def slerp(a, b, t) -> np.ndarray:
+    """
+    Spherical interpolation between normalised rotors along the shortest
+    arc, t = 0 gives a and t = 1 gives b.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    dot = np.einsum("...i,...i->...", a, b)[..., None]
+    # R and -R are the same rotation, take the closest one
+    b = np.where(dot < 0.0, -b, b)
+    dot = np.abs(dot)
+
+    angle = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    close = sin_angle < 1e-6
+    safe = np.where(close, 1.0, sin_angle)
+    wa = np.where(close, 1.0 - t, np.sin((1.0 - t) * angle) / safe)
+    wb = np.where(close, t, np.sin(t * angle) / safe)
+    out = wa * a + wb * b
+    out /= np.linalg.norm(out, axis=-1, keepdims=True)
+    return _wrap(out, Rotor3Array)
@@ -1,3 +1,5 @@
+import numpy as np
+from operator import itemgetter
 from pydantic import BaseModel
 from typing import Dict, Any, Awaitable, Callable, Generic, NewType, TypeVar, get_args, get_origin
 
@@ -65,6 +67,87 @@ class Rotor3(BaseModel):
     xy: float
 
 
+# NumPy-backed arrays of the types above, exchanged on the wire as arrays of
+# the element type. Each array has shape (N, number of fields), float64.
+class ModelArray(np.ndarray):
+    model: type[BaseModel]
+    fields: tuple[str, ...] = ()
+
+    def __new__(cls, data=()):
+        array = np.asarray(data, dtype=np.float64)
+        if array.size == 0:
+            array = array.reshape(0, len(cls.fields))
+        if array.ndim != 2 or array.shape[1] != len(cls.fields):
+            raise ValueError(f"{cls.__name__} expects shape (N, {len(cls.fields)}), got {array.shape}")
+        return array.view(cls)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = tuple(cls.model.model_fields)
+        for i, name in enumerate(cls.fields):
+            setattr(cls, name, property(lambda self, i=i: np.asarray(self)[:, i]))
+
+    def __getitem__(self, key):
+        return self.__demote(super().__getitem__(key))
+
+    def __array_wrap__(self, array, context=None, return_scalar=False):
+        result = self.__demote(super().__array_wrap__(array, context, return_scalar))
+        return result[()] if return_scalar and result.ndim == 0 else result
+
+    def __demote(self, result):
+        # rows, columns and reductions are plain arrays, only (N, fields) results keep the type
+        if isinstance(result, ModelArray) and (result.ndim != 2 or result.shape[1] != len(self.fields)):
+            return result.view(np.ndarray)
+        return result
+
+    @classmethod
+    def zeros(cls, n: int):
+        return cls(np.zeros((n, len(cls.fields))))
+
+    @classmethod
+    def from_wire(cls, data: list):
+        """
+        Build an array from its JSON form, a list of objects (e.g. [{"x": 1, "y": 2, "z": 3}]).
+        """
+        get = itemgetter(*cls.fields)
+        return cls([get(item) for item in data])
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Build an array from packed little-endian float64 records.
+        """
+        return cls(np.frombuffer(buffer, dtype="<f8").reshape(-1, len(cls.fields)).copy())
+
+    @classmethod
+    def from_models(cls, values: list[BaseModel]):
+        return cls([[getattr(value, name) for name in cls.fields] for value in values])
+
+    def to_wire(self) -> list[dict]:
+        return [dict(zip(self.fields, row)) for row in np.asarray(self).tolist()]
+
+    def to_buffer(self) -> bytes:
+        return np.ascontiguousarray(self, dtype="<f8").tobytes()
+
+    def to_models(self) -> list[BaseModel]:
+        return [self.model.model_construct(**item) for item in self.to_wire()]
+
+class Vec2Array(ModelArray):
+    model = Vec2
+
+class Vec3Array(ModelArray):
+    model = Vec3
+
+class Vec4Array(ModelArray):
+    model = Vec4
+
+class Bivec3Array(ModelArray):
+    model = Bivec3
+
+class Rotor3Array(ModelArray):
+    model = Rotor3
+
+
 TYPE_MAP: Dict[type, str] = {
     bool: "boolean",
     float: "f64",
@@ -92,4 +175,9 @@ TYPE_MAP: Dict[type, str] = {
     Bivec3: "bivec3",
     Rotor2: "rotor2",
     Rotor3: "rotor3",
+    Vec2Array: "vec2",
+    Vec3Array: "vec3",
+    Vec4Array: "vec4",
+    Bivec3Array: "bivec3",
+    Rotor3Array: "rotor3",
 }
@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+_UNKNOWN = ("<unknown>", None)
+
+
+class LoopLagMonitor:
+    """
+    Event loop lag monitor for the node server.
+
+    A task on the event loop sleeps for `interval` seconds and measures how late
+    it is woken up (the scheduling delay). A watchdog thread checks whether that
+    task is overdue; when the loop is blocked for longer than `threshold` it
+    looks up the exec that is running on the loop at that moment, so the stall
+    can be attributed to a node type and exec id.
+
+    Stalls are logged as warnings and aggregated in stats().
+
+    @param interval: seconds between two lag measurements.
+    @param threshold: minimum lag (seconds) reported as a stall.
+    """
+
+    def __init__(self, *, interval: float = 0.05, threshold: float = 0.1):
+        if interval <= 0 or threshold <= 0:
+            raise ValueError("interval and threshold must be greater than 0")
+
+        self.interval = interval
+        self.threshold = threshold
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.by_node: Dict[str, Dict[str, Any]] = {}
+        self.__running: Dict[asyncio.Task, Tuple[str, int]] = {}
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__task: asyncio.Task | None = None
+        self.__thread: threading.Thread | None = None
+        self.__stop = threading.Event()
+        self.__last_beat = time.perf_counter()
+        self.__culprit: Tuple[str, int | None] | None = None
+
+    def start(self):
+        """
+        Start monitoring the running event loop.
+        """
+        self.__loop = asyncio.get_running_loop()
+        self.__last_beat = time.perf_counter()
+        self.__task = self.__loop.create_task(self.__beat())
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__watchdog, name="intrepid-loop-monitor", daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    @contextlib.contextmanager
+    def running(self, node_type: str, exec_id: int):
+        """
+        Mark an exec as running on the current task.
+        """
+        task = asyncio.current_task()
+        previous = self.__running.get(task)
+        self.__running[task] = (node_type, exec_id)
+        try:
+            yield
+        finally:
+            if previous is None:
+                self.__running.pop(task, None)
+            else:
+                self.__running[task] = previous
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "samples": self.samples,
+            "mean_lag": self.total_lag / self.samples if self.samples else 0.0,
+            "max_lag": self.max_lag,
+            "stalls": self.stalls,
+            "by_node": {node_type: dict(entry) for node_type, entry in self.by_node.items()},
+        }
+
+    async def __beat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            self.__last_beat = now
+
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+            culprit, self.__culprit = self.__culprit, None
+            if lag >= self.threshold:
+                self.__record_stall(lag, culprit or _UNKNOWN)
+
+    def __record_stall(self, lag: float, culprit: Tuple[str, int | None]):
+        node_type, exec_id = culprit
+        self.stalls += 1
+        entry = self.by_node.setdefault(node_type, {"stalls": 0, "total_lag": 0.0, "max_lag": 0.0, "last_exec_id": None})
+        entry["stalls"] += 1
+        entry["total_lag"] += lag
+        entry["max_lag"] = max(entry["max_lag"], lag)
+        entry["last_exec_id"] = exec_id
+        logger.warning(f"Event loop blocked for {lag * 1000:.1f} ms by node {node_type} (exec {exec_id}), "
+                       "consider running it in an executor")
+
+    def __watchdog(self):
+        check_interval = min(self.interval, self.threshold) / 2
+        while not self.__stop.wait(check_interval):
+            overdue = time.perf_counter() - self.__last_beat - self.interval
+            if overdue >= self.threshold and self.__culprit is None:
+                # Whatever task holds the loop right now is the one blocking it
+                task = asyncio.current_task(self.__loop)
+                self.__culprit = self.__running.get(task, _UNKNOWN)
@@ -1,9 +1,13 @@
+import base64
 import struct
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import json
 
+from pydantic import BaseModel
+
 from intrepid_python_sdk.node import CustomEncoder
+from intrepid_python_sdk.cdr import CdrReader, CdrWriter, read_payload, write_payload
 
 class Opcode(Enum):
     READ = 1
@@ -26,12 +30,101 @@ class IntrepidMessage:
         self.priority = priority
 
     def serialize(self, cdr=True) -> bytes:
-        # TODO
-        return bytes()
+        """
+        Serialize the message.
+
+        With cdr=True the message is encoded as XCDR1 little-endian:
+
+            struct IntrepidMessage {
+                uint32 opcode;
+                int32 sec;        // timestamp, seconds since epoch (UTC)
+                uint32 nanosec;
+                string recipient;
+                int32 priority;
+                Payload payload;  // tagged union, see cdr.write_payload
+            };
+
+        Otherwise the message is encoded as UTF-8 JSON.
+        """
+        if not cdr:
+            return json.dumps(self.to_dict(), default=_json_default).encode("utf-8")
+
+        writer = CdrWriter()
+        self.write_cdr(writer)
+        return writer.getvalue()
+
+    def write_cdr(self, writer: CdrWriter):
+        sec, nanosec = _split_timestamp(self.timestamp)
+        writer.write_uint32(self.opcode.value)
+        writer.write_int32(sec)
+        writer.write_uint32(nanosec)
+        writer.write_string(self.recipient or "")
+        writer.write_int32(self.priority)
+        write_payload(writer, self.payload)
+
+    @classmethod
+    def deserialize(cls, data, cdr=True) -> "IntrepidMessage":
+        """
+        Deserialize a message produced by serialize().
+
+        CDR octet and float64 sequences in the payload are returned as
+        memoryviews over `data` (no copy).
+        """
+        if not cdr:
+            return cls.from_dict(json.loads(data))
+        return cls.read_cdr(CdrReader(data))
+
+    @classmethod
+    def read_cdr(cls, reader: CdrReader) -> "IntrepidMessage":
+        opcode = Opcode(reader.read_uint32())
+        sec = reader.read_int32()
+        nanosec = reader.read_uint32()
+        recipient = reader.read_string()
+        priority = reader.read_int32()
+        payload = read_payload(reader)
+        timestamp = datetime.fromtimestamp(sec, tz=timezone.utc) + timedelta(microseconds=nanosec // 1000)
+        return cls(opcode, payload, timestamp, recipient, priority)
+
+    def to_dict(self) -> dict:
+        return {
+            "opcode": self.opcode.name,
+            "timestamp": self.timestamp.isoformat(),
+            "recipient": self.recipient,
+            "priority": self.priority,
+            "payload": self.payload,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IntrepidMessage":
+        return cls(
+            Opcode[data["opcode"]],
+            data.get("payload"),
+            datetime.fromisoformat(data["timestamp"]),
+            data.get("recipient"),
+            data.get("priority", 0),
+        )
 
     def __str__(self):
         return f"IntrepidMessage(op={self.opcode}, payload={self.payload}, timestamp={self.timestamp}, recipient={self.recipient}, priority={self.priority})"
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _split_timestamp(timestamp: datetime) -> tuple[int, int]:
+    # UTC on the wire, naive timestamps are local time (datetime.now())
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    delta = timestamp - _EPOCH
+    return delta.days * 86400 + delta.seconds, delta.microseconds * 1000
+
+
+def _json_default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    return CustomEncoder().default(obj)
+
+
 class Container(Enum):
     SINGLE = 0,
     OPTION = 1,
@@ -0,0 +1,249 @@
+import asyncio
+import cProfile
+import inspect
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import signal
+import sys
+import threading
+import types
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+MODE_SAMPLING = "sampling"
+MODE_CPROFILE = "cprofile"
+
+
+class NodeProfiler:
+    """
+    Profiler for node functions, aggregated per node type.
+
+    Two modes are available:
+
+    - "sampling": a background thread periodically samples the stack of the
+      event loop thread and attributes every sample that falls inside a node
+      function to that node type. Results are collapsed stacks that can be
+      rendered with flamegraph.pl, speedscope or inferno.
+    - "cprofile": a fraction of the node calls runs under cProfile. Results
+      are merged into one pstats.Stats per node type. Async nodes are only
+      profiled while they run, not while they await.
+
+    Profiles are dumped to `output_dir` when `signum` is received, on a POST
+    to the `/profile` route of the node server or when dump() is called.
+
+    @param mode: "sampling" or "cprofile".
+    @param sample_rate: fraction of node calls profiled in "cprofile" mode.
+    @param interval: seconds between two stack samples in "sampling" mode.
+    @param output_dir: directory the profiles are dumped to.
+    @param signum: signal that triggers a dump. None disables the signal handler.
+    """
+
+    def __init__(
+        self,
+        mode: str = MODE_SAMPLING,
+        *,
+        sample_rate: float = 0.1,
+        interval: float = 0.005,
+        output_dir: str = "profiles",
+        signum: int | None = getattr(signal, "SIGUSR1", None),
+    ):
+        if mode not in (MODE_SAMPLING, MODE_CPROFILE):
+            raise ValueError(f"unsupported profiler mode: {mode}")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0")
+
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.output_dir = output_dir
+        self.signum = signum
+        self.calls: Counter = Counter()
+        self.profiled_calls: Counter = Counter()
+        self.__codes: Dict[Any, str] = {}
+        self.__stacks: Dict[str, Counter] = {}
+        self.__stats: Dict[str, pstats.Stats] = {}
+        self.__lock = threading.Lock()
+        self.__cprofile_active = False
+        self.__thread: threading.Thread | None = None
+        self.__stop = threading.Event()
+        self.__target_thread_id: int | None = None
+        self.__signal_loop: asyncio.AbstractEventLoop | None = None
+
+    def watch(self, node_type: str, func: Callable):
+        """
+        Attribute samples taken inside `func` to `node_type`.
+        """
+        # callable objects and functools.partial have no code, only their samples inside func are attributed
+        for code in (getattr(inspect.unwrap(func), "__code__", None), getattr(func, "__code__", None)):
+            if code is not None:
+                self.__codes[code] = node_type
+
+    def start(self):
+        """
+        Start profiling. Must be called from the event loop thread.
+        """
+        self.__target_thread_id = threading.get_ident()
+        if self.mode == MODE_SAMPLING and self.__thread is None:
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__sample_loop, name="intrepid-profiler", daemon=True)
+            self.__thread.start()
+        if self.signum is not None and threading.current_thread() is threading.main_thread():
+            # dump outside the signal handler: the handler can interrupt a holder of the lock
+            try:
+                loop = asyncio.get_running_loop()
+                loop.add_signal_handler(self.signum, lambda: loop.run_in_executor(None, self.__dump_logged))
+                self.__signal_loop = loop
+            except (RuntimeError, NotImplementedError):
+                signal.signal(self.signum, lambda _signum, _frame: threading.Thread(
+                    target=self.__dump_logged, name="intrepid-profiler-dump", daemon=True).start())
+
+    def stop(self):
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.__signal_loop is not None:
+            if not self.__signal_loop.is_closed():
+                self.__signal_loop.remove_signal_handler(self.signum)
+            self.__signal_loop = None
+
+    def __dump_logged(self):
+        try:
+            self.dump()
+        except Exception as e:
+            logger.error(f"Profile dump failed: {e}")
+
+    async def run(self, node_type: str, func: Callable, args: List[Any]) -> Any:
+        """
+        Call a node function, profiling it if this call is selected.
+        """
+        self.calls[node_type] += 1
+        if self.mode != MODE_CPROFILE or self.__cprofile_active or random.random() >= self.sample_rate:
+            if inspect.iscoroutinefunction(func):
+                return await func(*args)
+            return func(*args)
+
+        # Only one cProfile can be active per thread, overlapping async calls run unprofiled
+        self.__cprofile_active = True
+        profile = cProfile.Profile()
+        try:
+            if inspect.iscoroutinefunction(func):
+                return await _profiled(profile, func(*args))
+            profile.enable()
+            try:
+                return func(*args)
+            finally:
+                profile.disable()
+        finally:
+            self.__cprofile_active = False
+            self.profiled_calls[node_type] += 1
+            with self.__lock:
+                if node_type in self.__stats:
+                    self.__stats[node_type].add(profile)
+                else:
+                    self.__stats[node_type] = pstats.Stats(profile)
+
+    def node_types(self) -> List[str]:
+        with self.__lock:
+            return sorted(set(self.__stacks) | set(self.__stats))
+
+    def collapsed(self, node_type: str) -> str:
+        """
+        Return the samples of a node type as collapsed stacks ("frame;frame;frame count").
+        """
+        with self.__lock:
+            stacks = dict(self.__stacks.get(node_type, {}))
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+    def report(self, node_type: str, limit: int = 30) -> str:
+        """
+        Return a human readable report for a node type.
+        """
+        if self.mode == MODE_SAMPLING:
+            return self.collapsed(node_type)
+
+        out = io.StringIO()
+        with self.__lock:
+            stats = self.__stats.get(node_type)
+            if stats is not None:
+                stats.stream = out
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, output_dir: str | None = None) -> List[str]:
+        """
+        Write one profile file per node type and return their paths.
+        """
+        output_dir = output_dir or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for node_type in self.node_types():
+            name = re.sub(r"[^A-Za-z0-9_.-]", "_", node_type)
+            if self.mode == MODE_SAMPLING:
+                path = os.path.join(output_dir, f"{name}.collapsed")
+                with open(path, "w") as f:
+                    f.write(self.collapsed(node_type))
+            else:
+                path = os.path.join(output_dir, f"{name}.pstats")
+                with self.__lock:
+                    self.__stats[node_type].dump_stats(path)
+            paths.append(path)
+        logger.info(f"Dumped {len(paths)} node profiles to {output_dir}")
+        return paths
+
+    def __sample_loop(self):
+        while not self.__stop.wait(self.interval):
+            frame = sys._current_frames().get(self.__target_thread_id)
+            if frame is not None:
+                self.__sample(frame)
+            # Drop the reference so the sampled frames can be released
+            frame = None
+
+    def __sample(self, frame):
+        stack = []
+        node_type = None
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            node_type = self.__codes.get(code)
+            if node_type is not None:
+                break
+            frame = frame.f_back
+
+        if node_type is None:
+            return
+
+        stack.append(node_type)
+        key = ";".join(reversed(stack))
+        with self.__lock:
+            self.__stacks.setdefault(node_type, Counter())[key] += 1
+
+
+@types.coroutine
+def _profiled(profile: cProfile.Profile, coro):
+    """
+    Run a coroutine with `profile` enabled only between its suspensions, so
+    the other tasks running while it awaits are not attributed to it.
+    """
+    value, error = None, None
+    while True:
+        profile.enable()
+        try:
+            yielded = coro.send(value) if error is None else coro.throw(error)
+        except StopIteration as e:
+            return e.value
+        finally:
+            profile.disable()
+        try:
+            value, error = (yield yielded), None
+        except GeneratorExit:
+            coro.close()
+            raise
+        except BaseException as e:
+            value, error = None, e
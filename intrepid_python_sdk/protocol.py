@@ -27,6 +27,8 @@ class ExecCommand(BaseModel):
     exec_id: int
     time: int
     inputs: list[Any]
+    # indices of inputs unchanged since the previous exec of this node (sent as null)
+    unchanged: Optional[list[int]] = None
 
 class ExecReply(BaseModel):
     exec_id: int
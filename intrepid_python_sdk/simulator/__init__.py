@@ -1,4 +1,11 @@
 from .simulator import SimClient, Simulator, Entity, \
     WorldEntity, ObstacleType, \
     Vehicle, Sensor, Camera, AbstractSensor, \
-    Position, Rotation, Velocity, Acceleration
+    Position, Rotation, Velocity, Acceleration, STATE_FIELDS, \
+    SpawnSpec, OBSTACLE_MESHES, Detections, STATIC_GROUPS, OverrunPolicy
+from .frames import Frame, FrameDecoder, FrameSet, LatestFrameBuffer, decode_frame
+from .spatial import SpatialIndex
+from .timing import TickStats
+from .telemetry import TelemetryRecorder, Telemetry, read_telemetry
+from .stand_in import StandInSimulator, StandInEntity
+from .episodes import EpisodeRunner, EpisodeResult, Endpoint, StandInPool
@@ -0,0 +1,259 @@
+"""
+Parallel episode runner over a pool of simulator instances.
+
+Every endpoint (simulator host and port) gets one worker holding a
+connected Simulator. Workers take episodes from a shared queue, so the
+throughput grows with the number of simulator instances. The client side
+of an episode is mostly waiting for RPCs, so the workers are asyncio tasks
+of a single process.
+
+An episode failing on a simulator error (connection, RPC or timeout) is
+retried on the next free endpoint. The Simulator of the failing endpoint is
+reconnected, and an endpoint failing repeatedly in a row is retired from
+the pool. Any other exception raised by the episode function is reported in
+its result right away, the endpoint keeps its connection.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List
+
+from centrifuge import CentrifugeError
+
+from .simulator import Simulator
+from .stand_in import StandInSimulator
+
+logger = logging.getLogger(__name__)
+
+# Errors of the simulator endpoint rather than of the episode
+SIMULATOR_ERRORS = (CentrifugeError, asyncio.TimeoutError, OSError)
+
+
+class Endpoint:
+    """
+    Simulator instance of the pool.
+    """
+    __slots__ = ("host", "port", "episodes", "failures", "consecutive_failures", "retired")
+
+    def __init__(self, host: str = "localhost", port: int = 9120):
+        self.host = host
+        self.port = port
+        # episodes completed, failed attempts
+        self.episodes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.retired = False
+
+    def __repr__(self):
+        return f"<Endpoint {self.host}:{self.port} episodes={self.episodes} failures={self.failures}{' retired' if self.retired else ''}>"
+
+
+class EpisodeResult:
+    """
+    Outcome of an episode: `value` returned by the episode function, or the
+    `error` of its last attempt.
+    """
+    __slots__ = ("index", "params", "value", "error", "endpoint", "attempts", "duration")
+
+    def __init__(self, index: int, params: Any, value: Any = None, error: BaseException | None = None,
+                 endpoint: Endpoint | None = None, attempts: int = 1, duration: float = 0.0):
+        self.index = index
+        self.params = params
+        self.value = value
+        self.error = error
+        self.endpoint = endpoint
+        self.attempts = attempts
+        self.duration = duration
+
+    def __repr__(self):
+        outcome = f"error={self.error!r}" if self.error is not None else f"value={self.value!r}"
+        return f"<EpisodeResult index={self.index} {outcome} attempts={self.attempts}>"
+
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class EpisodeRunner:
+    """
+    Runs `await episode(sim, params)` for every params, spread over the
+    simulator endpoints.
+
+        runner = EpisodeRunner([("localhost", 9120), ("localhost", 9121)], episode)
+        results = await runner.run([{"gain": g} for g in gains])
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable["Endpoint | tuple[str, int]"],
+        episode: Callable[[Simulator, Any], Awaitable[Any]],
+        *,
+        max_attempts: int = 3,
+        max_consecutive_failures: int = 3,
+        reset: bool = True,
+        episode_timeout: float | None = None,
+        connect_timeout: float = 10.0,
+        simulator_kwargs: dict | None = None,
+    ):
+        """
+        @param endpoints: simulator instances, Endpoint or (host, port)
+        @param episode: async function of a connected Simulator and the episode params
+        @param max_attempts: attempts of an episode failing on simulator errors before the error is reported
+        @param max_consecutive_failures: simulator errors in a row before an endpoint is retired
+        @param reset: reset the simulator before every episode
+        @param episode_timeout: seconds before an episode attempt fails, None for no limit
+        @param connect_timeout: seconds to connect to an endpoint
+        @param simulator_kwargs: arguments of the Simulator of every endpoint, e.g. {"lockstep": True}
+        """
+        self.endpoints = [e if isinstance(e, Endpoint) else Endpoint(*e) for e in endpoints]
+        if not self.endpoints:
+            raise ValueError("EpisodeRunner needs at least one endpoint")
+        self.episode = episode
+        self.max_attempts = max_attempts
+        self.max_consecutive_failures = max_consecutive_failures
+        self.reset = reset
+        self.episode_timeout = episode_timeout
+        self.connect_timeout = connect_timeout
+        self.simulator_kwargs = simulator_kwargs or {}
+
+    async def run(self, params: Iterable[Any]) -> List[EpisodeResult]:
+        """
+        @return: one result per params, in order
+        """
+        results = [result async for result in self.iterate(params)]
+        return sorted(results, key=lambda result: result.index)
+
+    async def iterate(self, params: Iterable[Any]) -> AsyncIterator[EpisodeResult]:
+        """
+        Yield the episode results as they complete. To stop early, close
+        the generator so the episodes not started yet are dropped right away:
+
+            async with contextlib.aclosing(runner.iterate(params)) as results:
+                async for result in results:
+                    ...
+        """
+        params = list(params)
+        jobs: asyncio.Queue = asyncio.Queue()
+        for index, item in enumerate(params):
+            jobs.put_nowait((index, item, 1))
+        done: asyncio.Queue = asyncio.Queue()
+        remaining = len(params)
+
+        workers = [asyncio.create_task(self.__worker(endpoint, jobs, done))
+                   for endpoint in self.endpoints if not endpoint.retired]
+        running = set(workers)
+        try:
+            while remaining:
+                if done.empty() and not running:
+                    # every endpoint retired, report the episodes left
+                    while not jobs.empty():
+                        index, item, attempts = jobs.get_nowait()
+                        remaining -= 1
+                        yield EpisodeResult(index, item, error=RuntimeError("no simulator endpoint left"), attempts=attempts - 1)
+                    break
+                getter = asyncio.ensure_future(done.get())
+                finished, _ = await asyncio.wait([getter, *running], return_when=asyncio.FIRST_COMPLETED)
+                running -= finished
+                if getter.done():
+                    remaining -= 1
+                    yield getter.result()
+                else:
+                    getter.cancel()
+        finally:
+            # on early exit drop the episodes not started, workers finish their
+            # current one (cancelling them mid-RPC breaks the centrifuge client)
+            while True:
+                try:
+                    jobs.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+            for _ in workers:
+                jobs.put_nowait(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def __worker(self, endpoint: Endpoint, jobs: asyncio.Queue, done: asyncio.Queue):
+        sim = None
+        try:
+            while (job := await jobs.get()) is not None:
+                index, params, attempt = job
+                started = time.perf_counter()
+                try:
+                    if sim is None:
+                        sim = await self.__connect(endpoint)
+                    if self.reset:
+                        await sim.reset()
+                    value = await asyncio.wait_for(self.episode(sim, params), self.episode_timeout)
+                except SIMULATOR_ERRORS as e:
+                    endpoint.failures += 1
+                    endpoint.consecutive_failures += 1
+                    logger.warning(f"Episode {index} failed on {endpoint.host}:{endpoint.port} (attempt {attempt}): {e!r}")
+                    if attempt < self.max_attempts:
+                        jobs.put_nowait((index, params, attempt + 1))
+                    else:
+                        done.put_nowait(EpisodeResult(index, params, error=e, endpoint=endpoint, attempts=attempt,
+                                                      duration=time.perf_counter() - started))
+                    # start over with a new connection
+                    await self.__close(sim)
+                    sim = None
+                    if endpoint.consecutive_failures >= self.max_consecutive_failures:
+                        logger.error(f"Retiring simulator endpoint {endpoint.host}:{endpoint.port}")
+                        endpoint.retired = True
+                        return
+                    continue
+                except Exception as e:
+                    # error of the episode itself, the simulator is fine
+                    logger.warning(f"Episode {index} raised on {endpoint.host}:{endpoint.port}: {e!r}")
+                    done.put_nowait(EpisodeResult(index, params, error=e, endpoint=endpoint, attempts=attempt,
+                                                  duration=time.perf_counter() - started))
+                    continue
+
+                endpoint.episodes += 1
+                endpoint.consecutive_failures = 0
+                done.put_nowait(EpisodeResult(index, params, value=value, endpoint=endpoint, attempts=attempt,
+                                              duration=time.perf_counter() - started))
+        finally:
+            await self.__close(sim)
+
+    async def __connect(self, endpoint: Endpoint) -> Simulator:
+        sim = Simulator(endpoint.host, endpoint.port, **self.simulator_kwargs)
+        try:
+            await asyncio.wait_for(sim.connect(), self.connect_timeout)
+        except BaseException:
+            await self.__close(sim)
+            raise
+        return sim
+
+    async def __close(self, sim: Simulator | None):
+        if sim is None:
+            return
+        try:
+            await asyncio.wait_for(sim.disconnect(), self.connect_timeout)
+        except Exception as e:
+            logger.debug(f"Simulator disconnect failed: {e!r}")
+
+
+class StandInPool:
+    """
+    Local stand-in simulators serving as EpisodeRunner endpoints.
+
+        async with StandInPool(4) as endpoints:
+            results = await EpisodeRunner(endpoints, episode).run(params)
+    """
+
+    def __init__(self, count: int, host: str = "127.0.0.1", **kwargs):
+        """
+        @param count: stand-in simulators to start
+        @param kwargs: StandInSimulator options, e.g. rpc_latency
+        """
+        self.stand_ins = [StandInSimulator(host, 0, **kwargs) for _ in range(count)]
+        self.endpoints: List[Endpoint] = []
+
+    async def __aenter__(self) -> List[Endpoint]:
+        for stand_in in self.stand_ins:
+            await stand_in.start()
+        self.endpoints = [Endpoint(stand_in.host, stand_in.port) for stand_in in self.stand_ins]
+        return self.endpoints
+
+    async def __aexit__(self, *exc):
+        for stand_in in self.stand_ins:
+            await stand_in.stop()
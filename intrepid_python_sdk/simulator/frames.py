@@ -0,0 +1,226 @@
+"""
+Camera frame decoding off the event loop.
+
+Cameras return their images as base64 data URLs (PNG, TIFF for depth).
+Decoding them is CPU bound, so it runs in a worker pool: a thread pool by
+default (the image codecs release the GIL), or any executor given to
+FrameDecoder (decode_frame is a module level function, so a process pool
+works too).
+
+Images are decoded with OpenCV when installed, otherwise with Pillow.
+Colour frames are returned in RGB(A) order with both backends.
+"""
+
+import asyncio
+import base64
+import io
+import logging
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Iterable, List
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+def split_data_url(data: str) -> tuple[str, bytes]:
+    """
+    @param data: "data:<mime>;base64,<payload>" string
+    @return: mime type and decoded payload
+    """
+    header, separator, encoded = data.partition("base64,")
+    if not separator:
+        raise ValueError("Camera image is not a base64 data URL")
+    mime = header[len("data:"):].rstrip(";") if header.startswith("data:") else ""
+    return mime, base64.b64decode(encoded)
+
+
+def decode_image(payload: bytes) -> np.ndarray:
+    """
+    Decode an encoded image (PNG, TIFF, ...) into an array of shape
+    (height, width) or (height, width, channels).
+    """
+    if cv2 is not None:
+        image = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise ValueError("Cannot decode camera image")
+        if image.ndim == 3 and image.shape[2] == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        elif image.ndim == 3 and image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+        return image
+    if Image is not None:
+        with Image.open(io.BytesIO(payload)) as image:
+            return np.asarray(image)
+    raise ImportError("Decoding camera frames requires opencv-python or pillow")
+
+
+def decode_frame(data: str | bytes) -> np.ndarray:
+    """
+    Decode a camera image, either a data URL as returned by Camera.capture()
+    or the raw encoded bytes.
+    """
+    if isinstance(data, str):
+        _, data = split_data_url(data)
+    return decode_image(data)
+
+
+class Frame:
+    """
+    Decoded camera frame.
+    """
+    __slots__ = ("image", "entity", "tick", "sequence")
+
+    def __init__(self, image: np.ndarray, entity: str | None = None, tick: int | None = None, sequence: int = 0):
+        """
+        @param image: decoded image
+        @param entity: camera entity
+        @param tick: simulator tick (microseconds) the image was requested at, None if unknown
+        @param sequence: capture number within a stream
+        """
+        self.image = image
+        self.entity = entity
+        self.tick = tick
+        self.sequence = sequence
+
+    def __repr__(self):
+        return f"<Frame entity='{self.entity}' tick={self.tick} shape={self.image.shape}>"
+
+
+class FrameSet:
+    """
+    Frames of several cameras captured in the same simulation step.
+    """
+    __slots__ = ("tick", "frames")
+
+    def __init__(self, tick: int | None, frames: List[Frame]):
+        self.tick = tick
+        self.frames = frames
+
+    def __repr__(self):
+        return f"<FrameSet tick={self.tick} frames={len(self.frames)}>"
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __getitem__(self, index: int) -> Frame:
+        return self.frames[index]
+
+    def by_entity(self, entity: str) -> Frame | None:
+        for frame in self.frames:
+            if frame.entity == entity:
+                return frame
+        return None
+
+    def images(self) -> List[np.ndarray]:
+        return [frame.image for frame in self.frames]
+
+    def stack(self) -> np.ndarray:
+        """
+        @return: images stacked on a new first axis, cameras must share size and format
+        """
+        return np.stack(self.images())
+
+
+class FrameDecoder:
+    """
+    Decodes camera frames in a worker pool.
+    """
+
+    def __init__(self, max_workers: int | None = None, executor: Executor | None = None):
+        """
+        @param max_workers: threads of the default thread pool
+        @param executor: executor to use instead of the default thread pool (not shut down by the decoder)
+        """
+        self.__owned = executor is None
+        self.__executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="intrepid-frames")
+
+    async def decode(self, data: str | bytes) -> np.ndarray:
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, decode_frame, data)
+
+    async def decode_many(self, data: Iterable[str | bytes]) -> List[np.ndarray]:
+        """
+        Decode several images in parallel, results in order.
+        """
+        return list(await asyncio.gather(*[self.decode(item) for item in data]))
+
+    def shutdown(self, wait: bool = True):
+        if self.__owned:
+            self.__executor.shutdown(wait=wait)
+
+
+_default_decoder: FrameDecoder | None = None
+
+
+def default_decoder() -> FrameDecoder:
+    """
+    Decoder shared by the cameras that were not given one.
+    """
+    global _default_decoder
+    if _default_decoder is None:
+        _default_decoder = FrameDecoder()
+    return _default_decoder
+
+
+class LatestFrameBuffer:
+    """
+    Bounded buffer keeping the most recent frames. A full buffer drops its
+    oldest frame, so a slow consumer always gets fresh frames instead of a
+    growing backlog.
+    """
+
+    def __init__(self, maxlen: int = 1):
+        self.__frames: deque = deque(maxlen=maxlen)
+        self.__ready = asyncio.Event()
+        self.__error: BaseException | None = None
+        self.__closed = False
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.__frames)
+
+    def put(self, frame: Any):
+        if len(self.__frames) == self.__frames.maxlen:
+            self.dropped += 1
+        self.__frames.append(frame)
+        self.__ready.set()
+
+    def fail(self, error: BaseException):
+        """
+        Raise `error` in the consumer once the buffered frames are consumed.
+        """
+        self.__error = error
+        self.__ready.set()
+
+    def close(self):
+        self.__closed = True
+        self.__ready.set()
+
+    async def get(self) -> Any:
+        """
+        Wait for the next frame.
+
+        @return: the oldest buffered frame, None once the buffer is closed and empty
+        """
+        while not self.__frames:
+            if self.__error is not None:
+                raise self.__error
+            if self.__closed:
+                return None
+            self.__ready.clear()
+            await self.__ready.wait()
+        return self.__frames.popleft()
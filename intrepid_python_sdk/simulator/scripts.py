@@ -0,0 +1,97 @@
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Short script calling a prepared function by name, the same for every script
+CALL_SCRIPT = """-- intrepid:call
+local f = _INTREPID and _INTREPID[ARGS.name]
+if f == nil then return { missing = true } end
+return { result = f(ARGS.args) }
+"""
+
+
+class LuaScript:
+    """
+    Lua snippet declared once and evaluated by the simulator with script.eval.
+
+    The body reads its arguments from ARGS and returns its result. When
+    prepared, the body is installed as a function of the global _INTREPID
+    table on first use (and whenever the simulator lost it), and later calls
+    only send CALL_SCRIPT with the script name and its arguments.
+    """
+
+    def __init__(self, name: str, body: str):
+        """
+        @param name: unique script name, also used to tag the source ("-- intrepid:<name>")
+        @param body: Lua code using ARGS and returning the result
+        """
+        self.name = name
+        self.body = body
+        # plain source, evaluated as is
+        self.source = f"-- intrepid:{name}\n{body}"
+        # installs the function and calls it in the same evaluation
+        self.install_source = (
+            f"-- intrepid:{name}\n"
+            f"_INTREPID = _INTREPID or {{}}\n"
+            f"_INTREPID[\"{name}\"] = function(ARGS)\n{body}\nend\n"
+            f"return {{ result = _INTREPID[\"{name}\"](ARGS) }}\n"
+        )
+
+    def __repr__(self):
+        return f"<LuaScript name='{self.name}'>"
+
+
+class ScriptRunner:
+    """
+    Evaluates LuaScripts on a centrifuge client, as prepared functions when
+    possible.
+
+    If the simulator keeps losing the installed functions (a new Lua state
+    per evaluation), the runner stops preparing and evaluates the full source.
+    """
+
+    # consecutive reinstalls without a successful short call before giving up
+    MAX_REINSTALLS = 2
+
+    def __init__(self, client, prepared: bool = True):
+        self.__client = client
+        self.prepared = prepared
+        self.__installed: set[str] = set()
+        self.__reinstalls = 0
+        self.installs = 0
+        self.calls = 0
+
+    def reset(self):
+        """
+        Forget installed functions, e.g. after a simulator restart.
+        """
+        self.__installed.clear()
+
+    async def run(self, script: LuaScript, args: Any = None) -> Any:
+        if not self.prepared:
+            response = await self.__client.rpc("script.eval", {"code": script.source, "args": args})
+            return response.data
+
+        if script.name in self.__installed:
+            response = await self.__client.rpc("script.eval", {
+                "code": CALL_SCRIPT,
+                "args": {"name": script.name, "args": args},
+            })
+            data = response.data or {}
+            if not data.get("missing"):
+                self.calls += 1
+                self.__reinstalls = 0
+                return data.get("result")
+            # the simulator lost the function, install it again
+            self.__installed.discard(script.name)
+            self.__reinstalls += 1
+            if self.__reinstalls > self.MAX_REINSTALLS:
+                logger.warning("Simulator does not keep prepared scripts, sending full scripts")
+                self.prepared = False
+                return await self.run(script, args)
+
+        response = await self.__client.rpc("script.eval", {"code": script.install_source, "args": args})
+        self.__installed.add(script.name)
+        self.installs += 1
+        return (response.data or {}).get("result")
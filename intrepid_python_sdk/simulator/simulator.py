@@ -1,6 +1,6 @@
 import asyncio
 from centrifuge import Client, SubscriptionEventHandler, PublicationContext
-# import numpy as np
+import numpy as np
 import scipy as sp
 
 import logging
@@ -11,9 +11,18 @@ import math
 from typing import List
 from enum import Enum
 
+import functools
 from functools import partial
+from itertools import chain
 import logging
 
+from .. import ga
+from .frames import Frame, FrameDecoder, FrameSet, LatestFrameBuffer, default_decoder
+from .scripts import LuaScript, ScriptRunner
+from .spatial import SpatialIndex
+from .timing import TickStats
+from ..intrepid_types import Rotor3, Rotor3Array, Vec3Array
+
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -57,6 +66,27 @@ class ObstacleType(IntrepidEnum):
     # def to_string(self):
     #     return self.name.lower()
 
+# Mesh of the obstacle types shipped with the simulator assets
+# (BUILDING3, BUILDING4, BENCH1 and BENCH2 have no mesh yet and cannot be spawned)
+OBSTACLE_MESHES = {
+    ObstacleType.TREE1: "trees/tree_a.glb",
+    ObstacleType.TREE2: "trees/tree_b.glb",
+    ObstacleType.BUILDING1: "buildings/building1.glb",
+    ObstacleType.BUILDING2: "buildings/building2.glb",
+}
+
+class OverrunPolicy(IntrepidEnum):
+    """
+    What the sync loop does with ticks received while on_tick is still running.
+
+    SKIP: drop them, the next callback runs once the current one finished
+    QUEUE_LATEST: keep the latest one and run the callback for it right after the current one
+    BLOCK: hold the simulator, the next sync is published only when the callback finished
+    """
+    SKIP=1
+    QUEUE_LATEST=2
+    BLOCK=3
+
 class Color(IntrepidEnum):
     RED=1,
     GREEN=2,
@@ -64,28 +94,48 @@ class Color(IntrepidEnum):
     BLACK=4,
 
 class Vec3:
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x=0.0, y=0.0, z=0.0):
         self.x = x
         self.y = y
         self.z = z
 
+    # Arithmetic keeps the concrete type (Position + Vec3 is a Position) and
+    # always returns a new instance, `p += v` rebinds p. Use set() to update in place.
     def __add__(self, other):
-        return Vec3(self.x + other.x, self.y + other.y, self.z + other.z)
+        return self.__class__(self.x + other.x, self.y + other.y, self.z + other.z)
 
     def __sub__(self, other):
-        return Vec3(self.x - other.x, self.y - other.y, self.z - other.z)
+        return self.__class__(self.x - other.x, self.y - other.y, self.z - other.z)
 
     def __mul__(self, scalar):
-        return Vec3(self.x * scalar, self.y * scalar, self.z * scalar)
+        return self.__class__(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    __rmul__ = __mul__
 
     def __truediv__(self, scalar):
-        return Vec3(self.x / scalar, self.y / scalar, self.z / scalar)
+        return self.__class__(self.x / scalar, self.y / scalar, self.z / scalar)
+
+    def __neg__(self):
+        return self.__class__(-self.x, -self.y, -self.z)
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+        yield self.z
+
+    def set(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
 
     def dot(self, other):
         return self.x * other.x + self.y * other.y + self.z * other.z
 
     def cross(self, other):
-        return Vec3(
+        return self.__class__(
             self.y * other.z - self.z * other.y,
             self.z * other.x - self.x * other.z,
             self.x * other.y - self.y * other.x
@@ -96,15 +146,36 @@ class Vec3:
 
     def normalize(self):
         l = self.length()
-        return self / l if l != 0 else Vec3()
+        return self / l if l != 0 else self.__class__()
 
     def to_dict(self):
         return {"x": self.x, "y": self.y, "z": self.z}
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data.get("x", 0.0), data.get("y", 0.0), data.get("z", 0.0))
+
+    @classmethod
+    def from_array(cls, array) -> list:
+        """
+        Build one instance per row of an (N, 3) array.
+        """
+        return [cls(x, y, z) for x, y, z in np.asarray(array, dtype=np.float64).reshape(-1, 3).tolist()]
+
+    @staticmethod
+    def to_array(values) -> Vec3Array:
+        """
+        Pack a sequence of vectors into an (N, 3) float64 array.
+        """
+        flat = np.fromiter(chain.from_iterable((v.x, v.y, v.z) for v in values), dtype=np.float64, count=3 * len(values))
+        return Vec3Array(flat.reshape(-1, 3))
+
     def __repr__(self):
-        return f"Vec3({self.x}, {self.y}, {self.z})"
+        return f"{self.__class__.__name__}({self.x}, {self.y}, {self.z})"
 
 class Position(Vec3):
+    __slots__ = ()
+
     def __init__(self, x=0.0, y=0.0, z=0.0):
         super().__init__(x, y, z)
 
@@ -113,29 +184,305 @@ class Position(Vec3):
                 (self.y - target.y) ** 2 +
                 (self.z - target.z) ** 2) ** 0.5
 
+    @staticmethod
+    def distances(a, b) -> np.ndarray:
+        """
+        Element-wise distances between two batches of positions (or (N, 3)
+        arrays), broadcasting a single position against a batch.
+        """
+        return np.linalg.norm(_as_points(a) - _as_points(b), axis=-1)
+
+    @staticmethod
+    def distance_matrix(a, b) -> np.ndarray:
+        """
+        (N, M) matrix of the distances between every position of `a` and of `b`.
+        """
+        a = _as_points(a).reshape(-1, 3)
+        b = _as_points(b).reshape(-1, 3)
+        return np.linalg.norm(a[:, None, :] - b[None, :, :], axis=-1)
+
+def _as_points(values) -> np.ndarray:
+    if isinstance(values, Vec3):
+        return np.array([values.x, values.y, values.z])
+    if isinstance(values, np.ndarray):
+        return values
+    if len(values) and isinstance(values[0], Vec3):
+        return Vec3.to_array(values)
+    return np.asarray(values, dtype=np.float64)
+
 class Rotation:
+    """
+    Rotation angles (radians) in the yz, zx and xy planes, i.e. roll, pitch
+    and yaw, as exchanged with the simulator. Use to_rotor/from_rotor to
+    convert to intrepid_types.Rotor3.
+    """
+    __slots__ = ("yz", "zx", "xy")
+
     def __init__(self, roll=0.0, pitch=0.0, yaw=0.0):  # Could represent Euler angles
         self.yz = roll
         self.zx = pitch
         self.xy = yaw
 
+    @property
+    def roll(self):
+        return self.yz
+
+    @property
+    def pitch(self):
+        return self.zx
+
+    @property
+    def yaw(self):
+        return self.xy
+
     def to_dict(self):
         return {"yz": self.yz, "zx": self.zx, "xy": self.xy}
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data.get("yz", 0.0), data.get("zx", 0.0), data.get("xy", 0.0))
+
+    def to_rotor(self) -> Rotor3:
+        s, yz, zx, xy = ga.rotor_from_euler(self.yz, self.zx, self.xy).tolist()
+        return Rotor3(s=s, yz=yz, zx=zx, xy=xy)
+
+    @classmethod
+    def from_rotor(cls, rotor: Rotor3):
+        roll, pitch, yaw = ga.rotor_to_euler([rotor.s, rotor.yz, rotor.zx, rotor.xy]).tolist()
+        return cls(roll, pitch, yaw)
+
+    @classmethod
+    def from_array(cls, array) -> list:
+        """
+        Build one rotation per row of an (N, 3) array of [roll, pitch, yaw].
+        """
+        return [cls(roll, pitch, yaw) for roll, pitch, yaw in np.asarray(array, dtype=np.float64).reshape(-1, 3).tolist()]
+
+    @staticmethod
+    def to_array(values) -> np.ndarray:
+        """
+        Pack rotations into an (N, 3) array of [roll, pitch, yaw].
+        """
+        flat = np.fromiter(chain.from_iterable((r.yz, r.zx, r.xy) for r in values), dtype=np.float64, count=3 * len(values))
+        return flat.reshape(-1, 3)
+
+    @staticmethod
+    def to_rotors(values) -> Rotor3Array:
+        angles = Rotation.to_array(values)
+        return ga.rotor_from_euler(angles[:, 0], angles[:, 1], angles[:, 2])
+
+    def __repr__(self):
+        return f"Rotation({self.yz}, {self.zx}, {self.xy})"
+
 class Velocity(Vec3):
+    __slots__ = ()
+
     def __init__(self, x=0.0, y=0.0, z=0.0):
         super().__init__(x, y, z)
 
+class Acceleration(Vec3):
+    __slots__ = ()
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        super().__init__(x, y, z)
+
+# Simulator Lua API the scripts of this module rely on (evaluated with script.eval,
+# arguments in the global ARGS, prepared scripts stored in the global _INTREPID table)
+LUA_API = {
+    "sim.map.find_all": "({groups}) -> array of {entity, group}",
+    "sim.map.intersection_with_sphere": "({center, radius, groups, anchor, exclude}) -> array of {entity, group}",
+    "sim.map.spawn_uav": "({robot_id, position, rotation}) -> entity",
+    "sim.map.spawn_ugv": "({robot_id, position, rotation}) -> entity",
+    "sim.map.spawn": "({mesh, position, rotation}) -> entity, raises on failure",
+    "sim.map.spawn_road": "({src = {x, y}, dst = {x, y}}) -> entity or nil",
+    "sim.map.spawn_goal": "({position, radius, height}) -> entity or nil",
+    "sim.object.position": "(entity) -> {x, y, z}",
+    "sim.object.gps_position": "(entity) -> {x, y, z}, nil without GPS",
+    "sim.object.rotation_angles": "(entity) -> {yz, zx, xy}",
+    "sim.object.linear_velocity": "(entity) -> {x, y, z}",
+    "sim.object.angular_velocity": "(entity) -> {x, y, z}",
+    "sim.object.acceleration": "(entity) -> {x, y, z}",
+    "sim.object.get_robot_id": "(entity) -> vehicle id, nil for other entities",
+    "sim.object.compute_aabb": "(entity) -> {min = {x, y, z}, max = {x, y, z}}",
+    "sim.object.compute_bounding_sphere": "(entity) -> {center = {x, y, z}, radius}",
+    "sim.object.request_image": "(camera entity) -> {data}",
+}
+
+# Entity state fields and the Lua function returning each of them
+STATE_FIELDS = {
+    "global_position": "sim.object.gps_position",
+    "local_position": "sim.object.position",
+    "rotation": "sim.object.rotation_angles",
+    "lin_vel": "sim.object.linear_velocity",
+    "ang_vel": "sim.object.angular_velocity",
+    "accel": "sim.object.acceleration",
+}
+
+# Fields returned as (N, 3) vectors by get_states(as_arrays=True)
+VECTOR_FIELDS = ("global_position", "local_position", "lin_vel", "ang_vel", "accel")
+
+GET_STATES_SCRIPT = LuaScript("get_states", """
+    local getters = {
+        %s
+    }
+    local result = {}
+    for idx = 1, #ARGS.entities do
+        local entity = ARGS.entities[idx]
+        local state = {}
+        for f = 1, #ARGS.fields do
+            local field = ARGS.fields[f]
+            state[field] = getters[field](entity)
+        end
+        result[idx] = state
+    end
+    return result
+""" % ",\n        ".join(f"{field} = {getter}" for field, getter in STATE_FIELDS.items()))
+
+# Return all vehicles with vehicle ids attached to them
+FIND_VEHICLES_SCRIPT = LuaScript("find_vehicles", """
+    local result = {}
+    local found = sim.map.find_all({
+        groups = { "vehicle" },
+    })
+    for idx = 1, #found do
+        local vehicle_id = sim.object.get_robot_id(found[idx].entity)
+        table.insert(result, {
+            id = vehicle_id,
+            entity = found[idx].entity,
+        })
+    end
+    return result
+""")
+
+# Spawn a list of {kind, params}, the params of every kind are those of the map.spawn_* RPCs
+SPAWN_MANY_SCRIPT = LuaScript("spawn_many", """
+    local spawners = {
+        uav = sim.map.spawn_uav,
+        ugv = sim.map.spawn_ugv,
+        obstacle = sim.map.spawn,
+        road = sim.map.spawn_road,
+        goal = sim.map.spawn_goal,
+    }
+    local result = {}
+    for idx = 1, #ARGS do
+        local spec = ARGS[idx]
+        -- a failed spawn does not abort the batch
+        local ok, spawned = pcall(spawners[spec.kind], spec.params)
+        if ok then
+            -- keep the array dense, spawners without result return false
+            result[idx] = spawned or false
+        else
+            result[idx] = { error = tostring(spawned) }
+        end
+    end
+    return result
+""")
+
+# Images of a list of cameras, all rendered in the same simulation step
+CAPTURE_ALL_SCRIPT = LuaScript("capture_all", """
+    local images = {}
+    for idx = 1, #ARGS do
+        images[idx] = sim.object.request_image(ARGS[idx]).data
+    end
+    return images
+""")
+
+# Bounding spheres of a list of entities, flat [x, y, z, radius, ...]
+ENTITY_BOUNDS_SCRIPT = LuaScript("entity_bounds", """
+    local result = {}
+    for idx = 1, #ARGS do
+        local sphere = sim.object.compute_bounding_sphere(ARGS[idx])
+        table.insert(result, sphere.center.x)
+        table.insert(result, sphere.center.y)
+        table.insert(result, sphere.center.z)
+        table.insert(result, sphere.radius)
+    end
+    return result
+""")
+
+# Groups of the entities that do not move, indexed by Simulator.build_spatial_index
+STATIC_GROUPS = ("obstacle", "tree")
+
+class SpawnSpec:
+    """
+    Description of an object spawned by Simulator.spawn_many.
+    Positions and rotations are Position/Rotation objects or [x, y, z] / [yz, zx, xy] lists.
+    """
+    __slots__ = ("kind", "params", "vehicle_id", "group")
+
+    def __init__(self, kind: str, params: dict, vehicle_id: int | None = None, group: str | None = None):
+        self.kind = kind
+        self.params = params
+        self.vehicle_id = vehicle_id
+        self.group = group
+
     def __repr__(self):
-        return f"Velocity({self.x}, {self.y}, {self.z})"
+        return f"<SpawnSpec kind={self.kind} params={self.params}>"
 
     @classmethod
-    def from_dict(data: dict):
-        return Velocity(data.get("x", 0.0), data.get("y", 0.0), data.get("z", 0.0))
+    def uav(cls, vehicle_id: int, position, rotation=None):
+        return cls("uav", {"robot_id": vehicle_id, "position": _vec3_dict(position), "rotation": _rotation_dict(rotation)}, vehicle_id, "vehicle")
 
-class Acceleration(Vec3):
-    def __init__(self, x=0.0, y=0.0, z=0.0):
-        super().__init__(x, y, z)
+    @classmethod
+    def ugv(cls, vehicle_id: int, position, rotation=None):
+        return cls("ugv", {"robot_id": vehicle_id, "position": _vec3_dict(position), "rotation": _rotation_dict(rotation)}, vehicle_id, "vehicle")
+
+    @classmethod
+    def obstacle(cls, obstacle_type: ObstacleType, position, rotation=None):
+        if obstacle_type not in OBSTACLE_MESHES:
+            raise ValueError(f"no mesh for obstacle type {obstacle_type}")
+        return cls("obstacle", {"mesh": OBSTACLE_MESHES[obstacle_type], "position": _vec3_dict(position), "rotation": _rotation_dict(rotation)}, group="obstacle")
+
+    @classmethod
+    def road(cls, src, dest):
+        src, dest = _vec3_dict(src), _vec3_dict(dest)
+        return cls("road", {"src": {"x": src["x"], "y": src["y"]}, "dst": {"x": dest["x"], "y": dest["y"]}})
+
+    @classmethod
+    def goal(cls, position, radius: float | None = None, height: float | None = None):
+        return cls("goal", {"position": _vec3_dict(position), "radius": radius, "height": height}, group="goal")
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "params": self.params}
+
+def _vec3_dict(value) -> dict:
+    if isinstance(value, Vec3):
+        return value.to_dict()
+    x, y, *z = value
+    return {"x": x, "y": y, "z": z[0] if z else 0.0}
+
+def _rotation_dict(value) -> dict:
+    if value is None:
+        return {"yz": 0.0, "zx": 0.0, "xy": 0.0}
+    if isinstance(value, Rotation):
+        return value.to_dict()
+    yz, zx, xy = value
+    return {"yz": yz, "zx": zx, "xy": xy}
+
+def _state_value(state, field: str) -> dict | None:
+    value = state.get(field) if isinstance(state, dict) else None
+    return value if isinstance(value, dict) else None
+
+def _copy_value(value: dict | None) -> dict | None:
+    return dict(value) if value is not None else None
+
+class TimedClient(Client):
+    """
+    Centrifuge client accumulating the number and duration of RPCs.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rpc_count = 0
+        self.rpc_seconds = 0.0
+
+    async def rpc(self, method: str, data, timeout: float | None = None):
+        start = time.perf_counter()
+        try:
+            return await super().rpc(method, data, timeout)
+        finally:
+            self.rpc_count += 1
+            self.rpc_seconds += time.perf_counter() - start
 
 class SimClient:
     def __init__(self, host="localhost", port=9120):
@@ -143,14 +490,34 @@ class SimClient:
         self.__host = host
         self.__port = port
         # self.__step_duration = step_duration  # simulation step in microseconds
-        self.__client = Client(f"ws://{self.__host}:{self.__port}/connection/websocket")
+        self.__client = TimedClient(f"ws://{self.__host}:{self.__port}/connection/websocket")
         logger.info(f"Connected to Intrepid Sim on {self.__host}:{self.__port}")
         # asyncio.ensure_future(self.__client.connect())
         self.__is_connected = False
+        self.__scripts = ScriptRunner(self.__client)
+        # Entity states read during the current sync tick, {entity: {field: value}}
+        self.__tick = None
+        self.__snapshot: dict[str, dict] = {}
+        # bumped by every write, states read across a write are not cached
+        self.__writes = 0
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        # Handles of the known entities, {entity: Entity} and {vehicle id: Vehicle}
+        self.__entities: dict[str, "Entity"] = {}
+        self.__vehicles: dict[int, "Vehicle"] = {}
+        # local index of static entities, see Simulator.build_spatial_index
+        self.__spatial_index: SpatialIndex | None = None
+        self.__spatial_groups = frozenset(STATIC_GROUPS)
 
     def is_connected(self) -> bool:
         return self.__is_connected
 
+    def rpc_totals(self) -> tuple[int, float]:
+        """
+        @return: number of RPCs sent and seconds spent waiting for their replies
+        """
+        return self.__client.rpc_count, self.__client.rpc_seconds
+
     async def connect(self):
         await self.__client.connect()
         self.__is_connected = True
@@ -166,6 +533,17 @@ class SimClient:
 
     async def reset(self):
         await self.__client.rpc(f"session.restart", None)
+        self.__scripts.reset()
+
+    async def run_script(self, script: LuaScript, args=None):
+        """
+        Evaluate a declared Lua script, installed once in the simulator and
+        then called by name.
+        """
+        return await self.__scripts.run(script, args)
+
+    def scripts(self) -> ScriptRunner:
+        return self.__scripts
 
     async def pause(self):
         await self.__client.rpc(f"session.pause", None)
@@ -177,28 +555,8 @@ class SimClient:
         await self.__client.rpc(f"session.run", { "speed": speed_factor })
 
     async def get_vehicles(self):
-        response = await self.__client.rpc('script.eval', {
-            "code": """
-                -- Return all vehicles with vehicle ids attached to them
-                function find_vehicles()
-                    local result = {}
-                    local found = sim.map.find_all({
-                        groups = { "vehicle" },
-                    })
-                    for idx = 1, #found do
-                        local vehicle_id = sim.object.get_robot_id(found[idx].entity)
-                        table.insert(result, {
-                            id = vehicle_id,
-                            entity = found[idx].entity,
-                        })
-                    end
-                    return result
-                end
-
-                return find_vehicles()
-            """
-        })
-        return [(v["id"], v["entity"]) for v in response.data ]
+        vehicles = await self.run_script(FIND_VEHICLES_SCRIPT)
+        return [(v["id"], v["entity"]) for v in vehicles or []]
         # return [ Vehicle(self, v["id"], v["entity"]) for v in response.data ]
 
     async def get_entities(self, groups: List[str] | None = None):
@@ -208,6 +566,164 @@ class SimClient:
 
         return [ (e["entity"], e["group"]) for e in response.data ]
 
+    def register(self, entity: "Entity") -> "Entity":
+        """
+        Add an entity handle to the registry, vehicles are also indexed by id.
+        """
+        self.__entities[entity.entity()] = entity
+        if isinstance(entity, Vehicle):
+            self.__vehicles[entity.id()] = entity
+        return entity
+
+    def unregister(self, entity: str):
+        self.invalidate(entity)
+        handle = self.__entities.pop(entity, None)
+        if isinstance(handle, Vehicle) and self.__vehicles.get(handle.id()) is handle:
+            del self.__vehicles[handle.id()]
+        if self.__spatial_index is not None:
+            self.__spatial_index.remove(entity)
+
+    def clear_registry(self):
+        self.invalidate()
+        self.__entities.clear()
+        self.__vehicles.clear()
+        self.__spatial_index = None
+
+    def spatial_index(self) -> SpatialIndex | None:
+        return self.__spatial_index
+
+    def set_spatial_index(self, index: SpatialIndex | None, groups=STATIC_GROUPS):
+        """
+        Attach the index kept up to date by index_entities and unregister.
+        """
+        self.__spatial_index = index
+        self.__spatial_groups = frozenset(groups)
+
+    async def get_bounds(self, entities: List[str]) -> np.ndarray:
+        """
+        @return: (N, 4) array of bounding spheres [x, y, z, radius], one script evaluation
+        """
+        if not entities:
+            return np.empty((0, 4))
+        bounds = await self.run_script(ENTITY_BOUNDS_SCRIPT, list(entities))
+        return np.asarray(bounds or [], dtype=np.float64).reshape(-1, 4)
+
+    async def index_entities(self, handles: List["Entity | None"]):
+        """
+        Add the new entities of the spatial index groups to the attached index.
+        """
+        if self.__spatial_index is None:
+            return
+        handles = [h for h in handles if h is not None and h.group() in self.__spatial_groups]
+        if handles:
+            bounds = await self.get_bounds([h.entity() for h in handles])
+            self.__spatial_index.insert_many([h.entity() for h in handles], bounds[:, :3], bounds[:, 3], [h.group() for h in handles])
+
+    def registered_entity(self, entity: str) -> "Entity | None":
+        return self.__entities.get(entity)
+
+    def registered_vehicle(self, vehicle_id: int) -> "Vehicle | None":
+        return self.__vehicles.get(vehicle_id)
+
+    def registered_entities(self) -> List["Entity"]:
+        return list(self.__entities.values())
+
+    def registered_vehicles(self) -> List["Vehicle"]:
+        return list(self.__vehicles.values())
+
+    def tick(self) -> int | None:
+        return self.__tick
+
+    def set_tick(self, tick: int):
+        """
+        Record the last sync tick. Entity states cached during the previous
+        tick are dropped.
+        """
+        if tick != self.__tick:
+            self.__tick = tick
+            self.__snapshot = {}
+
+    def invalidate(self, entity: str | None = None):
+        """
+        Drop the entity states cached for the current tick, called after
+        every command changing the state of an entity.
+
+        @param entity: entity whose state changed, None for all entities
+        """
+        self.__writes += 1
+        if entity is None:
+            self.__snapshot = {}
+        else:
+            self.__snapshot.pop(entity, None)
+
+    def cache_stats(self) -> dict:
+        """
+        Entity state cache statistics, one hit or miss per entity read.
+        """
+        total = self.__cache_hits + self.__cache_misses
+        return {
+            "tick": self.__tick,
+            "hits": self.__cache_hits,
+            "misses": self.__cache_misses,
+            "hit_rate": self.__cache_hits / total if total else 0.0,
+        }
+
+    async def get_states(self, entities: List[str], fields=tuple(STATE_FIELDS)) -> List[dict]:
+        """
+        Read the state of many entities in a single script evaluation.
+
+        While a sync tick is known, states are cached until the next tick:
+        only the entities (or fields) not read yet during this tick are
+        requested from the simulator.
+
+        @param entities: entity ids
+        @param fields: state fields to read, see STATE_FIELDS
+        @return: one dictionary of fields per entity, in the order of `entities`,
+                 None for the fields the simulator did not return (nil in Lua)
+        """
+        unknown = set(fields) - STATE_FIELDS.keys()
+        if unknown:
+            raise ValueError(f"unknown state fields: {sorted(unknown)}")
+        if not entities:
+            return []
+
+        tick = self.__tick
+        writes = self.__writes
+        snapshot = self.__snapshot
+        # hits and misses are counted once per entity, duplicates read the same state
+        unique = list(dict.fromkeys(entities))
+        if tick is None:
+            missing = unique
+        else:
+            missing = [e for e in unique if not all(f in snapshot.get(e, ()) for f in fields)]
+        self.__cache_misses += len(missing)
+        self.__cache_hits += len(unique) - len(missing)
+
+        if missing:
+            states = await self.run_script(GET_STATES_SCRIPT, {"entities": missing, "fields": list(fields)})
+            # nil fields are absent from the reply, an entity without any field is an empty list
+            fetched = {entity: {f: _state_value(state, f) for f in fields} for entity, state in zip(missing, states)}
+            # not cached without sync, or when the tick changed or an entity was written while waiting for the reply
+            if tick is not None and tick == self.__tick and writes == self.__writes:
+                for entity, state in fetched.items():
+                    snapshot.setdefault(entity, {}).update(state)
+        else:
+            fetched = {}
+
+        # copies, callers must not modify the cached states
+        return [{f: _copy_value((fetched[e] if e in fetched else snapshot[e])[f]) for f in fields} for e in entities]
+
+    async def request_images(self, cameras: List[str]) -> tuple[int | None, List[str]]:
+        """
+        Request the image of every camera in a single script evaluation.
+
+        @return: sync tick received with the reply and the data URL of every camera
+        """
+        if not cameras:
+            return self.__tick, []
+        images = await self.run_script(CAPTURE_ALL_SCRIPT, list(cameras))
+        return self.__tick, images
+
     async def get_vehicle_state(self, vehicle) -> dict:
         state = await self.__client.rpc(f"object_{vehicle}.state", None)
         position = state.data["position"]
@@ -267,48 +783,34 @@ class SimClient:
         # })
 
 
-    # TODO
-    async def spawn_entity(self, entity_type: ObstacleType, position: Position, rotation: Rotation) -> str:
-        if entity_type == ObstacleType.TREE1:
-            tree = await self.__client.rpc(f"map.spawn", {
-                "mesh": "trees/tree_a.glb",
-                "position": position.to_dict(),
-                "rotation": rotation.to_dict(),
-                })
-            logger.debug(f"Spawned tree block {tree} at pos: {position} rot: {rotation}")
-            return tree.data
-
-        elif entity_type == ObstacleType.TREE2:
-            tree = await self.__client.rpc(f"map.spawn", {
-                "mesh": "trees/tree_b.glb",
-                "position": position.to_dict(),
-                "rotation": rotation.to_dict(),
-                })
-            logger.debug(f"Spawned tree block {tree} at pos: {position} rot: {rotation}")
-            return tree.data
-
-        elif entity_type == ObstacleType.BUILDING1:
-            tree = await self.__client.rpc(f"map.spawn", {
-                "mesh": "buildings/building1.glb",
-                "position": position.to_dict(),
-                "rotation": rotation.to_dict(),
-                })
-            logger.debug(f"Spawned tree block {tree} at pos: {position} rot: {rotation}")
-            return tree.data
-
-        elif entity_type == ObstacleType.BUILDING2:
-            tree = await self.__client.rpc(f"map.spawn", {
-                "mesh": "buildings/building2.glb",
-                "position": position.to_dict(),
-                "rotation": rotation.to_dict(),
-                })
-            logger.debug(f"Spawned tree block {tree} at pos: {position} rot: {rotation}")
-            return tree.data
-
-
-        # TODO other entities
-        else:
+    async def spawn_entity(self, entity_type: ObstacleType, position: Position, rotation: Rotation) -> str | None:
+        if entity_type not in OBSTACLE_MESHES:
+            logger.warning(f"No mesh for obstacle type {entity_type}, not spawned")
             return None
+        entity = await self.__client.rpc(f"map.spawn", {
+            "mesh": OBSTACLE_MESHES[entity_type],
+            "position": position.to_dict(),
+            "rotation": rotation.to_dict(),
+            })
+        logger.debug(f"Spawned {entity_type} {entity} at pos: {position} rot: {rotation}")
+        return entity.data
+
+    async def spawn_many(self, specs: List["SpawnSpec"]) -> list:
+        """
+        Spawn a batch of objects in a single script evaluation.
+
+        @return: spawn result of every spec (entity id, None for roads and failed spawns)
+        """
+        if not specs:
+            return []
+        result = await self.run_script(SPAWN_MANY_SCRIPT, [spec.to_dict() for spec in specs])
+        entities = []
+        for spec, entity in zip(specs, result):
+            if isinstance(entity, dict):
+                logger.error(f"[spawn_many] Spawning {spec.kind} failed: {entity.get('error')}")
+                entity = None
+            entities.append(entity if entity is not False else None)
+        return entities
 
     """
     Return goal entity id
@@ -343,6 +845,16 @@ class SimClient:
             logger.error(f"[draw_sphere] RPC call failed: {e}")
 
 
+# World entity type of every simulator group
+ENTITY_GROUPS = {
+    "terrain": WorldEntity.TERRAIN,
+    "tree": WorldEntity.OBSTACLE,
+    "obstacle": WorldEntity.OBSTACLE,
+    "vehicle": WorldEntity.VEHICLE,
+    "goal": WorldEntity.GOAL,
+    "sensor": WorldEntity.SENSOR,
+}
+
 class Entity:
     def __init__(self, client: SimClient, entity: str, group: str):
         assert client.is_connected() == True, "Client is not connected."
@@ -350,68 +862,47 @@ class Entity:
         self._group = group
         self._client = client
 
-        if group == "terrain":
-            self._entity_type = WorldEntity.TERRAIN
-        elif group == "tree":
-            self._entity_type = WorldEntity.OBSTACLE
-        elif group == "obstacle":
-            self._entity_type = WorldEntity.OBSTACLE
-        elif group == "vehicle":
-            self._entity_type = WorldEntity.VEHICLE
-        elif group == "goal":
-            self._entity_type = WorldEntity.GOAL
-        elif group == "sensor":
-            self._entity_type = WorldEntity.SENSOR
+        # unknown groups (e.g. obstacle meshes) are obstacles
+        self._entity_type = ENTITY_GROUPS.get(group, WorldEntity.OBSTACLE)
 
     def __repr__(self):
         return f"<Entity entity='{self._entity}' group={self._group}>"
 
     async def _state(self) -> dict:
-        state = await self._client.client().rpc('script.eval', {
-            "code": """
-                local_position = sim.object.position(ARGS)
-                global_position = sim.object.gps_position(ARGS)
-                rotation = sim.object.rotation_angles(ARGS)
-                lin_vel = sim.object.linear_velocity(ARGS)
-                ang_vel = sim.object.angular_velocity(ARGS)
-                accel = sim.object.acceleration(ARGS)
-                state = {
-                    global_position=global_position,
-                    local_position=local_position,
-                    rotation=rotation,
-                    lin_vel=lin_vel,
-                    ang_vel=ang_vel,
-                    accel=accel,
-                }
-                return state
-            """,
-            "args": self._entity
-        })
-
-        return state.data
+        (state,) = await self._client.get_states([self._entity])
+        return state
 
     def entity(self):
         return self._entity
 
+    def group(self) -> str:
+        return self._group
+
     def entity_type(self) -> WorldEntity:
         return self._entity_type
 
     async def state(self)->dict:
         return await self._state()
 
-    async def local_position(self) -> Position:
+    async def local_position(self) -> Position | None:
         state = await self._state()
         pos = state.get("local_position", None)
+        if pos is None:
+            return None
         return Position(x=pos["x"], y=pos["y"], z=pos["z"])
 
-    async def global_position(self) -> Position:
+    async def global_position(self) -> Position | None:
         state = await self._state()
         pos = state.get("global_position", None)
+        if pos is None:
+            return None
         return Position(x=pos["x"], y=pos["y"], z=pos["z"])
 
-    async def rotation(self) -> Rotation:
+    async def rotation(self) -> Rotation | None:
         state = await self._state()
         rot = state.get("rotation", None)
+        if rot is None:
+            return None
         return Rotation(roll=rot["yz"], pitch=rot["zx"], yaw=rot["xy"])
 
     async def set_position(self, x: float, y: float, z: float):
@@ -424,6 +915,8 @@ class Entity:
             })
         except:
             print("Cannot set position because TODO")
+        finally:
+            self._client.invalidate(self._entity)
 
     async def set_rotation(self, yz: float, zx: float, xy: float):
         try:
@@ -435,9 +928,12 @@ class Entity:
             })
         except:
             print("Cannot set rotation because TODO")
+        finally:
+            self._client.invalidate(self._entity)
 
     async def despawn(self):
         await self._client.client().rpc(f'object_{self._entity}.despawn', None)
+        self._client.unregister(self._entity)
 
     async def spawn_camera(self, position, rotation, size, fov_degrees=80.0, format="image/tiff", camera_type="rgb") -> "Camera":
         # from intrepid_python_sdk.simulator import Camera
@@ -485,53 +981,177 @@ class AbstractSensor:
         bsphere: bool = True,
         robot_id: bool = True,
     ) -> dict:
-        result = await self._client.client().rpc("script.eval", {
-            "code": f"""
-                local found = sim.map.intersection_with_sphere({{
-                    center = {{ x = 0, y = 0, z = 0 }},
-                    radius = ARGS.radius,
-                    groups = ARGS.groups,
-                    anchor = ARGS.anchor,
-                    exclude = {{ ARGS.anchor }},
-                }})
-                local result = {{}}
-
-                for idx = 1, #found do
-                    local entity = found[idx].entity
-                    local group = found[idx].group
-                    {position and "local position = sim.object.position(entity)" or ""}
-                    {rotation and "local rotation = sim.object.rotation_angles(entity)" or ""}
-                    {bbox and "local bbox = sim.object.compute_aabb(entity)" or ""}
-                    {bsphere and "local bsphere = sim.object.compute_bounding_sphere(entity)" or ""}
-                    {robot_id and "local robot_id = sim.object.get_robot_id(entity)" or ""}
-
-                    table.insert(result, {{
-                        entity = entity,
-                        group = group,
-                        {position and "position = position," or ""}
-                        {rotation and "rotation = rotation," or ""}
-                        {bbox and "bbox = bbox," or ""}
-                        {bsphere and "bsphere = bsphere," or ""}
-                        {robot_id and "robot_id = robot_id," or ""}
-                    }})
-                end
-
-                return result
-            """,
-            "args": { "radius": self._radius, "groups": self._groups, "anchor": self._entity }
+        script = _abstract_sensor_script(position, rotation, bbox, bsphere, robot_id)
+        found = await self._client.run_script(script, {
+            "radius": self._radius, "groups": self._groups, "anchor": self._entity,
         })
 
-        res = dict()
-        for e in result.data:
-            res[e.get("entity")] = {}
-            res[e.get("entity")]["position"] = e.get("position", None)
-            res[e.get("entity")]["rotation"] = e.get("rotation", None)
-            res[e.get("entity")]["bbox"] = e.get("bbox", None)
-            res[e.get("entity")]["bsphere"] = e.get("bsphere", None)
-            res[e.get("entity")]["group"] = e.get("group", None)
-            res[e.get("entity")]["robot_id"] = e.get("robot_id", None)
+        return {
+            e["entity"]: {field: e.get(field) for field in ("position", "rotation", "bbox", "bsphere", "group", "robot_id")}
+            for e in found or []
+        }
 
-        return res
+    async def capture_arrays(
+        self,
+        position: bool = True,
+        rotation: bool = True,
+        bbox: bool = True,
+        bsphere: bool = True,
+        robot_id: bool = True,
+    ) -> "Detections":
+        """
+        Same query as capture(), returned as columns: the script sends flat
+        number lists which are reshaped into arrays, one row per entity.
+        """
+        script = _abstract_sensor_script(position, rotation, bbox, bsphere, robot_id, columnar=True)
+        columns = await self._client.run_script(script, {
+            "radius": self._radius, "groups": self._groups, "anchor": self._entity,
+        })
+        return Detections.from_columns(columns or {})
+
+
+class Detections:
+    """
+    Columnar AbstractSensor result. Every array has one row per detected
+    entity, fields that were not requested are None.
+
+    entity, group: entity ids and groups (object arrays)
+    position: (N, 3) Vec3Array
+    rotation: (N, 3) [yz, zx, xy] angles
+    bbox_min, bbox_max: (N, 3) Vec3Array, corners of the axis aligned bounding boxes
+    bsphere_center: (N, 3) Vec3Array, bsphere_radius: (N,)
+    robot_id: (N,) int64, -1 for entities that are not vehicles
+    """
+    __slots__ = ("entity", "group", "position", "rotation", "bbox_min", "bbox_max", "bsphere_center", "bsphere_radius", "robot_id")
+
+    def __init__(self, entity, group, position=None, rotation=None, bbox_min=None, bbox_max=None,
+                 bsphere_center=None, bsphere_radius=None, robot_id=None):
+        self.entity = entity
+        self.group = group
+        self.position = position
+        self.rotation = rotation
+        self.bbox_min = bbox_min
+        self.bbox_max = bbox_max
+        self.bsphere_center = bsphere_center
+        self.bsphere_radius = bsphere_radius
+        self.robot_id = robot_id
+
+    def __repr__(self):
+        return f"<Detections count={len(self)}>"
+
+    def __len__(self):
+        return len(self.entity)
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "Detections":
+        """
+        @param columns: reply of the columnar sensor script, lists of entities and
+                        groups and flat number lists (empty Lua tables may come as {})
+        """
+        def numbers(name: str, width: int, dtype=np.float64):
+            if name not in columns:
+                return None
+            return np.asarray(columns[name] or [], dtype=dtype).reshape(-1, width)
+
+        position = numbers("position", 3)
+        bbox = numbers("bbox", 6)
+        bsphere = numbers("bsphere", 4)
+        robot_id = numbers("robot_id", 1, np.int64)
+        return cls(
+            entity=np.array(columns.get("entity") or [], dtype=object),
+            group=np.array(columns.get("group") or [], dtype=object),
+            position=Vec3Array(position) if position is not None else None,
+            rotation=numbers("rotation", 3),
+            bbox_min=Vec3Array(bbox[:, :3]) if bbox is not None else None,
+            bbox_max=Vec3Array(bbox[:, 3:]) if bbox is not None else None,
+            bsphere_center=Vec3Array(bsphere[:, :3]) if bsphere is not None else None,
+            bsphere_radius=bsphere[:, 3] if bsphere is not None else None,
+            robot_id=robot_id[:, 0] if robot_id is not None else None,
+        )
+
+    def mask(self, selected: np.ndarray) -> "Detections":
+        """
+        Subset of the detections, e.g. detections.mask(detections.group == "obstacle").
+        """
+        return Detections(*(None if (column := getattr(self, name)) is None else column[selected] for name in self.__slots__))
+
+
+@functools.lru_cache(maxsize=None)
+def _abstract_sensor_script(position: bool, rotation: bool, bbox: bool, bsphere: bool, robot_id: bool, columnar: bool = False) -> LuaScript:
+    """
+    Intersection query of an AbstractSensor, one script per combination of fields.
+    """
+    flags = "".join("1" if flag else "0" for flag in (position, rotation, bbox, bsphere, robot_id))
+    if columnar:
+        return _abstract_sensor_columns_script(flags, position, rotation, bbox, bsphere, robot_id)
+    return LuaScript(f"abstract_sensor.{flags}", f"""
+    local found = sim.map.intersection_with_sphere({{
+        center = {{ x = 0, y = 0, z = 0 }},
+        radius = ARGS.radius,
+        groups = ARGS.groups,
+        anchor = ARGS.anchor,
+        exclude = {{ ARGS.anchor }},
+    }})
+    local result = {{}}
+
+    for idx = 1, #found do
+        local entity = found[idx].entity
+        local group = found[idx].group
+        {position and "local position = sim.object.position(entity)" or ""}
+        {rotation and "local rotation = sim.object.rotation_angles(entity)" or ""}
+        {bbox and "local bbox = sim.object.compute_aabb(entity)" or ""}
+        {bsphere and "local bsphere = sim.object.compute_bounding_sphere(entity)" or ""}
+        {robot_id and "local robot_id = sim.object.get_robot_id(entity)" or ""}
+
+        table.insert(result, {{
+            entity = entity,
+            group = group,
+            {position and "position = position," or ""}
+            {rotation and "rotation = rotation," or ""}
+            {bbox and "bbox = bbox," or ""}
+            {bsphere and "bsphere = bsphere," or ""}
+            {robot_id and "robot_id = robot_id," or ""}
+        }})
+    end
+
+    return result
+""")
+
+
+def _abstract_sensor_columns_script(flags: str, position: bool, rotation: bool, bbox: bool, bsphere: bool, robot_id: bool) -> LuaScript:
+    def append(column: str, *values: str) -> str:
+        return "".join(f"table.insert(result.{column}, {value}) " for value in values)
+
+    return LuaScript(f"abstract_sensor_columns.{flags}", f"""
+    local found = sim.map.intersection_with_sphere({{
+        center = {{ x = 0, y = 0, z = 0 }},
+        radius = ARGS.radius,
+        groups = ARGS.groups,
+        anchor = ARGS.anchor,
+        exclude = {{ ARGS.anchor }},
+    }})
+    local result = {{
+        entity = {{}}, group = {{}},
+        {position and "position = {}," or ""}
+        {rotation and "rotation = {}," or ""}
+        {bbox and "bbox = {}," or ""}
+        {bsphere and "bsphere = {}," or ""}
+        {robot_id and "robot_id = {}," or ""}
+    }}
+
+    for idx = 1, #found do
+        local entity = found[idx].entity
+        table.insert(result.entity, entity)
+        table.insert(result.group, found[idx].group)
+        {position and "local p = sim.object.position(entity) " + append("position", "p.x", "p.y", "p.z") or ""}
+        {rotation and "local r = sim.object.rotation_angles(entity) " + append("rotation", "r.yz", "r.zx", "r.xy") or ""}
+        {bbox and "local b = sim.object.compute_aabb(entity) " + append("bbox", "b.min.x", "b.min.y", "b.min.z", "b.max.x", "b.max.y", "b.max.z") or ""}
+        {bsphere and "local s = sim.object.compute_bounding_sphere(entity) " + append("bsphere", "s.center.x", "s.center.y", "s.center.z", "s.radius") or ""}
+        {robot_id and append("robot_id", "sim.object.get_robot_id(entity) or -1") or ""}
+    end
+
+    return result
+""")
 
 
 """
@@ -584,6 +1204,88 @@ class Camera(Sensor):
         image = await self._client.client().rpc(f"object_{self._entity}.request_image", None)
         return image.data["data"]
 
+    async def capture_frame(self, decoder: FrameDecoder | None = None) -> Frame:
+        """
+        Capture an image and decode it in the decoder worker pool.
+
+        @return: Frame tagged with the sync tick the image was requested at
+        """
+        tick = self._client.tick()
+        data = await self.capture()
+        image = await (decoder or default_decoder()).decode(data)
+        return Frame(image, self._entity, tick)
+
+    async def stream(self, rate: float, buffer_size: int = 1, decoder: FrameDecoder | None = None, max_pending: int = 2):
+        """
+        Capture frames at `rate` Hz in the background.
+
+            async for frame in camera.stream(10.0):
+                ...
+
+        Frames are decoded in the decoder worker pool while the next one is
+        captured, and kept in a bounded buffer: a consumer slower than `rate`
+        skips to the latest frames instead of falling behind.
+
+        @param rate: captures per second
+        @param buffer_size: frames kept for the consumer
+        @param max_pending: frames decoded at once, captures beyond are dropped
+        """
+        buffer = LatestFrameBuffer(buffer_size)
+        stop = asyncio.Event()
+        producer = asyncio.create_task(self.__produce(rate, buffer, decoder or default_decoder(), max_pending, stop))
+        try:
+            while (frame := await buffer.get()) is not None:
+                yield frame
+        finally:
+            # the producer finishes its capture, cancelling it mid-RPC breaks the centrifuge client
+            stop.set()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def __produce(self, rate: float, buffer: LatestFrameBuffer, decoder: FrameDecoder, max_pending: int, stop: asyncio.Event):
+        period = 1.0 / rate
+        pending: set[asyncio.Task] = set()
+        latest = -1
+
+        async def decode(sequence: int, tick: int | None, data: str):
+            nonlocal latest
+            try:
+                image = await decoder.decode(data)
+            except Exception as e:
+                buffer.fail(e)
+                return
+            # decodes can finish out of order, never go back in time
+            if sequence > latest:
+                latest = sequence
+                buffer.put(Frame(image, self._entity, tick, sequence))
+
+        try:
+            sequence = 0
+            next_capture = time.monotonic()
+            while not stop.is_set():
+                tick = self._client.tick()
+                data = await self.capture()
+                if len(pending) < max_pending:
+                    task = asyncio.create_task(decode(sequence, tick, data))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                else:
+                    buffer.dropped += 1
+                sequence += 1
+                # a slow simulator restarts the schedule instead of bursting
+                next_capture = max(next_capture + period, time.monotonic())
+                try:
+                    await asyncio.wait_for(stop.wait(), max(0.0, next_capture - time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Camera] Stream of {self._entity} failed: {e}")
+            buffer.fail(e)
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def set_position(self, x, y, z):
         return await super().set_position(x, y, z)
 
@@ -651,6 +1353,7 @@ class Vehicle(Entity):
             "vx": velocity.x,
             "vy": velocity.y,
         })
+        self._client.invalidate(self._entity)
 
     async def position_control(self, target_position: Position, yaw: float = 0.0):
         await self._client.client().rpc(f"object_{self._entity}.position_control", {
@@ -659,36 +1362,54 @@ class Vehicle(Entity):
             "y": target_position.y,
             "xy": yaw
         })
+        self._client.invalidate(self._entity)
 
     # async def set_rotation(self, rotation: Rotation):
     #     pass
 
 class Simulator:
-    def __init__(self, host="localhost", port=9120, step_duration=1_000):
+    def __init__(self, host="localhost", port=9120, step_duration=1_000, overrun_policy: OverrunPolicy = OverrunPolicy.SKIP,
+                 lockstep: bool = False):
         # Instantiate sim client
         self.__sim_client = SimClient(host, port)
         self._last_tick_received = -1
         self._user_task = None
         self._dt_ms = step_duration
         self._sim_vehicles = {}  # { int: list }
-
-        # sim info
-        self._num_vehicles = 0
-        self._num_entities = 0
+        self._overrun_policy = overrun_policy
+        self._pending_tick = None
+        self._next_tick = None
+        self._tick_stats = TickStats()
+        # per vehicle controllers, {vehicle id: (Vehicle, controller)}
+        self._controllers = {}
+        # telemetry recorders, capture(sim, tick) before the controllers run
+        self._recorders = []
+        self._closing = False
+        # stepped by step() instead of the sync loop, [(tick, future)] wait for ticks
+        self._lockstep = lockstep
+        self._tick_waiters = []
 
         class EventHandler(SubscriptionEventHandler):
             async def on_publication(_, ctx: PublicationContext) -> None:
                 self._last_tick_received = ctx.pub.data
-                self._process_tick(ctx.pub.data)
+                self.client().set_tick(ctx.pub.data)
+                self._resolve_tick_waiters(ctx.pub.data)
+                if not self._lockstep:
+                    self._process_tick(ctx.pub.data)
 
         sub = self.__sim_client.client().new_subscription('sync', EventHandler())
         logger.debug(f"sub: {sub}")
         asyncio.ensure_future(sub.subscribe())
 
     async def connect(self):
+        self._closing = False
         await asyncio.wait_for(self.__sim_client.connect(), timeout=10)
 
     async def disconnect(self):
+        self._closing = True
+        if self._user_task is not None:
+            # let the callback finish, cancelling it mid-RPC breaks the centrifuge client
+            await asyncio.wait([self._user_task], timeout=10)
         await asyncio.wait_for(self.__sim_client.disconnect(), timeout=10)
 
     def client(self) -> SimClient:
@@ -697,6 +1418,19 @@ class Simulator:
     def set_step_duration(self, duration: int):
         self._dt_ms = duration
 
+    def set_overrun_policy(self, policy: OverrunPolicy):
+        self._overrun_policy = policy
+        self._pending_tick = None
+
+    def overrun_policy(self) -> OverrunPolicy:
+        return self._overrun_policy
+
+    def tick_stats(self) -> TickStats:
+        """
+        Timing of the on_tick callbacks (duration, RPC time, slack) and overrun counters.
+        """
+        return self._tick_stats
+
     """
     Connect to simulator websocket server
     """
@@ -708,6 +1442,7 @@ class Simulator:
     """
     async def reset(self):
         await self.__sim_client.reset()
+        self.__sim_client.clear_registry()
 
     """
     Pause simulator instance
@@ -728,8 +1463,67 @@ class Simulator:
     """
     Perform a simulation step for duration (microseconds)
     """
-    async def step(self, duration):
-        pass
+    async def step(self, duration: int | None = None, timeout: float | None = 10.0) -> int:
+        """
+        Advance the simulation by `duration` microseconds and wait until the
+        simulator reports the new tick. The first call switches the
+        simulator to lockstep: the sync loop stops and neither on_tick nor
+        the controllers are called, the caller drives the simulation:
+
+            for _ in range(1000):
+                await sim.step()
+                states = await sim.get_states(vehicles)
+
+        @param duration: microseconds to advance, the step duration by default
+        @param timeout: seconds to wait for the tick, None to wait forever
+        @return: the tick reached
+        """
+        self._lockstep = True
+        if self._last_tick_received < 0:
+            # not synced yet, the simulator sends its tick on subscription
+            await asyncio.wait_for(self._tick_future(0), timeout)
+
+        target = self._last_tick_received + (self._dt_ms * 1_000 if duration is None else duration)
+        reached = self._tick_future(target)
+        try:
+            sync = self.__sim_client.client().get_subscription('sync')
+            await sync.publish(target)
+            tick = await asyncio.wait_for(reached, timeout)
+        finally:
+            reached.cancel()
+        if self._recorders:
+            await self._record_telemetry(tick)
+        return tick
+
+    def set_lockstep(self, enabled: bool):
+        """
+        Switch between step() (enabled) and the sync loop calling on_tick and the controllers.
+        """
+        self._lockstep = enabled
+        if not enabled and self._last_tick_received >= 0 and self._user_task is None:
+            self._process_tick(self._last_tick_received)
+
+    def lockstep(self) -> bool:
+        return self._lockstep
+
+    def _tick_future(self, tick: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if self._last_tick_received >= tick:
+            future.set_result(self._last_tick_received)
+        else:
+            self._tick_waiters.append((tick, future))
+        return future
+
+    def _resolve_tick_waiters(self, tick: int):
+        waiting = []
+        for target, future in self._tick_waiters:
+            if future.done():
+                continue
+            if tick >= target:
+                future.set_result(tick)
+            else:
+                waiting.append((target, future))
+        self._tick_waiters = waiting
 
     """
     Subscribe to simulator and receive
@@ -737,33 +1531,181 @@ class Simulator:
     def sync(self, control_func):
         self.on_tick = control_func
 
+    def add_controller(self, vehicle: Vehicle, controller):
+        """
+        Run `await controller(vehicle, sim)` on every tick, concurrently with the
+        controllers of the other vehicles and before on_tick. The states of all
+        controlled vehicles are read with one RPC at the start of the tick, so
+        state getters of the vehicles are served from the tick cache.
+
+        @param vehicle: controlled vehicle, replaces its previous controller
+        @param controller: async function of the vehicle and the simulator
+        """
+        self._controllers[vehicle.id()] = (vehicle, controller)
+
+    def remove_controller(self, vehicle: Vehicle):
+        self._controllers.pop(vehicle.id(), None)
+
+    def controlled_vehicles(self) -> List[Vehicle]:
+        return [vehicle for vehicle, _ in self._controllers.values()]
+
+    async def _run_controllers(self):
+        controllers = list(self._controllers.values())
+        try:
+            await self.__sim_client.get_states([vehicle.entity() for vehicle, _ in controllers])
+        except Exception as e:
+            # controllers read their own state
+            logger.warning(f"Batched state read failed: {e}")
+
+        results = await asyncio.gather(*[controller(vehicle, self) for vehicle, controller in controllers], return_exceptions=True)
+        for (vehicle, _), result in zip(controllers, results):
+            if isinstance(result, Exception):
+                self._tick_stats.errors += 1
+                logger.error(f"Controller of vehicle {vehicle.id()} failed: {result!r}")
+
+    def add_recorder(self, recorder: "TelemetryRecorder"):
+        """
+        Record the state of the recorder entities on every tick, before the
+        controllers and on_tick run, and after every step() in lockstep. The
+        recorder is not closed by the simulator.
+        """
+        if recorder not in self._recorders:
+            self._recorders.append(recorder)
+
+    def remove_recorder(self, recorder: "TelemetryRecorder"):
+        if recorder in self._recorders:
+            self._recorders.remove(recorder)
+
+    async def _record_telemetry(self, tick: int):
+        for recorder in list(self._recorders):
+            try:
+                await recorder.capture(self, tick)
+            except Exception as e:
+                logger.warning(f"Telemetry recording failed at tick {tick}: {e!r}")
+
+    async def _tick_callbacks(self, tick: int):
+        if self._recorders:
+            await self._record_telemetry(tick)
+        if self._controllers:
+            await self._run_controllers()
+        await self.on_tick(self)
+
     """
     Get all vehicles in simulation instance
     """
     async def get_vehicles(self) -> List[Vehicle]:
         vehicles = await self.__sim_client.get_vehicles()
-        return [ Vehicle(self.__sim_client, v_id, v_entity) for (v_id, v_entity) in vehicles ]
+        found = set()
+        result = []
+        for (v_id, v_entity) in vehicles:
+            vehicle = self.__sim_client.registered_vehicle(v_id)
+            if vehicle is None or vehicle.entity() != v_entity:
+                vehicle = self.__sim_client.register(Vehicle(self.__sim_client, v_id, v_entity))
+            found.add(v_id)
+            result.append(vehicle)
+        # vehicles despawned by someone else
+        for vehicle in self.__sim_client.registered_vehicles():
+            if vehicle.id() not in found:
+                self.__sim_client.unregister(vehicle.entity())
+        return result
 
     """
     Get single vehicle
+    Served from the vehicle registry, the simulator is queried only for unknown ids
     """
     async def get_vehicle(self, vehicle_id: int) -> Vehicle | None:
-        vehicles = await self.get_vehicles()
-        for v in vehicles:
-            if v.id() == vehicle_id:
-                return v
-        return None
+        vehicle = self.__sim_client.registered_vehicle(vehicle_id)
+        if vehicle is None:
+            await self.get_vehicles()
+            vehicle = self.__sim_client.registered_vehicle(vehicle_id)
+        return vehicle
+
+    async def build_spatial_index(self, groups=STATIC_GROUPS, **kwargs) -> SpatialIndex:
+        """
+        Index the bounding spheres of the entities of `groups` locally (two
+        RPCs), for proximity queries without RPC. Entities spawned with
+        spawn_entity/spawn_many and despawned through this client keep the
+        index up to date. Moving entities should not be indexed, query them
+        through the simulator (AbstractSensor).
+
+        @param groups: groups of static entities to index
+        @param kwargs: SpatialIndex options
+        """
+        entities = await self.get_entities(list(groups))
+        bounds = await self.__sim_client.get_bounds([e.entity() for e in entities])
+        index = SpatialIndex(**kwargs)
+        index.insert_many([e.entity() for e in entities], bounds[:, :3], bounds[:, 3], [e.group() for e in entities])
+        index.rebuild()
+        self.__sim_client.set_spatial_index(index, groups)
+        return index
+
+    def spatial_index(self) -> SpatialIndex | None:
+        return self.__sim_client.spatial_index()
+
+    async def get_states(self, entities: List["Entity | str"], fields=tuple(STATE_FIELDS), as_arrays: bool = False):
+        """
+        Fetch the state of many entities with a single RPC.
+
+        @param entities: Entity objects or entity ids
+        @param fields: state fields to read, see STATE_FIELDS
+        @param as_arrays: return one array per field instead of one dictionary per entity
+        @return: {entity id: {field: value}}, or with as_arrays {field: array} with one row per
+                 entity, in the order of `entities` ((N, 3) Vec3Array for vectors, (N, 3)
+                 [yz, zx, xy] angles for rotation, NaN rows for missing fields)
+        """
+        ids = [e.entity() if isinstance(e, Entity) else e for e in entities]
+        states = await self.__sim_client.get_states(ids, fields)
+        if not as_arrays:
+            return dict(zip(ids, states))
+
+        arrays = {}
+        for field in fields:
+            keys = ("yz", "zx", "xy") if field == "rotation" else ("x", "y", "z")
+            # NaN rows for the entities missing the field
+            array = np.array([[state[field][k] for k in keys] if state[field] is not None else [np.nan] * 3
+                              for state in states], dtype=np.float64).reshape(-1, 3)
+            arrays[field] = Vec3Array(array) if field in VECTOR_FIELDS else array
+        return arrays
+
+    async def capture_all(self, cameras: List[Camera], decoder: FrameDecoder | None = None) -> FrameSet:
+        """
+        Capture every camera in one batched call, e.g. the stereo pair and
+        depth camera of a vehicle. The images are rendered in the same
+        simulation step and decoded in parallel in the decoder worker pool.
+
+        @param cameras: cameras to capture
+        @return: FrameSet with one frame per camera, in order, tagged with the sync tick
+        """
+        entities = [camera.entity() for camera in cameras]
+        tick, images = await self.__sim_client.request_images(entities)
+        decoded = await (decoder or default_decoder()).decode_many(images)
+        return FrameSet(tick, [Frame(image, entity, tick) for entity, image in zip(entities, decoded)])
 
+    """
+    Number of vehicles and entities known to this client (spawned by it or
+    returned by get_vehicles/get_entities)
+    """
     def num_vehicles(self):
-        return self._num_vehicles
+        return len(self.__sim_client.registered_vehicles())
 
     def num_entities(self):
-        return len(self.get_entities())
-        # return self._num_entities
+        return len(self.__sim_client.registered_entities())
 
     async def get_entities(self, groups: List[str] | None = None) -> List[Entity]:
         entities = await self.__sim_client.get_entities(groups)
-        return [ Entity(self.__sim_client, e[0], e[1]) for e in entities ]
+        result = []
+        for (entity, group) in entities:
+            handle = self.__sim_client.registered_entity(entity)
+            if handle is None:
+                handle = self.__sim_client.register(Entity(self.__sim_client, entity, group))
+            result.append(handle)
+        if not groups:
+            # full listing, forget despawned entities
+            found = {handle.entity() for handle in result}
+            for handle in self.__sim_client.registered_entities():
+                if handle.entity() not in found:
+                    self.__sim_client.unregister(handle.entity())
+        return result
 
     """
     Set goal at position
@@ -771,7 +1713,7 @@ class Simulator:
     """
     async def set_goal(self, position: Position, radius: float | None = None, height: float | None = None) -> Entity:
         goal = await self.__sim_client.set_goal(position, radius=radius, height=height)
-        return Entity(self.__sim_client, goal, "goal")
+        return self.__sim_client.register(Entity(self.__sim_client, goal, "goal"))
 
     """
     Spawn UAV vehicle with id, position and rotation
@@ -780,8 +1722,7 @@ class Simulator:
     """
     async def spawn_uav(self, vehicle_id, position, rotation):
         (vehicle_id, vehicle_entity) = await self.__sim_client.spawn_uav(vehicle_id, position, rotation)
-        self._num_vehicles += 1
-        return Vehicle(self.__sim_client, vehicle_id, vehicle_entity)
+        return self.__sim_client.register(Vehicle(self.__sim_client, vehicle_id, vehicle_entity))
 
     """
     Spawn UGV vehicle with id, position and rotation
@@ -790,16 +1731,45 @@ class Simulator:
     """
     async def spawn_ugv(self, vehicle_id, position, rotation):
         (vehicle_id, vehicle_entity) = await self.__sim_client.spawn_ugv(vehicle_id, position, rotation)
-        self._num_vehicles += 1
-        return Vehicle(self.__sim_client, vehicle_id, vehicle_entity)
+        return self.__sim_client.register(Vehicle(self.__sim_client, vehicle_id, vehicle_entity))
 
     async def spawn_road(self, src: Position, dest: Position):
         await self.__sim_client.spawn_road(src, dest)
 
     async def spawn_entity(self, entity_type: ObstacleType, position: Position, rotation: Rotation):
         entity = await self.__sim_client.spawn_entity(entity_type, position, rotation)
-        self._num_entities += 1
-        return Entity(self.__sim_client, entity[0], entity_type.to_string())
+        if entity is None:
+            return None
+        handle = self.__sim_client.register(Entity(self.__sim_client, entity, "obstacle"))
+        await self.__sim_client.index_entities([handle])
+        return handle
+
+    async def spawn_many(self, specs: List[SpawnSpec], batch_size: int = 1000) -> List[Entity | None]:
+        """
+        Spawn vehicles, obstacles, roads and goals with one script evaluation
+        per `batch_size` specs (batches are sent concurrently).
+
+        @param specs: objects to spawn, see SpawnSpec.uav/ugv/obstacle/road/goal
+        @return: handle of every spec in order, Vehicle for vehicles, Entity for
+                 obstacles and goals, None for roads and for the specs that failed
+                 to spawn (logged, the rest of the batch is spawned)
+        """
+        batches = [specs[i:i + batch_size] for i in range(0, len(specs), batch_size)]
+        results = await asyncio.gather(*[self.__sim_client.spawn_many(batch) for batch in batches])
+
+        handles = []
+        for spec, entity in zip(specs, (entity for result in results for entity in result)):
+            if entity is None:
+                handle = None
+            elif spec.kind in ("uav", "ugv"):
+                handle = self.__sim_client.register(Vehicle(self.__sim_client, spec.vehicle_id, entity))
+            elif entity is not None and spec.group is not None:
+                handle = self.__sim_client.register(Entity(self.__sim_client, entity, spec.group))
+            else:
+                handle = None
+            handles.append(handle)
+        await self.__sim_client.index_entities(handles)
+        return handles
 
     async def spawn_camera(self, position, rotation, size, fov_degrees=80.0, format="image/tiff", camera_type="rgb"):
         depth_camera = camera_type == "rgbd"
@@ -821,20 +1791,60 @@ class Simulator:
         pass
 
     def _process_tick(self, tick):
+        if self._closing or self._lockstep:
+            return
         if self._user_task and self._last_tick_received > 0:
-            return # busy
-
-        # send sync
+            # busy
+            if self._overrun_policy == OverrunPolicy.QUEUE_LATEST:
+                if self._pending_tick is not None:
+                    self._tick_stats.coalesced += 1
+                self._pending_tick = tick
+            elif tick != self._next_tick:
+                # the next tick runs once the callback finished, later ones are dropped
+                self._tick_stats.skipped += 1
+            return
+
+        # send sync, the simulator runs the next step while on_tick runs
         next_tick = tick + self._dt_ms * 1_000
-        sync = self.__sim_client.client().get_subscription('sync')
-        asyncio.ensure_future(sync.publish(next_tick))
+        self._next_tick = next_tick
+        if self._overrun_policy != OverrunPolicy.BLOCK:
+            self._publish_sync(next_tick)
+
+        started = time.perf_counter()
+        rpc_count, rpc_seconds = self.__sim_client.rpc_totals()
 
-        def on_task_done(_):
+        def on_task_done(task):
             self._user_task = None
-            if self._last_tick_received >= next_tick:
+            if task.cancelled():
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1e3
+            count, seconds = self.__sim_client.rpc_totals()
+            self._tick_stats.record(tick, elapsed_ms, (seconds - rpc_seconds) * 1e3, count - rpc_count, self._dt_ms)
+            if task.exception() is not None:
+                self._tick_stats.errors += 1
+                logger.error(f"on_tick failed at tick {tick}: {task.exception()!r}")
+
+            # step() took over while the callback ran, it drives the simulation now
+            if self._closing or self._lockstep:
+                self._pending_tick = None
+                return
+            if self._overrun_policy == OverrunPolicy.BLOCK:
+                self._tick_stats.blocked_ms += elapsed_ms
+                self._publish_sync(next_tick)
+            elif self._pending_tick is not None:
+                pending, self._pending_tick = self._pending_tick, None
+                self._process_tick(pending)
+            elif self._last_tick_received >= next_tick:
                 self._process_tick(next_tick)
 
         # Pass simulator class to on_tick (user can call sim.method() for their needs)
-        self._user_task = asyncio.ensure_future(self.on_tick(self))
+        self._user_task = asyncio.ensure_future(self._tick_callbacks(tick))
         self._user_task.add_done_callback(on_task_done)
 
+    def _publish_sync(self, tick):
+        sync = self.__sim_client.client().get_subscription('sync')
+        asyncio.ensure_future(sync.publish(tick)).add_done_callback(self._on_sync_published)
+
+    def _on_sync_published(self, task):
+        if not task.cancelled() and task.exception() is not None and not self._closing:
+            logger.warning(f"Sync publish failed: {task.exception()!r}")
@@ -0,0 +1,204 @@
+"""
+Client-side spatial index of (static) world entities.
+
+Entities are stored as bounding spheres in a KD-tree (scipy cKDTree), so
+proximity queries run locally instead of going through an
+intersection_with_sphere RPC. Inserts and removals are incremental: new
+entities are kept in a small list scanned by brute force and removed ones
+are masked out, until they exceed a fraction of the index and the tree is
+rebuilt on the next query.
+"""
+
+import logging
+from typing import Iterable, List
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+
+class SpatialIndex:
+    """
+    KD-tree of entity bounding spheres answering radius and k-nearest queries.
+    """
+
+    def __init__(self, leafsize: int = 16, rebuild_fraction: float = 0.25):
+        """
+        @param leafsize: leaf size of the KD-tree
+        @param rebuild_fraction: rebuild the tree when pending inserts and removals exceed
+                                 this fraction of the indexed entities
+        """
+        self.leafsize = leafsize
+        self.rebuild_fraction = rebuild_fraction
+        self.rebuilds = 0
+        self.__entities: List[str] = []
+        self.__rows: dict[str, int] = {}
+        self.__centers = np.empty((0, 3))
+        self.__radii = np.empty(0)
+        self.__groups = np.empty(0, dtype=object)
+        self.__alive = np.empty(0, dtype=bool)
+        self.__size = 0
+        self.__removed = 0
+        # rows [0, tree_rows) are in the tree, the following ones are pending
+        self.__tree: cKDTree | None = None
+        self.__tree_rows = 0
+        self.__tree_max_radius = 0.0
+
+    def __repr__(self):
+        return f"<SpatialIndex entities={len(self)}>"
+
+    def __len__(self):
+        return self.__size - self.__removed
+
+    def __contains__(self, entity: str):
+        return entity in self.__rows
+
+    def entities(self) -> List[str]:
+        return list(self.__rows)
+
+    def insert(self, entity: str, center, radius: float = 0.0, group: str | None = None):
+        self.insert_many([entity], [center], [radius], [group])
+
+    def insert_many(self, entities: List[str], centers, radii=None, groups: List[str | None] | None = None):
+        """
+        Add (or move) entities.
+
+        @param entities: entity ids
+        @param centers: (N, 3) bounding sphere centers
+        @param radii: (N,) bounding sphere radii, 0 by default
+        @param groups: simulator group of every entity
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        radii = np.zeros(len(entities)) if radii is None else np.asarray(radii, dtype=np.float64)
+        groups = [None] * len(entities) if groups is None else list(groups)
+        for entity in entities:
+            if entity in self.__rows:
+                self.remove(entity)
+
+        self.__reserve(self.__size + len(entities))
+        rows = slice(self.__size, self.__size + len(entities))
+        self.__centers[rows] = centers
+        self.__radii[rows] = radii
+        self.__groups[rows] = groups
+        self.__alive[rows] = True
+        for row, entity in enumerate(entities, start=self.__size):
+            self.__entities.append(entity)
+            self.__rows[entity] = row
+        self.__size += len(entities)
+
+    def remove(self, entity: str) -> bool:
+        """
+        @return: True if the entity was indexed
+        """
+        row = self.__rows.pop(entity, None)
+        if row is None:
+            return False
+        self.__alive[row] = False
+        self.__removed += 1
+        return True
+
+    def clear(self):
+        self.__init__(self.leafsize, self.rebuild_fraction)
+
+    def rebuild(self):
+        """
+        Drop removed entities and put every entity in the tree.
+        """
+        alive = self.__alive[:self.__size]
+        self.__centers = self.__centers[:self.__size][alive]
+        self.__radii = self.__radii[:self.__size][alive]
+        self.__groups = self.__groups[:self.__size][alive]
+        self.__entities = [entity for entity, keep in zip(self.__entities, alive) if keep]
+        self.__rows = {entity: row for row, entity in enumerate(self.__entities)}
+        self.__size = len(self.__entities)
+        self.__alive = np.ones(self.__size, dtype=bool)
+        self.__removed = 0
+
+        self.__tree = cKDTree(self.__centers, leafsize=self.leafsize) if self.__size else None
+        self.__tree_rows = self.__size
+        self.__tree_max_radius = float(self.__radii.max()) if self.__size else 0.0
+        self.rebuilds += 1
+
+    def query_radius(self, center, radius: float, groups: Iterable[str] | None = None, return_distance: bool = False):
+        """
+        Entities whose bounding sphere intersects the sphere (center, radius),
+        closest first.
+
+        @param groups: only return entities of these groups
+        @return: entity ids, and with return_distance the distances between the centers
+        """
+        center = np.asarray(center, dtype=np.float64)
+        self.__maybe_rebuild()
+        rows = self.__pending_rows()
+        if self.__tree is not None:
+            found = self.__tree.query_ball_point(center, radius + self.__tree_max_radius)
+            rows = np.concatenate([np.asarray(found, dtype=np.intp), rows])
+        rows = self.__select(rows, groups)
+
+        distances = np.linalg.norm(self.__centers[rows] - center, axis=1)
+        inside = distances <= radius + self.__radii[rows]
+        return self.__result(rows[inside], distances[inside], return_distance)
+
+    def nearest(self, point, k: int = 1, groups: Iterable[str] | None = None, return_distance: bool = False):
+        """
+        The k entities with the closest bounding sphere centers, closest first.
+
+        @param groups: only return entities of these groups
+        @return: entity ids, and with return_distance the distances to the centers
+        """
+        point = np.asarray(point, dtype=np.float64)
+        self.__maybe_rebuild()
+        rows = self.__select(self.__pending_rows(), groups)
+        if self.__tree is not None:
+            # removed or filtered entities take slots of the tree query, widen it until enough remain
+            count = min(self.__tree_rows, k + self.__removed)
+            while True:
+                _, found = self.__tree.query(point, k=count)
+                found = self.__select(np.atleast_1d(found).astype(np.intp), groups)
+                if len(found) >= k or count == self.__tree_rows:
+                    break
+                count = min(self.__tree_rows, count * 2)
+            rows = np.concatenate([found, rows])
+
+        distances = np.linalg.norm(self.__centers[rows] - point, axis=1)
+        closest = np.argsort(distances, kind="stable")[:k]
+        return self.__result(rows[closest], distances[closest], return_distance, ordered=True)
+
+    def __pending_rows(self) -> np.ndarray:
+        return np.arange(self.__tree_rows, self.__size, dtype=np.intp)
+
+    def __select(self, rows: np.ndarray, groups: Iterable[str] | None) -> np.ndarray:
+        rows = rows[self.__alive[rows]]
+        if groups is not None:
+            rows = rows[np.isin(self.__groups[rows], list(groups))]
+        return rows
+
+    def __result(self, rows: np.ndarray, distances: np.ndarray, return_distance: bool, ordered: bool = False):
+        if not ordered:
+            order = np.argsort(distances, kind="stable")
+            rows, distances = rows[order], distances[order]
+        entities = [self.__entities[row] for row in rows]
+        return (entities, distances) if return_distance else entities
+
+    def __maybe_rebuild(self):
+        stale = (self.__size - self.__tree_rows) + self.__removed
+        if stale and stale > self.rebuild_fraction * max(len(self), 64):
+            logger.debug(f"Rebuilding spatial index of {len(self)} entities")
+            self.rebuild()
+
+    def __reserve(self, size: int):
+        capacity = len(self.__alive)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 64)
+
+        def grow(array: np.ndarray, shape: tuple) -> np.ndarray:
+            grown = np.zeros(shape, dtype=array.dtype)
+            grown[:self.__size] = array[:self.__size]
+            return grown
+
+        self.__centers = grow(self.__centers, (capacity, 3))
+        self.__radii = grow(self.__radii, (capacity,))
+        self.__groups = grow(self.__groups, (capacity,))
+        self.__alive = grow(self.__alive, (capacity,))
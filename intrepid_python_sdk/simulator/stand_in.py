@@ -0,0 +1,465 @@
+import asyncio
+import base64
+import json
+import logging
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+# Lua scripts sent by the SDK start with a "-- intrepid:<name>" line, which the
+# stand-in uses to run an equivalent Python handler
+SCRIPT_TAG = re.compile(r"^\s*--\s*intrepid:([\w.]+)")
+
+# Centrifuge error codes
+ERROR_INTERNAL = 100
+ERROR_METHOD_NOT_FOUND = 104
+
+
+class StandInEntity:
+    """
+    Entity of the stand-in world model.
+    """
+
+    def __init__(self, entity: str, group: str, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), robot_id=None, mesh=None):
+        self.entity = entity
+        self.group = group
+        self.robot_id = robot_id
+        self.mesh = mesh
+        self.position = np.array(position, dtype=np.float64)
+        # rotation angles [yz, zx, xy]
+        self.rotation = np.array(rotation, dtype=np.float64)
+        self.lin_vel = np.zeros(3)
+        self.ang_vel = np.zeros(3)
+        self.accel = np.zeros(3)
+        # half size of the bounding box
+        self.extent = np.full(3, 0.5)
+        self.target = None
+        self.max_speed = 5.0
+        # image size (w, h) of cameras
+        self.size = None
+        # state fields the simulator returns as nil, e.g. global_position without GPS
+        self.missing_fields: set = set()
+
+    def __repr__(self):
+        return f"<StandInEntity entity='{self.entity}' group={self.group}>"
+
+    def get(self, field: str) -> dict:
+        if field in ("local_position", "global_position", "position"):
+            return _vec3(self.position)
+        if field == "rotation":
+            return dict(zip(("yz", "zx", "xy"), self.rotation.tolist()))
+        return _vec3(getattr(self, field))
+
+    def state(self, fields=("global_position", "local_position", "rotation", "lin_vel", "ang_vel", "accel")) -> dict:
+        return {field: self.get(field) for field in fields if field not in self.missing_fields}
+
+    def step(self, dt: float):
+        velocity = self.lin_vel
+        if self.target is not None:
+            offset = self.target - self.position
+            distance = np.linalg.norm(offset)
+            speed = min(self.max_speed, distance / dt) if dt > 0 else 0.0
+            velocity = offset / distance * speed if distance > 0 else np.zeros(3)
+        self.accel = (velocity - self.lin_vel) / dt if dt > 0 else np.zeros(3)
+        self.lin_vel = velocity
+        self.position = self.position + velocity * dt
+        self.rotation = self.rotation + self.ang_vel * dt
+
+
+class StandInSimulator:
+    """
+    In-process stand-in for the Intrepid Sim endpoint, used to test and
+    benchmark the simulator client without running the simulator.
+
+    Speaks the centrifuge JSON protocol on /connection/websocket, keeps a
+    small world model of entities and serves the RPCs used by the SDK.
+    Lua scripts (script.eval) are matched by their "-- intrepid:<name>" tag
+    and answered by Python handlers, see register_script.
+
+    Time advances through the "sync" channel as with the simulator: every
+    tick published by a client steps the world to that tick (microseconds)
+    and is pushed back to the subscribers.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, rpc_latency: float = 0.0):
+        """
+        @param host: interface to listen on
+        @param port: port to listen on, 0 picks a free one (see `port` after start())
+        @param rpc_latency: delay added to every RPC reply, in seconds
+        """
+        self.host = host
+        self.port = port
+        self.rpc_latency = rpc_latency
+        self.entities: Dict[str, StandInEntity] = {}
+        self.tick = 0
+        self.paused = False
+        # number of calls of every RPC method (script.eval calls are counted per script too)
+        self.rpc_counts: Counter = Counter()
+        self.__next_index = 1
+        self.__subscribers: Dict[str, set] = {}
+        self.__scripts: Dict[str, Callable[[Any], Any]] = {}
+        # prepared scripts installed in the (emulated) Lua environment
+        self.__installed: set[str] = set()
+        self.__methods: Dict[str, Callable[[Any], Any]] = {}
+        self.__object_methods: Dict[str, Callable[[StandInEntity, Any], Any]] = {}
+        self.__runner = None
+        self.__register_defaults()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/connection/websocket"
+
+    async def start(self):
+        app = web.Application()
+        app.add_routes([web.get("/connection/websocket", self.__websocket_handler)])
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, self.host, self.port)
+        await site.start()
+        self.port = self.__runner.addresses[0][1]
+        logger.info(f"Stand-in simulator listening on {self.url}")
+        return self
+
+    async def stop(self):
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def register_script(self, name: str, handler: Callable[[Any], Any]):
+        """
+        Answer script.eval calls of scripts tagged "-- intrepid:<name>".
+        The handler receives the script ARGS and returns the script result.
+        """
+        self.__scripts[name] = handler
+
+    def forget_scripts(self):
+        """
+        Drop the installed prepared scripts, as if the Lua environment was reset.
+        """
+        self.__installed.clear()
+
+    def register_rpc(self, method: str, handler: Callable[[Any], Any]):
+        self.__methods[method] = handler
+
+    def register_object_rpc(self, method: str, handler: Callable[[StandInEntity, Any], Any]):
+        """
+        Answer "object_<entity>.<method>" calls.
+        """
+        self.__object_methods[method] = handler
+
+    def add_entity(self, group: str, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), robot_id=None, mesh=None) -> StandInEntity:
+        # entity ids look like the simulator ones (base64 of index and generation)
+        entity = base64.b64encode(struct.pack("<II", self.__next_index, 1)).decode("ascii")
+        self.__next_index += 1
+        self.entities[entity] = StandInEntity(entity, group, position, rotation, robot_id, mesh)
+        return self.entities[entity]
+
+    def find(self, groups: List[str] | None = None) -> List[StandInEntity]:
+        return [e for e in self.entities.values() if not groups or e.group in groups]
+
+    def vehicle(self, robot_id: int) -> StandInEntity | None:
+        for entity in self.entities.values():
+            if entity.group == "vehicle" and entity.robot_id == robot_id:
+                return entity
+        return None
+
+    def step_to(self, tick: int):
+        dt = (tick - self.tick) / 1e6
+        if dt > 0:
+            for entity in self.entities.values():
+                entity.step(dt)
+        self.tick = max(self.tick, tick)
+
+    async def publish(self, channel: str, data: Any):
+        push = json.dumps({"push": {"channel": channel, "pub": {"data": data}}})
+        for websocket in list(self.__subscribers.get(channel, ())):
+            if not websocket.closed:
+                await websocket.send_str(push)
+
+    async def __websocket_handler(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                for line in message.data.strip().split("\n"):
+                    if line:
+                        await self.__handle_command(websocket, json.loads(line))
+        finally:
+            for subscribers in self.__subscribers.values():
+                subscribers.discard(websocket)
+        return websocket
+
+    async def __handle_command(self, websocket, command: dict):
+        command_id = command.get("id", 0)
+        if "connect" in command:
+            await self.__reply(websocket, command_id, "connect", {"client": f"stand-in-{id(websocket)}", "version": "stand-in"})
+        elif "subscribe" in command:
+            channel = command["subscribe"]["channel"]
+            self.__subscribers.setdefault(channel, set()).add(websocket)
+            await self.__reply(websocket, command_id, "subscribe", {})
+            if channel == "sync":
+                await self.publish("sync", self.tick)
+        elif "unsubscribe" in command:
+            self.__subscribers.get(command["unsubscribe"]["channel"], set()).discard(websocket)
+            await self.__reply(websocket, command_id, "unsubscribe", {})
+        elif "publish" in command:
+            publish = command["publish"]
+            await self.__reply(websocket, command_id, "publish", {})
+            if publish["channel"] == "sync":
+                if not self.paused:
+                    self.step_to(int(publish["data"]))
+                    await self.publish("sync", self.tick)
+            else:
+                await self.publish(publish["channel"], publish.get("data"))
+        elif "rpc" in command:
+            # RPCs are answered concurrently, as by the simulator
+            asyncio.ensure_future(self.__handle_rpc(websocket, command_id, command["rpc"]))
+        elif command_id:
+            await self.__error(websocket, command_id, ERROR_METHOD_NOT_FOUND, "unsupported command")
+
+    async def __handle_rpc(self, websocket, command_id: int, rpc: dict):
+        method = rpc.get("method", "")
+        data = rpc.get("data")
+        self.rpc_counts[method] += 1
+        try:
+            if self.rpc_latency:
+                await asyncio.sleep(self.rpc_latency)
+            result = self.__call(method, data)
+            if asyncio.iscoroutine(result):
+                result = await result
+            reply = json.dumps({"id": command_id, "rpc": {"data": result}})
+        except LookupError as e:
+            await self.__error(websocket, command_id, ERROR_METHOD_NOT_FOUND, str(e))
+            return
+        except Exception as e:
+            logger.exception(f"stand-in rpc {method} failed")
+            await self.__error(websocket, command_id, ERROR_INTERNAL, str(e))
+            return
+        if not websocket.closed:
+            await websocket.send_str(reply)
+
+    def __call(self, method: str, data: Any) -> Any:
+        if method == "script.eval":
+            return self.__eval(data.get("code", ""), data.get("args"))
+        if method in self.__methods:
+            return self.__methods[method](data)
+        if method.startswith("object_"):
+            entity, _, op = method[len("object_"):].rpartition(".")
+            if op in self.__object_methods:
+                return self.__object_methods[op](self.__entity(entity), data)
+        raise LookupError(f"unknown method {method}")
+
+    def __eval(self, code: str, args: Any) -> Any:
+        match = SCRIPT_TAG.match(code)
+        if match is None:
+            raise LookupError("stand-in cannot run untagged scripts")
+        name = match.group(1)
+
+        # prepared script call, see simulator.scripts
+        if name == "call":
+            self.rpc_counts[f"script.eval:call:{args['name']}"] += 1
+            if args["name"] not in self.__installed:
+                return {"missing": True}
+            return {"result": self.__script(args["name"])(args["args"])}
+
+        handler = self.__script(name)
+        self.rpc_counts[f"script.eval:{name}"] += 1
+        if f'_INTREPID["{name}"]' in code:
+            self.__installed.add(name)
+            return {"result": handler(args)}
+        return handler(args)
+
+    def __script(self, name: str) -> Callable[[Any], Any]:
+        # "name.variant" scripts fall back to the handler of "name"
+        handler = self.__scripts.get(name) or self.__scripts.get(name.split(".")[0])
+        if handler is None:
+            raise LookupError(f"stand-in has no handler for script {name}")
+        return handler
+
+    def __entity(self, entity: str) -> StandInEntity:
+        if entity not in self.entities:
+            raise KeyError(f"entity {entity} not found")
+        return self.entities[entity]
+
+    async def __reply(self, websocket, command_id: int, kind: str, result: dict):
+        if not websocket.closed:
+            await websocket.send_str(json.dumps({"id": command_id, kind: result}))
+
+    async def __error(self, websocket, command_id: int, code: int, message: str):
+        if not websocket.closed:
+            await websocket.send_str(json.dumps({"id": command_id, "error": {"code": code, "message": message}}))
+
+    def __register_defaults(self):
+        def spawn_vehicle(data):
+            if any(e.robot_id == data["robot_id"] for e in self.entities.values()):
+                raise ValueError(f"robot id {data['robot_id']} is already spawned")
+            return self.add_entity("vehicle", _xyz(data["position"]), _angles(data.get("rotation")), robot_id=data["robot_id"]).entity
+
+        def set_rotation(entity, data):
+            entity.rotation = np.array(_angles(data))
+
+        def set_paused(paused):
+            def handler(data):
+                self.paused = paused
+            return handler
+
+        def spawn_camera(data):
+            camera = self.add_entity("sensor", _xyz(data["position"]), _angles(data.get("rotation")))
+            camera.size = (data["size"]["w"], data["size"]["h"])
+            return camera.entity
+
+        def request_image(entity, data):
+            # plain image whose red channel is the tick in milliseconds (mod 256)
+            width, height = entity.size or (64, 48)
+            image = np.zeros((height, width, 3), dtype=np.uint8)
+            image[..., 0] = (self.tick // 1000) % 256
+            return {"data": "data:image/png;base64," + base64.b64encode(_png(image)).decode("ascii")}
+
+        def despawn(entity, data):
+            del self.entities[entity.entity]
+
+        def position_control(entity, data):
+            entity.target = np.array([data["x"], data["y"], data["z"]], dtype=np.float64)
+
+        def velocity_control(entity, data):
+            entity.target = None
+            entity.lin_vel = np.array([data["vx"], data["vy"], data["z"] - entity.position[2]], dtype=np.float64)
+
+        def abstract_sensor(args):
+            anchor = self.__entity(args["anchor"])
+            found = []
+            for entity in self.find(args.get("groups")):
+                if entity is anchor or np.linalg.norm(entity.position - anchor.position) > args["radius"]:
+                    continue
+                found.append({
+                    "entity": entity.entity,
+                    "group": entity.group,
+                    "position": entity.get("position"),
+                    "rotation": entity.get("rotation"),
+                    "bbox": {"min": _vec3(entity.position - entity.extent), "max": _vec3(entity.position + entity.extent)},
+                    "bsphere": {"center": entity.get("position"), "radius": float(np.linalg.norm(entity.extent))},
+                    "robot_id": entity.robot_id,
+                })
+            return found
+
+        def abstract_sensor_columns(args):
+            columns = {"entity": [], "group": [], "position": [], "rotation": [], "bbox": [], "bsphere": [], "robot_id": []}
+            for found in abstract_sensor(args):
+                columns["entity"].append(found["entity"])
+                columns["group"].append(found["group"])
+                columns["position"].extend(found["position"].values())
+                columns["rotation"].extend(found["rotation"].values())
+                columns["bbox"].extend([*found["bbox"]["min"].values(), *found["bbox"]["max"].values()])
+                columns["bsphere"].extend([*found["bsphere"]["center"].values(), found["bsphere"]["radius"]])
+                columns["robot_id"].append(-1 if found["robot_id"] is None else found["robot_id"])
+            # empty Lua tables are encoded as objects
+            return {name: column or {} for name, column in columns.items()}
+
+        def spawn_many(specs):
+            spawners = {
+                "uav": spawn_vehicle,
+                "ugv": spawn_vehicle,
+                "obstacle": self.__methods["map.spawn"],
+                "road": self.__methods["map.spawn_road"],
+                "goal": self.__methods["map.spawn_goal"],
+            }
+            result = []
+            for spec in specs:
+                try:
+                    result.append(spawners[spec["kind"]](spec["params"]) or False)
+                except Exception as e:
+                    result.append({"error": str(e)})
+            return result
+
+        def get_states(args):
+            return [self.__entity(entity).state(args["fields"]) for entity in args["entities"]]
+
+        self.__methods.update({
+            "session.restart": lambda data: self.entities.clear(),
+            "session.pause": set_paused(True),
+            "session.run": set_paused(False),
+            "session.exit": lambda data: None,
+            "map.find_all": lambda data: [{"entity": e.entity, "group": e.group} for e in self.find((data or {}).get("groups"))],
+            "map.spawn": lambda data: self.add_entity("obstacle", _xyz(data["position"]), _angles(data.get("rotation")), mesh=data.get("mesh")).entity,
+            "map.spawn_uav": spawn_vehicle,
+            "map.spawn_ugv": spawn_vehicle,
+            "map.spawn_goal": lambda data: self.add_entity("goal", _xyz(data["position"])).entity,
+            "map.spawn_road": lambda data: None,
+            "map.spawn_camera": spawn_camera,
+            "gizmos.draw_line": lambda data: None,
+            "gizmos.draw_sphere": lambda data: None,
+        })
+        self.__object_methods.update({
+            "state": lambda entity, data: {
+                "position": entity.get("position"),
+                "rotation": entity.get("rotation"),
+                "lin_vel": entity.get("lin_vel"),
+            },
+            "set_position": lambda entity, data: setattr(entity, "position", np.array(_xyz(data))),
+            "set_rotation_angles": set_rotation,
+            "despawn": despawn,
+            "request_image": request_image,
+            "position_control": position_control,
+            "velocity_control": velocity_control,
+        })
+        self.__scripts.update({
+            "find_vehicles": lambda args: [{"id": e.robot_id, "entity": e.entity} for e in self.find(["vehicle"])],
+            "get_states": get_states,
+            "abstract_sensor": abstract_sensor,
+            "abstract_sensor_columns": abstract_sensor_columns,
+            "spawn_many": spawn_many,
+            "entity_bounds": lambda entities: [value for entity in entities
+                                               for value in (*self.__entity(entity).position.tolist(), float(np.linalg.norm(self.__entity(entity).extent)))],
+            "capture_all": lambda cameras: [request_image(self.__entity(camera), None)["data"] for camera in cameras],
+        })
+
+
+def _vec3(value) -> dict:
+    x, y, z = value.tolist()
+    return {"x": x, "y": y, "z": z}
+
+
+def _xyz(data) -> tuple:
+    if isinstance(data, dict):
+        return data.get("x", 0.0), data.get("y", 0.0), data.get("z", 0.0)
+    return tuple(data)
+
+
+def _angles(data) -> tuple:
+    if data is None:
+        return 0.0, 0.0, 0.0
+    if isinstance(data, dict):
+        return data.get("yz", 0.0), data.get("zx", 0.0), data.get("xy", 0.0)
+    return tuple(data)
+
+
+def _png(image: np.ndarray) -> bytes:
+    """
+    Encode an RGB uint8 image as PNG.
+    """
+    height, width, _ = image.shape
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    # filter type 0 before every row
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, width * 3)], axis=1)
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows.tobytes()))
+            + chunk(b"IEND", b""))
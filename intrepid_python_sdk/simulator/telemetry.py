@@ -0,0 +1,274 @@
+"""
+Columnar telemetry of per-tick entity states.
+
+A TelemetryRecorder attached to a Simulator (Simulator.add_recorder) reads
+the state of its entities once per tick and copies it into preallocated
+column buffers, one (chunk_size, entities, 3) array per state field. Full
+chunks are written by a background thread to an .npz file, so the tick
+loop only pays for the state read (shared with the controllers through the
+tick cache) and a row copy.
+
+The file holds one array per field and chunk, read back with
+read_telemetry:
+
+    recorder = TelemetryRecorder("run.npz", vehicles, fields=("local_position", "lin_vel"))
+    sim.add_recorder(recorder)
+    ...
+    recorder.close()
+
+    telemetry = read_telemetry("run.npz")
+    telemetry.fields["local_position"]   # (ticks, vehicles, 3)
+"""
+
+import logging
+import queue
+import threading
+import time
+import zipfile
+from operator import itemgetter
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from .simulator import STATE_FIELDS, Entity, Vehicle
+
+logger = logging.getLogger(__name__)
+
+# Components of every state field, in column order
+FIELD_COMPONENTS = {field: ("yz", "zx", "xy") if field == "rotation" else ("x", "y", "z") for field in STATE_FIELDS}
+
+_COMPONENT_GETTERS = {field: itemgetter(*keys) for field, keys in FIELD_COMPONENTS.items()}
+
+_MISSING = (np.nan, np.nan, np.nan)
+
+
+class TelemetryRecorder:
+    """
+    Records the state of a fixed set of entities on every tick.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        entities: Iterable["Entity | str"],
+        fields: Iterable[str] = tuple(STATE_FIELDS),
+        chunk_size: int = 1024,
+        dtype=np.float64,
+        compress: bool = False,
+    ):
+        """
+        @param path: .npz file to write
+        @param entities: recorded entities, Entity objects or entity ids
+        @param fields: state fields to record, see STATE_FIELDS
+        @param chunk_size: ticks per buffer, a full buffer is written in the background
+        @param dtype: dtype of the state columns, np.float32 halves the file size
+        @param compress: deflate the file entries (smaller file, slower writer thread)
+        """
+        entities = list(entities)
+        self.fields = tuple(fields)
+        unknown = set(self.fields) - STATE_FIELDS.keys()
+        if unknown:
+            raise ValueError(f"unknown state fields: {sorted(unknown)}")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(dtype)
+        self.__entities = [e.entity() if isinstance(e, Entity) else e for e in entities]
+        self.__vehicle_ids = np.array([e.id() if isinstance(e, Vehicle) else -1 for e in entities], dtype=np.int64)
+
+        # ticks recorded, seconds spent in record() (state conversion and copy)
+        self.ticks = 0
+        self.record_seconds = 0.0
+        # buffers allocated because the writer fell behind
+        self.allocated = 0
+
+        self.__free: queue.SimpleQueue = queue.SimpleQueue()
+        self.__buffer = self.__new_buffer()
+        self.__row = 0
+        self.__chunks = 0
+        self.__closed = False
+        self.__error: BaseException | None = None
+        self.__pending: queue.SimpleQueue = queue.SimpleQueue()
+        self.__zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+        self.__write("entities", np.array(self.__entities, dtype=str))
+        self.__write("vehicle_ids", self.__vehicle_ids)
+        self.__writer = threading.Thread(target=self.__run_writer, name="intrepid-telemetry", daemon=True)
+        self.__writer.start()
+
+    def __repr__(self):
+        return f"<TelemetryRecorder '{self.path}' entities={len(self.__entities)} ticks={self.ticks}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def entities(self) -> List[str]:
+        return list(self.__entities)
+
+    async def capture(self, sim, tick: int | None = None):
+        """
+        Read the state of the entities (one RPC, or none when already read
+        during this tick) and record it.
+
+        @param sim: Simulator
+        @param tick: tick of the states, the last sync tick by default
+        """
+        client = sim.client()
+        states = await client.get_states(self.__entities, self.fields)
+        self.record(client.tick() if tick is None else tick, states)
+
+    def record(self, tick: int, states: List[dict]):
+        """
+        Append one tick.
+
+        @param tick: simulator tick (microseconds)
+        @param states: one dictionary of fields per entity, as returned by SimClient.get_states,
+                       missing (None) fields are recorded as NaN
+        """
+        if self.__error is not None:
+            raise RuntimeError("Telemetry writer failed") from self.__error
+        if self.__closed:
+            raise RuntimeError("Telemetry recorder is closed")
+
+        started = time.perf_counter()
+        row = self.__row
+        self.__buffer["tick"][row] = -1 if tick is None else tick
+        for field in self.fields:
+            components = _COMPONENT_GETTERS[field]
+            self.__buffer[field][row] = [_MISSING if (value := state[field]) is None else components(value)
+                                         for state in states]
+        self.__row += 1
+        self.ticks += 1
+        if self.__row == self.chunk_size:
+            self.flush()
+        self.record_seconds += time.perf_counter() - started
+
+    def flush(self):
+        """
+        Hand the buffered ticks to the writer thread.
+        """
+        if self.__row == 0:
+            return
+        self.__pending.put((self.__chunks, self.__buffer, self.__row))
+        self.__chunks += 1
+        self.__row = 0
+        try:
+            self.__buffer = self.__free.get_nowait()
+        except queue.Empty:
+            self.__buffer = self.__new_buffer()
+            self.allocated += 1
+
+    def close(self):
+        """
+        Write the buffered ticks and finish the file.
+        """
+        if self.__closed:
+            return
+        self.flush()
+        self.__closed = True
+        self.__pending.put(None)
+        self.__writer.join()
+        self.__zip.close()
+        if self.__error is not None:
+            raise RuntimeError("Telemetry writer failed") from self.__error
+
+    def __new_buffer(self) -> Dict[str, np.ndarray]:
+        buffer = {"tick": np.zeros(self.chunk_size, dtype=np.int64)}
+        for field in self.fields:
+            buffer[field] = np.zeros((self.chunk_size, len(self.__entities), 3), dtype=self.dtype)
+        return buffer
+
+    def __write(self, name: str, array: np.ndarray):
+        with self.__zip.open(name + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+    def __run_writer(self):
+        while (item := self.__pending.get()) is not None:
+            chunk, buffer, rows = item
+            try:
+                if self.__error is None:
+                    for name, column in buffer.items():
+                        self.__write(f"{name}_{chunk:05d}", column[:rows])
+            except Exception as e:
+                logger.error(f"Writing telemetry to {self.path} failed: {e!r}")
+                self.__error = e
+            self.__free.put(buffer)
+
+
+class Telemetry:
+    """
+    Recorded telemetry: one row per tick, one column per entity.
+    """
+    __slots__ = ("tick", "entities", "vehicle_ids", "fields")
+
+    def __init__(self, tick: np.ndarray, entities: List[str], vehicle_ids: np.ndarray, fields: Dict[str, np.ndarray]):
+        """
+        @param tick: (T,) simulator ticks (microseconds)
+        @param entities: recorded entity ids
+        @param vehicle_ids: (N,) vehicle id of every entity, -1 for other entities
+        @param fields: {field: (T, N, 3) array}
+        """
+        self.tick = tick
+        self.entities = entities
+        self.vehicle_ids = vehicle_ids
+        self.fields = fields
+
+    def __repr__(self):
+        return f"<Telemetry ticks={len(self)} entities={len(self.entities)} fields={list(self.fields)}>"
+
+    def __len__(self):
+        return len(self.tick)
+
+    def seconds(self) -> np.ndarray:
+        """
+        @return: (T,) simulation time in seconds
+        """
+        return self.tick / 1e6
+
+    def entity(self, entity: "Entity | str") -> Dict[str, np.ndarray]:
+        """
+        @return: {field: (T, 3) array} of one entity
+        """
+        column = self.entities.index(entity.entity() if isinstance(entity, Entity) else entity)
+        return {field: values[:, column] for field, values in self.fields.items()}
+
+    def vehicle(self, vehicle_id: int) -> Dict[str, np.ndarray]:
+        """
+        @return: {field: (T, 3) array} of one vehicle
+        """
+        (columns,) = np.nonzero(self.vehicle_ids == vehicle_id)
+        if len(columns) == 0:
+            raise KeyError(f"vehicle {vehicle_id} was not recorded")
+        return {field: values[:, columns[0]] for field, values in self.fields.items()}
+
+
+def read_telemetry(path: str, fields: Iterable[str] | None = None) -> Telemetry:
+    """
+    Load a file written by TelemetryRecorder.
+
+    @param fields: fields to load, all recorded fields by default
+    """
+    with np.load(path, allow_pickle=False) as data:
+        chunks: Dict[str, List[str]] = {}
+        for key in sorted(data.files, key=lambda key: int(key.rpartition("_")[2]) if key[-1].isdigit() else -1):
+            name, _, chunk = key.rpartition("_")
+            if chunk.isdigit():
+                chunks.setdefault(name, []).append(key)
+        recorded = [name for name in chunks if name != "tick"]
+        wanted = recorded if fields is None else list(fields)
+        missing = set(wanted) - set(recorded)
+        if missing:
+            raise KeyError(f"fields not recorded: {sorted(missing)}")
+
+        entities = data["entities"].tolist()
+        columns = {}
+        for name in ["tick", *wanted]:
+            parts = [data[key] for key in chunks.get(name, [])]
+            if parts:
+                columns[name] = np.concatenate(parts)
+            elif name == "tick":
+                columns[name] = np.zeros(0, dtype=np.int64)
+            else:
+                columns[name] = np.zeros((0, len(entities), 3))
+        return Telemetry(columns.pop("tick"), entities, data["vehicle_ids"], columns)
@@ -0,0 +1,141 @@
+"""
+Per-tick timing statistics of the Simulator sync loop.
+"""
+
+import csv
+import logging
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Per-tick samples, in milliseconds except the tick and rpc_count
+TIMING_METRICS = ("callback_ms", "rpc_ms", "slack_ms")
+
+# Default histogram bin edges (milliseconds), slack goes below zero on overruns
+DEFAULT_BINS_MS = np.array([-1000.0, -100.0, -10.0, -1.0, 0.0, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0])
+
+
+class TickStats:
+    """
+    Timing of the on_tick callbacks and overrun counters.
+
+    The last `capacity` ticks are kept in ring buffers, counters cover the
+    whole run.
+
+    callback_ms: duration of on_tick
+    rpc_ms: time spent in simulator RPCs while on_tick ran (overlapping RPCs add up)
+    slack_ms: step duration minus callback duration, negative when the callback
+              does not keep up with the simulation
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.__ticks = np.zeros(capacity, dtype=np.int64)
+        self.__rpc_count = np.zeros(capacity, dtype=np.int64)
+        self.__samples = {metric: np.zeros(capacity) for metric in TIMING_METRICS}
+        self.__next = 0
+        self.reset_counters()
+
+    def __repr__(self):
+        return f"<TickStats ticks={self.ticks} skipped={self.skipped} coalesced={self.coalesced} overruns={self.overruns}>"
+
+    def reset_counters(self):
+        # callbacks run
+        self.ticks = 0
+        # ticks received while a callback was running and dropped
+        self.skipped = 0
+        # ticks received while busy and replaced by a later one (queue latest policy)
+        self.coalesced = 0
+        # callbacks longer than the step duration
+        self.overruns = 0
+        # callbacks that raised
+        self.errors = 0
+        # time the simulator waited for the sync publish (block policy)
+        self.blocked_ms = 0.0
+
+    def reset(self):
+        self.__next = 0
+        self.reset_counters()
+
+    def record(self, tick: int, callback_ms: float, rpc_ms: float, rpc_count: int, step_ms: float):
+        row = self.__next % self.capacity
+        slack_ms = step_ms - callback_ms
+        self.__ticks[row] = tick
+        self.__rpc_count[row] = rpc_count
+        self.__samples["callback_ms"][row] = callback_ms
+        self.__samples["rpc_ms"][row] = rpc_ms
+        self.__samples["slack_ms"][row] = slack_ms
+        self.__next += 1
+        self.ticks += 1
+        if slack_ms < 0:
+            self.overruns += 1
+
+    def samples(self) -> Dict[str, np.ndarray]:
+        """
+        @return: the recorded ticks, oldest first: {"tick", "rpc_count", *TIMING_METRICS: array}
+        """
+        count = min(self.__next, self.capacity)
+        order = np.arange(self.__next - count, self.__next) % self.capacity
+        result = {"tick": self.__ticks[order], "rpc_count": self.__rpc_count[order]}
+        result.update({metric: values[order] for metric, values in self.__samples.items()})
+        return result
+
+    def histogram(self, metric: str = "callback_ms", bins=DEFAULT_BINS_MS) -> tuple[np.ndarray, np.ndarray]:
+        """
+        @return: counts and bin edges of the recorded samples, values outside the edges are
+                 counted in the first and last bins
+        """
+        edges = np.asarray(bins, dtype=np.float64)
+        values = np.clip(self.samples()[metric], edges[0], edges[-1])
+        counts, _ = np.histogram(values, bins=edges)
+        return counts, edges
+
+    def summary(self) -> dict:
+        """
+        @return: counters and, per metric, mean/p50/p95/p99/min/max of the recorded samples
+        """
+        samples = self.samples()
+        result = {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "overruns": self.overruns,
+            "errors": self.errors,
+            "blocked_ms": self.blocked_ms,
+        }
+        for metric in TIMING_METRICS:
+            values = samples[metric]
+            if len(values) == 0:
+                result[metric] = None
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            result[metric] = {
+                "mean": float(values.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99),
+                "min": float(values.min()), "max": float(values.max()),
+            }
+        return result
+
+    def to_dict(self) -> dict:
+        """
+        JSON serialisable export: summary, histograms and samples.
+        """
+        return {
+            "summary": self.summary(),
+            "histograms": {
+                metric: dict(zip(("counts", "edges"), (a.tolist() for a in self.histogram(metric))))
+                for metric in TIMING_METRICS
+            },
+            "samples": {name: values.tolist() for name, values in self.samples().items()},
+        }
+
+    def write_csv(self, path: str):
+        """
+        Write the recorded samples, one row per tick.
+        """
+        samples = self.samples()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(samples.keys())
+            writer.writerows(zip(*(values.tolist() for values in samples.values())))
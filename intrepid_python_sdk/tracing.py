@@ -0,0 +1,155 @@
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+
+class Tracer:
+    """
+    Span tracer for the node server.
+
+    Spans are written as Chrome trace events (JSON array format), so a trace
+    file can be opened directly in Perfetto (https://ui.perfetto.dev) or in
+    chrome://tracing. Every websocket connection is shown as a process and
+    every node of that connection as a thread.
+
+    @param path: file the trace events are written to.
+    @param sample_rate: fraction of frames that are traced (0.0 - 1.0).
+    @param max_events: maximum number of events written to the file. Once reached
+                       the tracer stops recording.
+    @param buffer_size: number of events kept in memory before they are flushed to the file.
+    """
+
+    def __init__(self, path: str, *, sample_rate: float = 1.0, max_events: int = 1_000_000, buffer_size: int = 1024):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0")
+        if max_events <= 0:
+            raise ValueError("max_events must be greater than 0")
+
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_events = max_events
+        self.buffer_size = max(1, buffer_size)
+        self.num_events = 0
+        self.num_dropped_frames = 0
+        self.__buffer: List[str] = []
+        self.__file = None
+        self.__origin_ns = time.perf_counter_ns()
+
+    @property
+    def is_full(self) -> bool:
+        return self.num_events >= self.max_events
+
+    def now_us(self) -> float:
+        return (time.perf_counter_ns() - self.__origin_ns) / 1000
+
+    def frame(self, connection: int) -> "FrameTrace | None":
+        """
+        Start tracing a single frame received on a connection.
+        Returns None when the frame is not sampled or the trace is full.
+        """
+        if self.is_full:
+            self.num_dropped_frames += 1
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        return FrameTrace(self, connection)
+
+    def name_connection(self, connection: int, name: str):
+        self.__metadata("process_name", connection, 0, name)
+
+    def name_node(self, connection: int, node: int, name: str):
+        self.__metadata("thread_name", connection, node, name)
+
+    def complete(self, name: str, start_us: float, end_us: float, pid: int, tid: int, args: Dict[str, Any] | None = None):
+        """
+        Record a complete ("X") event.
+        """
+        event = {
+            "name": name,
+            "cat": "node",
+            "ph": "X",
+            "ts": round(start_us, 3),
+            "dur": round(end_us - start_us, 3),
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self.__append(event)
+
+    def flush(self):
+        if not self.__buffer:
+            return
+        if self.__file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.__file = open(self.path, "w")
+            self.__file.write("[\n")
+        else:
+            # separator after the events of the previous flush
+            self.__file.write(",\n")
+        self.__file.write(",\n".join(self.__buffer))
+        self.__file.flush()
+        self.__buffer.clear()
+
+    def close(self):
+        """
+        Flush pending events and terminate the JSON array.
+        """
+        self.flush()
+        if self.__file is not None:
+            self.__file.write("\n]\n")
+            self.__file.close()
+            self.__file = None
+
+    def __metadata(self, name: str, pid: int, tid: int, value: str):
+        self.__append({"name": name, "ph": "M", "pid": pid, "tid": tid, "args": {"name": value}})
+
+    def __append(self, event: dict):
+        if self.is_full:
+            return
+        self.num_events += 1
+        self.__buffer.append(json.dumps(event, separators=(",", ":")))
+        if len(self.__buffer) >= self.buffer_size:
+            self.flush()
+
+
+class FrameTrace:
+    """
+    Spans of one websocket frame. The node index is known only after the
+    frame has been parsed, so it can be set at any time before the first
+    span is closed.
+    """
+
+    def __init__(self, tracer: Tracer, connection: int):
+        self.tracer = tracer
+        self.connection = connection
+        self.node = 0
+        self.args: Dict[str, Any] = {}
+        self.start_us = tracer.now_us()
+
+    def span(self, name: str) -> "_Span":
+        return _Span(self, name)
+
+    def finish(self):
+        self.tracer.complete("frame", self.start_us, self.tracer.now_us(), self.connection, self.node, self.args)
+
+
+class _Span:
+    __slots__ = ("frame", "name", "start_us")
+
+    def __init__(self, frame: FrameTrace, name: str):
+        self.frame = frame
+        self.name = name
+
+    def __enter__(self):
+        self.start_us = self.frame.tracer.now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        frame = self.frame
+        frame.tracer.complete(self.name, self.start_us, frame.tracer.now_us(), frame.connection, frame.node)
+        return False
@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 
+import asyncio
 import json
+import logging
 import signal
 import sys
 
@@ -11,6 +13,28 @@ def signal_handler(sig, frame):
     print("Ctrl+C detected. Goodbye...")
     sys.exit(0)
 
+def new_event_loop(kind: str | None = "auto") -> asyncio.AbstractEventLoop:
+    """
+    Create a new event loop.
+
+    @param kind: "asyncio" for the default loop, "uvloop" for uvloop, "auto" (or None)
+                 to use uvloop when it is installed. uvloop falls back to the default
+                 loop when it is not available.
+    @return: the new event loop.
+    """
+    if kind not in (None, "auto", "asyncio", "uvloop"):
+        raise ValueError(f"unsupported event loop: {kind}")
+
+    if kind in (None, "auto", "uvloop"):
+        try:
+            import uvloop
+            return uvloop.new_event_loop()
+        except ImportError:
+            if kind == "uvloop":
+                logging.getLogger(__name__).warning("uvloop is not installed, falling back to the asyncio event loop")
+
+    return asyncio.new_event_loop()
+
 def log(tag, level, message, start_config=None):
     configuration = start_config if start_config is not None else intrepid_python_sdk.Intrepid.config()
     if configuration is not None:
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from intrepid_python_sdk.binary_codec import compile_codec, pack_frame, unpack_frame
+from intrepid_python_sdk.intrepid_types import Rotor3, U16, Vec3
+
+
+class Pose(BaseModel):
+    position: Vec3
+    rotation: Rotor3
+    id: U16
+    valid: bool
+
+
+class Label(BaseModel):
+    name: str
+
+
+def test_vec3_array_is_contiguous():
+    codec = compile_codec(Vec3)
+    points = [Vec3(x=i, y=2 * i, z=3 * i) for i in range(100)]
+
+    buffer = codec.pack(points)
+    assert len(buffer) == 100 * 24
+    assert codec.unpack(buffer) == points
+    assert codec.to_numpy(buffer)["y"][10] == 20.0
+
+
+def test_nested_model_roundtrip():
+    codec = compile_codec(Pose)
+    poses = [Pose(position=Vec3(x=i, y=0, z=1), rotation=Rotor3(s=1, yz=0, zx=0, xy=0), id=i, valid=i % 2 == 0) for i in range(5)]
+
+    assert codec.format == "<dddddddH?"
+    assert codec.unpack(codec.pack(poses)) == poses
+
+
+def test_variable_size_model_has_no_codec():
+    assert compile_codec(Label) is None
+    assert compile_codec(float) is None
+
+
+def test_frame_roundtrip():
+    header, buffers = unpack_frame(pack_frame('{"id": 1}', [b"abc", b"", b"\x00" * 8]))
+    assert header == b'{"id": 1}'
+    assert [bytes(buffer) for buffer in buffers] == [b"abc", b"", b"\x00" * 8]
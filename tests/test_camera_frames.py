@@ -0,0 +1,96 @@
+import asyncio
+import numpy as np
+import pytest
+from intrepid_python_sdk.simulator import FrameDecoder, LatestFrameBuffer, Position, Rotation, Simulator, \
+    StandInSimulator, decode_frame
+
+pytest.importorskip("PIL")
+
+
+async def spawn_camera(stand_in):
+    sim = Simulator(stand_in.host, stand_in.port)
+    await sim.connect()
+    vehicle = await sim.spawn_uav(1, Position(0, 0, 0), Rotation(0, 0, 0))
+    camera = await vehicle.spawn_camera(position=[0, 0, 0], rotation=[0, 0, 0], size=[32, 24])
+    return sim, camera
+
+
+@pytest.mark.asyncio
+async def test_capture_frame_decodes_in_pool():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        stand_in.tick = 7000
+        sim, camera = await spawn_camera(stand_in)
+
+        data = await camera.capture()
+        assert data.startswith("data:image/png;base64,")
+        assert decode_frame(data).shape == (24, 32, 3)
+
+        decoder = FrameDecoder(max_workers=2)
+        frame = await camera.capture_frame(decoder)
+        assert frame.entity == camera.entity()
+        assert frame.image.dtype == np.uint8 and frame.image.shape == (24, 32, 3)
+        assert (frame.image[..., 0] == 7).all()
+        assert len(await decoder.decode_many([data] * 4)) == 4
+        decoder.shutdown()
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_latest_frames():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        sim, camera = await spawn_camera(stand_in)
+
+        sequences = []
+        async for frame in camera.stream(rate=100.0):
+            sequences.append(frame.sequence)
+            # slow consumer, the stream skips frames instead of queueing them
+            await asyncio.sleep(0.05)
+            if len(sequences) == 4:
+                break
+        assert sequences == sorted(set(sequences))
+        assert sequences[-1] - sequences[0] > 3
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_latest_frame_buffer():
+    buffer = LatestFrameBuffer(2)
+    for i in range(5):
+        buffer.put(i)
+    assert buffer.dropped == 3
+    assert [await buffer.get(), await buffer.get()] == [3, 4]
+
+    buffer.close()
+    assert await buffer.get() is None
+
+    buffer = LatestFrameBuffer()
+    buffer.fail(ValueError("capture failed"))
+    with pytest.raises(ValueError):
+        await buffer.get()
+
+
+@pytest.mark.asyncio
+async def test_capture_all_single_call():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        stand_in.tick = 12_000
+        sim, camera = await spawn_camera(stand_in)
+        vehicle = await sim.get_vehicle(1)
+        cameras = [camera] + [await vehicle.spawn_camera(position=[0, 0, 0], rotation=[0, 0, 0], size=[32, 24]) for _ in range(3)]
+        sim.client().set_tick(12_000)
+        stand_in.rpc_counts.clear()
+
+        frames = await sim.capture_all(cameras)
+        assert stand_in.rpc_counts["script.eval"] == 1
+        assert frames.tick == 12_000 and len(frames) == 4
+        assert [frame.entity for frame in frames] == [c.entity() for c in cameras]
+        assert all(frame.tick == 12_000 for frame in frames)
+        assert frames.by_entity(cameras[2].entity()) is frames[2]
+        stacked = frames.stack()
+        assert stacked.shape == (4, 24, 32, 3) and (stacked[..., 0] == 12).all()
+
+        await sim.disconnect()
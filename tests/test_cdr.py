@@ -0,0 +1,72 @@
+import struct
+from datetime import datetime, timedelta, timezone
+from intrepid_python_sdk.cdr import CdrReader, CdrWriter
+from intrepid_python_sdk.intrepid_types import Vec3
+from intrepid_python_sdk.message import IntrepidMessage, Opcode
+
+
+def test_primitive_alignment():
+    writer = CdrWriter()
+    writer.write_uint8(1)
+    writer.write_uint32(2)
+    writer.write_uint16(3)
+    writer.write_float64(4.0)
+    data = writer.getvalue()
+
+    # header, u8, 3 pad, u32, u16, 6 pad, f64
+    assert data[:4] == b"\x00\x01\x00\x00"
+    assert data[4:] == b"\x01\x00\x00\x00" + b"\x02\x00\x00\x00" + b"\x03\x00" + b"\x00" * 6 + b"\x00\x00\x00\x00\x00\x00\x10\x40"
+
+    reader = CdrReader(data)
+    assert reader.read_uint8() == 1
+    assert reader.read_uint32() == 2
+    assert reader.read_uint16() == 3
+    assert reader.read_float64() == 4.0
+
+
+def test_string_encoding():
+    writer = CdrWriter()
+    writer.write_string("abc")
+    assert writer.getvalue()[4:] == b"\x04\x00\x00\x00abc\x00"
+    assert CdrReader(writer.getvalue()).read_string() == "abc"
+
+
+def test_message_roundtrip():
+    timestamp = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    payload = {"target": Vec3(x=1, y=2, z=3), "path": [0.5, 1.5], "id": 7, "name": "uav", "ok": True, "raw": b"\x01\x02"}
+    message = IntrepidMessage(Opcode.WRITE, payload, timestamp, "node/out", priority=2)
+
+    decoded = IntrepidMessage.deserialize(message.serialize())
+    assert decoded.opcode == Opcode.WRITE
+    assert decoded.timestamp == timestamp
+    assert decoded.recipient == "node/out"
+    assert decoded.priority == 2
+    assert decoded.payload["target"] == {"x": 1.0, "y": 2.0, "z": 3.0}
+    assert decoded.payload["path"].tolist() == [0.5, 1.5]
+    assert bytes(decoded.payload["raw"]) == b"\x01\x02"
+    assert (decoded.payload["id"], decoded.payload["name"], decoded.payload["ok"]) == (7, "uav", True)
+
+
+
+def test_message_timestamps_are_utc():
+    # naive timestamps are local time
+    local = datetime(2025, 6, 1, 12, 0, 0, 999999)
+    message = IntrepidMessage(Opcode.WRITE, None, local, "node/out")
+    decoded = IntrepidMessage.deserialize(message.serialize())
+    assert decoded.timestamp.tzinfo is timezone.utc
+    assert decoded.timestamp == local.astimezone(timezone.utc)
+
+    # exact microseconds, also before the epoch
+    for timestamp in (datetime(2038, 1, 19, 3, 14, 7, 1, tzinfo=timezone.utc),
+                      datetime(1969, 12, 31, 23, 59, 59, 500000, tzinfo=timezone(timedelta(hours=2)))):
+        message = IntrepidMessage(Opcode.WRITE, None, timestamp, "node/out")
+        assert IntrepidMessage.deserialize(message.serialize()).timestamp == timestamp
+
+
+def test_float_sequence_is_not_copied():
+    data = bytearray(IntrepidMessage(Opcode.WRITE, [1.0, 2.0, 3.0], datetime.now(), "n").serialize())
+    decoded = IntrepidMessage.deserialize(data)
+    assert decoded.payload.tolist() == [1.0, 2.0, 3.0]
+
+    data[-8:] = struct.pack("<d", 9.0)
+    assert decoded.payload[2] == 9.0
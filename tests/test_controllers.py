@@ -0,0 +1,43 @@
+import asyncio
+import re
+import pytest
+from intrepid_python_sdk.simulator import OverrunPolicy, Position, Rotation, Simulator, SpawnSpec, StandInSimulator
+
+
+@pytest.mark.asyncio
+async def test_controllers_share_one_state_read_per_tick():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10, overrun_policy=OverrunPolicy.BLOCK)
+        await sim.connect()
+        vehicles = await sim.spawn_many([SpawnSpec.uav(i, [i, 0, 0]) for i in range(50)])
+
+        calls = {}
+
+        async def controller(vehicle, sim):
+            position = await vehicle.local_position()
+            await vehicle.position_control(Position(position.x, 10.0, 1.0))
+            calls[vehicle.id()] = calls.get(vehicle.id(), 0) + 1
+
+        async def failing(vehicle, sim):
+            raise RuntimeError("broken controller")
+
+        for vehicle in vehicles:
+            sim.add_controller(vehicle, controller)
+        sim.add_controller(vehicles[0], failing)
+        assert len(sim.controlled_vehicles()) == 50
+
+        await asyncio.sleep(0.05)
+        start = sim.tick_stats().ticks
+        stand_in.rpc_counts.clear()
+        await asyncio.sleep(0.3)
+        await sim.disconnect()
+
+    ticks = sim.tick_stats().ticks - start
+    assert ticks > 2
+    # one failing controller does not stop the others
+    assert 0 not in calls and set(calls) == set(range(1, 50))
+    assert sim.tick_stats().errors >= ticks
+    # a single batched state read per tick, no per vehicle state RPC
+    state_reads = sum(n for key, n in stand_in.rpc_counts.items() if key.startswith("script.eval:") and "get_states" in key)
+    assert ticks - 1 <= state_reads <= ticks + 1
+    assert sum(n for key, n in stand_in.rpc_counts.items() if re.fullmatch(r"object_\d+\.state", key)) == 0
@@ -0,0 +1,90 @@
+import json
+import aiohttp
+import pytest
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.delta import ExecInputEncoder, decode_exec_inputs
+from intrepid_python_sdk.intrepid_types import Vec3
+from intrepid_python_sdk.protocol import ExecCommand
+
+
+def decode(data, annotation):
+    return annotation.model_validate(data) if annotation is Vec3 else data
+
+
+def test_encoder_marks_unchanged_inputs():
+    encoder = ExecInputEncoder()
+
+    first = encoder.encode(1, 0, [1.5, {"x": 1, "y": 2, "z": 3}])
+    assert first.unchanged is None
+    assert first.inputs == [1.5, {"x": 1, "y": 2, "z": 3}]
+
+    second = encoder.encode(2, 10, [2.5, {"x": 1, "y": 2, "z": 3}])
+    assert second.unchanged == [1]
+    assert second.inputs == [2.5, None]
+
+    encoder.reset()
+    third = encoder.encode(3, 20, [2.5, {"x": 1, "y": 2, "z": 3}])
+    assert third.unchanged is None
+
+
+def test_decoder_reuses_cached_values():
+    cache = []
+    encoder = ExecInputEncoder()
+    types = [float, Vec3]
+
+    first = decode_exec_inputs(encoder.encode(1, 0, [1.0, {"x": 1, "y": 2, "z": 3}]), types, cache, decode)
+    assert first == [1.0, Vec3(x=1, y=2, z=3)]
+
+    second = decode_exec_inputs(encoder.encode(2, 0, [2.0, {"x": 1, "y": 2, "z": 3}]), types, cache, decode)
+    assert second[0] == 2.0
+    assert second[1] is first[1]
+    assert cache == second
+
+
+def test_decoder_rejects_unchanged_without_cache():
+    command = ExecCommand(exec_id=1, time=0, inputs=[None], unchanged=[0])
+    with pytest.raises(ValueError):
+        decode_exec_inputs(command, [float], [], decode)
+
+
+@pytest.mark.asyncio
+async def test_node_server_delta_inputs():
+    received = []
+
+    def delta_target(scale: float, target: Vec3) -> float:
+        received.append(target)
+        return scale * target.x
+
+    runtime = Intrepid()
+    runtime.register_node(delta_target, name="test/delta_target")
+    port = await runtime.start_server("127.0.0.1", 0)
+
+    encoder = ExecInputEncoder()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{port}/") as ws:
+                await ws.send_str(json.dumps({
+                    "id": 1,
+                    "node": 1,
+                    "init": {
+                        "node_id": "delta",
+                        "node_type": "test/delta_target",
+                        "exec_inputs": [{"label": "", "exec_id": 0}],
+                        "exec_outputs": [{"label": "", "exec_id": 0}],
+                        "data_inputs": [{"label": "scale", "type": "f64"}, {"label": "target", "type": "vec3"}],
+                        "data_outputs": [{"label": "out", "type": "f64"}],
+                    },
+                }))
+                assert "init_ok" in json.loads((await ws.receive()).data)
+
+                outputs = []
+                for i, scale in enumerate([1.0, 2.0, 3.0]):
+                    command = encoder.encode(i, i, [scale, {"x": 2.0, "y": 0.0, "z": 0.0}])
+                    await ws.send_str(json.dumps({"id": 2 + i, "node": 1, "exec": command.model_dump(exclude_none=True)}))
+                    reply = json.loads((await ws.receive()).data)
+                    outputs.append(reply["exec_ok"]["outputs"][0])
+    finally:
+        await runtime.stop_server()
+
+    assert outputs == [2.0, 4.0, 6.0]
+    assert received[0] is received[1] is received[2]
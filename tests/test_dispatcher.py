@@ -0,0 +1,146 @@
+import asyncio
+import threading
+from datetime import datetime
+import aiohttp
+import pytest
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.dispatcher import OutboundDispatcher, deserialize_batch
+from intrepid_python_sdk.message import IntrepidMessage, Opcode
+
+
+def write(recipient, priority, payload=None):
+    return IntrepidMessage(Opcode.WRITE, payload, datetime.now(), recipient, priority)
+
+
+def drain(dispatcher):
+    frames = []
+    while (frame := dispatcher.next_frame()) is not None:
+        frames.append([(message.recipient, message.priority) for message in deserialize_batch(frame)])
+    return frames
+
+
+def test_frames_are_ordered_by_priority_and_batched():
+    dispatcher = OutboundDispatcher()
+    dispatcher.submit(write("telemetry/a", 0))
+    dispatcher.submit(write("status", 5))
+    dispatcher.submit(write("telemetry/b", 0))
+    dispatcher.submit(write("status", 5))
+
+    assert drain(dispatcher) == [
+        [("status", 5), ("status", 5)],
+        [("telemetry/a", 0), ("telemetry/b", 0)],
+    ]
+
+
+def test_batch_size_is_bounded():
+    dispatcher = OutboundDispatcher(max_batch=2)
+    for i in range(5):
+        dispatcher.submit(write(f"t{i}", 0))
+    assert [len(frame) for frame in drain(dispatcher)] == [2, 2, 1]
+
+
+def test_low_priority_is_not_starved():
+    dispatcher = OutboundDispatcher(max_batch=1, starvation_limit=2)
+    dispatcher.submit(write("telemetry", 0))
+    for _ in range(4):
+        dispatcher.submit(write("status", 5))
+
+    order = [frame[0][0] for frame in drain(dispatcher)]
+    assert order == ["status", "status", "telemetry", "status", "status"]
+
+
+def test_control_priority_is_never_delayed():
+    dispatcher = OutboundDispatcher(max_batch=1, starvation_limit=1, control_priority=10)
+    dispatcher.submit(write("telemetry", 0))
+    for _ in range(3):
+        dispatcher.submit(write("control", 10))
+
+    order = [frame[0][0] for frame in drain(dispatcher)]
+    assert order == ["control", "control", "control", "telemetry"]
+
+
+def test_full_queue_drops_oldest():
+    dispatcher = OutboundDispatcher(max_queued=2)
+    for i in range(3):
+        dispatcher.submit(write(f"t{i}", 0))
+    assert dispatcher.dropped == 1
+    assert drain(dispatcher) == [[("t1", 0), ("t2", 0)]]
+
+
+@pytest.mark.asyncio
+async def test_node_server_sends_written_messages():
+    runtime = Intrepid()
+    port = await runtime.start_server("127.0.0.1", 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{port}/") as agent, \
+                    session.ws_connect(f"http://127.0.0.1:{port}/messages") as ws:
+                runtime.write("robot/throttle", 0.5, priority=10)
+                frame = await ws.receive_bytes(timeout=2)
+                # the node protocol socket only carries replies to its commands
+                with pytest.raises(asyncio.TimeoutError):
+                    await agent.receive(timeout=0.2)
+    finally:
+        await runtime.stop_server()
+
+    (message,) = deserialize_batch(frame)
+    assert message.opcode == Opcode.WRITE
+    assert message.recipient == "robot/throttle"
+    assert message.payload == 0.5
+    assert message.priority == 10
+
+
+def test_submit_from_other_threads():
+    dispatcher = OutboundDispatcher(max_queued=100_000)
+    errors = []
+
+    def produce(priority):
+        try:
+            for i in range(2_000):
+                dispatcher.submit(write(f"t{priority}/{i}", priority))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=produce, args=(priority,)) for priority in range(8)]
+    for thread in threads:
+        thread.start()
+    received = 0
+    while any(thread.is_alive() for thread in threads) or len(dispatcher):
+        frame = dispatcher.next_frame()
+        if frame is not None:
+            received += len(deserialize_batch(frame))
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert received == 8 * 2_000
+
+
+class FailingPeer:
+    closed = False
+
+    async def send_bytes(self, data):
+        raise ConnectionResetError("peer gone")
+
+
+class RecordingPeer:
+    closed = False
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+
+@pytest.mark.asyncio
+async def test_failing_peer_does_not_stop_the_broadcast():
+    runtime = Intrepid()
+    failing, healthy = FailingPeer(), RecordingPeer()
+    peers = runtime._Intrepid__peers
+    peers.update([failing, healthy])
+
+    await runtime._Intrepid__broadcast(b"frame")
+    assert healthy.frames == [b"frame"]
+    assert failing not in peers and healthy in peers
+    peers.clear()
@@ -0,0 +1,96 @@
+from contextlib import aclosing
+import pytest
+from intrepid_python_sdk.simulator import Endpoint, EpisodeRunner, Position, Rotation, StandInPool
+
+
+async def fly(sim, speed):
+    vehicle = await sim.spawn_uav(1, Position(0, 0, 0), Rotation(0, 0, 0))
+    await vehicle.set_position(speed, 0, 0)
+    for _ in range(5):
+        await sim.step()
+    return (await vehicle.local_position()).x
+
+
+@pytest.mark.asyncio
+async def test_episodes_spread_over_endpoints():
+    async with StandInPool(3, rpc_latency=0.005) as endpoints:
+        runner = EpisodeRunner(endpoints, fly, simulator_kwargs={"step_duration": 10, "lockstep": True})
+        results = await runner.run(range(12))
+
+    assert [r.index for r in results] == list(range(12))
+    assert all(r.ok() and r.attempts == 1 for r in results)
+    assert [r.value for r in results] == [float(i) for i in range(12)]
+    assert all(e.episodes >= 2 for e in endpoints)
+    assert sum(e.episodes for e in endpoints) == 12
+
+
+@pytest.mark.asyncio
+async def test_failed_instance_is_retired():
+    async with StandInPool(2) as endpoints:
+        # nothing listens on the third endpoint
+        dead = Endpoint("127.0.0.1", 1)
+        calls = []
+
+        async def episode(sim, params):
+            calls.append(params)
+            if params == 3 and calls.count(3) == 1:
+                raise ConnectionResetError("simulator went away")
+            return params * 2
+
+        runner = EpisodeRunner([*endpoints, dead], episode, connect_timeout=0.5, max_consecutive_failures=2)
+        results = [r async for r in runner.iterate(range(8))]
+
+    assert sorted(r.value for r in results) == [i * 2 for i in range(8)]
+    assert {r.index: r.attempts for r in results}[3] >= 2 and calls.count(3) == 2
+    assert dead.retired and dead.episodes == 0
+    assert not any(e.retired for e in endpoints)
+
+
+@pytest.mark.asyncio
+async def test_episode_errors_keep_the_endpoint():
+    async with StandInPool(1) as endpoints:
+        sims = set()
+
+        async def episode(sim, params):
+            sims.add(id(sim))
+            if params % 2:
+                raise ValueError("bad params")
+            return params
+
+        runner = EpisodeRunner(endpoints, episode, max_consecutive_failures=1)
+        results = await runner.run(range(6))
+
+    assert [r.value for r in results if r.ok()] == [0, 2, 4]
+    assert all(isinstance(r.error, ValueError) and r.attempts == 1 for r in results if not r.ok())
+    # no reconnection, no retirement
+    assert len(sims) == 1
+    (endpoint,) = endpoints
+    assert not endpoint.retired and endpoint.consecutive_failures == 0 and endpoint.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_all_endpoints_retired():
+    runner = EpisodeRunner([Endpoint("127.0.0.1", 1)], fly, connect_timeout=0.2, max_attempts=5, max_consecutive_failures=2)
+    results = await runner.run(range(3))
+    assert all(not r.ok() for r in results)
+    assert [r.index for r in results] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_early_exit_skips_remaining_episodes():
+    started = []
+
+    async def episode(sim, params):
+        started.append(params)
+        await sim.step()
+        return params
+
+    async with StandInPool(2, rpc_latency=0.01) as endpoints:
+        runner = EpisodeRunner(endpoints, episode, simulator_kwargs={"step_duration": 10, "lockstep": True})
+        async with aclosing(runner.iterate(range(20))) as results:
+            async for result in results:
+                assert result.ok()
+                break
+
+    # only the episodes already running when the consumer left
+    assert len(started) <= 2 * len(endpoints)
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import sys
+import types
+import pytest
+from intrepid_python_sdk.utils import new_event_loop
+
+
+def fake_uvloop(monkeypatch):
+    loop = asyncio.new_event_loop()
+    monkeypatch.setitem(sys.modules, "uvloop", types.SimpleNamespace(new_event_loop=lambda: loop))
+    return loop
+
+
+def test_asyncio_loop_ignores_uvloop(monkeypatch):
+    uvloop = fake_uvloop(monkeypatch)
+    loop = new_event_loop("asyncio")
+    try:
+        assert loop is not uvloop and isinstance(loop, asyncio.AbstractEventLoop)
+    finally:
+        loop.close()
+        uvloop.close()
+
+
+def test_uvloop_falls_back_with_a_warning(monkeypatch, caplog):
+    # a None entry makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    with caplog.at_level(logging.WARNING, logger="intrepid_python_sdk.utils"):
+        loop = new_event_loop("uvloop")
+    try:
+        assert isinstance(loop, asyncio.AbstractEventLoop)
+        assert "falling back" in caplog.text
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("kind", ["auto", None])
+def test_auto_prefers_uvloop(monkeypatch, caplog, kind):
+    uvloop = fake_uvloop(monkeypatch)
+    assert new_event_loop(kind) is uvloop
+    uvloop.close()
+
+    # silently the asyncio loop without uvloop
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    with caplog.at_level(logging.WARNING, logger="intrepid_python_sdk.utils"):
+        loop = new_event_loop(kind)
+    loop.close()
+    assert caplog.text == ""
+
+
+def test_unknown_kind_raises():
+    with pytest.raises(ValueError):
+        new_event_loop("trio")
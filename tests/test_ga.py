@@ -0,0 +1,85 @@
+import math
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+from intrepid_python_sdk import ga
+from intrepid_python_sdk.intrepid_types import Rotor3Array, Vec3Array
+
+
+# Scalar reference: Hamilton quaternions (w, x, y, z), rotor = (w, -x, -y, -z)
+def q_mul(a, b):
+    w1, x1, y1, z1 = a
+    w2, x2, y2, z2 = b
+    return (
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    )
+
+
+def q_rotate(q, v):
+    w, x, y, z = q_mul(q_mul(q, (0.0, *v)), (q[0], -q[1], -q[2], -q[3]))
+    return (x, y, z)
+
+
+def to_q(rotor):
+    return (rotor[0], -rotor[1], -rotor[2], -rotor[3])
+
+
+@pytest.fixture
+def rotors():
+    rng = np.random.default_rng(7)
+    q = rng.normal(size=(64, 4))
+    return ga.rotor_from_quaternion(q / np.linalg.norm(q, axis=1, keepdims=True))
+
+
+def test_rotor_mul_matches_scalar_reference(rotors):
+    other = rotors[::-1]
+    product = ga.rotor_mul(rotors, other)
+
+    assert isinstance(product, Rotor3Array)
+    for a, b, r in zip(rotors, other, product):
+        assert np.allclose(to_q(r), q_mul(to_q(a), to_q(b)))
+
+
+def test_rotate_matches_scalar_reference(rotors):
+    vectors = np.random.default_rng(3).normal(size=(len(rotors), 3))
+    rotated = ga.rotate(rotors, vectors)
+
+    assert isinstance(rotated, Vec3Array)
+    for r, v, out in zip(rotors, vectors, rotated):
+        assert np.allclose(out, q_rotate(to_q(r), v))
+    # product applies the right operand first
+    composed = ga.rotate(ga.rotor_mul(rotors[1], rotors[0]), vectors[0])
+    assert np.allclose(composed, ga.rotate(rotors[1], ga.rotate(rotors[0], vectors[0])))
+
+
+def test_rotor_from_bivector():
+    # quarter turn in the xy plane takes x to y
+    rotor = ga.rotor_from_bivector([0.0, 0.0, math.pi / 2])
+    assert np.allclose(ga.rotate(rotor, [1.0, 0.0, 0.0]), [0.0, 1.0, 0.0])
+    assert np.allclose(ga.rotor_from_bivector(np.zeros((2, 3))), [[1, 0, 0, 0]] * 2)
+
+    bivectors = np.random.default_rng(5).normal(size=(32, 3))
+    assert np.allclose(ga.rotor_to_bivector(ga.rotor_from_bivector(bivectors)), bivectors)
+
+
+def test_euler_and_quaternion_match_scipy(rotors):
+    angles = ga.rotor_to_euler(rotors)
+    reference = Rotation.from_quat(ga.rotor_to_quaternion(rotors), scalar_first=True)
+    assert np.allclose(angles, reference.as_euler("ZYX")[:, ::-1])
+
+    back = ga.rotor_from_euler(angles[:, 0], angles[:, 1], angles[:, 2])
+    assert np.allclose(np.abs(np.einsum("ij,ij->i", back, rotors)), 1.0)
+
+
+def test_slerp(rotors):
+    a, b = rotors[:32], rotors[32:]
+    assert np.allclose(ga.slerp(a, b, 0.0), a)
+    assert np.allclose(np.abs(np.einsum("ij,ij->i", ga.slerp(a, b, 1.0), b)), 1.0)
+
+    # halfway rotor is equidistant from both ends
+    half = ga.slerp(a, b, 0.5)
+    assert np.allclose(np.abs(np.einsum("ij,ij->i", half, a)), np.abs(np.einsum("ij,ij->i", half, b)))
+    assert np.allclose(ga.slerp(a[0], a[0], 0.3), a[0])
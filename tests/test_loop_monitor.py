@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+import aiohttp
+import pytest
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.loop_monitor import LoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_blocking_node_is_reported_on_the_route():
+    def slow(x: float) -> float:
+        time.sleep(0.3)
+        return x
+
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.1)
+    runtime = Intrepid(loop_monitor=monitor)
+    runtime.register_node(slow, name="test/slow")
+    port = await runtime.start_server("127.0.0.1", 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{port}/") as ws:
+                await ws.send_str(json.dumps({
+                    "id": 1,
+                    "node": 1,
+                    "init": {
+                        "node_id": "slow",
+                        "node_type": "test/slow",
+                        "exec_inputs": [{"label": "", "exec_id": 0}],
+                        "exec_outputs": [{"label": "", "exec_id": 0}],
+                        "data_inputs": [{"label": "x", "type": "f64"}],
+                        "data_outputs": [{"label": "out", "type": "f64"}],
+                    },
+                }))
+                assert "init_ok" in json.loads((await ws.receive()).data)
+                await ws.send_str(json.dumps({"id": 2, "node": 1, "exec": {"exec_id": 0, "time": 0, "inputs": [1.0]}}))
+                assert "exec_ok" in json.loads((await ws.receive()).data)
+
+            # the stall is recorded on the first beat after the loop is free again
+            await asyncio.sleep(0.1)
+            async with session.get(f"http://127.0.0.1:{port}/loop_lag") as response:
+                stats = await response.json()
+    finally:
+        await runtime.stop_server()
+
+    assert stats["stalls"] >= 1 and stats["max_lag"] >= 0.1
+    assert stats["by_node"]["test/slow"]["stalls"] >= 1
+    assert stats["by_node"]["test/slow"]["last_exec_id"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lag_below_threshold_is_not_a_stall():
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.3)
+    monitor.start()
+    try:
+        with monitor.running("test/short", 4):
+            time.sleep(0.05)
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["samples"] > 0 and stats["max_lag"] > 0.0
+    assert stats["stalls"] == 0 and stats["by_node"] == {}
+
+
+@pytest.mark.asyncio
+async def test_stop_joins_the_watchdog_and_cancels_the_beat():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+    monitor.start()
+    thread = monitor._LoopLagMonitor__thread
+    task = monitor._LoopLagMonitor__task
+    await asyncio.sleep(0.03)
+    assert thread.is_alive() and not task.done()
+
+    monitor.stop()
+    assert not thread.is_alive()
+    await asyncio.sleep(0)
+    assert task.cancelled()
+
+    with pytest.raises(ValueError):
+        LoopLagMonitor(interval=0)
@@ -0,0 +1,114 @@
+import itertools
+import re
+import shutil
+import subprocess
+import pytest
+from intrepid_python_sdk.simulator import simulator
+from intrepid_python_sdk.simulator.scripts import CALL_SCRIPT, LuaScript
+
+try:
+    import lupa
+except ImportError:
+    lupa = None
+
+LUAC = shutil.which("luac")
+
+SCRIPTS = [value for value in vars(simulator).values() if isinstance(value, LuaScript)] + [
+    simulator._abstract_sensor_script(*flags) for flags in itertools.product((False, True), repeat=6)
+]
+
+# stand-in for the simulator Lua API, see simulator.LUA_API
+FAKE_SIM = """
+sim = {
+    map = {
+        find_all = function(query) return { { entity = "v1", group = "vehicle" } } end,
+        spawn_uav = function(params) return "uav" .. params.robot_id end,
+        spawn_ugv = function(params) return "ugv" .. params.robot_id end,
+        spawn = function(params) error("no mesh " .. params.mesh) end,
+        spawn_road = function(params) return nil end,
+        spawn_goal = function(params) return "goal" end,
+    },
+    object = {
+        position = function(entity) return { x = 1, y = 2, z = 3 } end,
+        gps_position = function(entity) return nil end,
+        rotation_angles = function(entity) return { yz = 0, zx = 0, xy = 1 } end,
+        linear_velocity = function(entity) return { x = 4, y = 0, z = 0 } end,
+        angular_velocity = function(entity) return { x = 0, y = 0, z = 0 } end,
+        acceleration = function(entity) return { x = 0, y = 0, z = 0 } end,
+        get_robot_id = function(entity) return 7 end,
+        request_image = function(camera) return { data = "image of " .. camera } end,
+    },
+}
+"""
+
+
+def check_syntax(source: str):
+    if lupa is not None:
+        lupa.LuaRuntime().compile(source)
+    else:
+        subprocess.run([LUAC, "-p", "-"], input=source.encode(), check=True, capture_output=True)
+
+
+def evaluate(lua, source: str, args):
+    """
+    Evaluate a script source the way script.eval does, with the arguments in ARGS.
+    """
+    lua.globals().ARGS = lua.table_from(args, recursive=True) if isinstance(args, (list, dict)) else args
+    return lua.execute(source)
+
+
+@pytest.mark.skipif(lupa is None and LUAC is None, reason="needs lupa or luac")
+@pytest.mark.parametrize("script", SCRIPTS, ids=lambda script: script.name)
+def test_scripts_compile(script):
+    check_syntax(script.source)
+    check_syntax(script.install_source)
+
+
+@pytest.mark.skipif(lupa is None and LUAC is None, reason="needs lupa or luac")
+def test_call_script_compiles():
+    check_syntax(CALL_SCRIPT)
+
+
+def test_scripts_only_use_documented_api():
+    used = set()
+    for script in SCRIPTS:
+        used.update(re.findall(r"\bsim\.\w+\.\w+", script.body))
+    assert used <= simulator.LUA_API.keys()
+
+
+@pytest.mark.skipif(lupa is None, reason="needs lupa")
+def test_prepared_scripts_run():
+    lua = lupa.LuaRuntime()
+    lua.execute(FAKE_SIM)
+    script = simulator.GET_STATES_SCRIPT
+    args = {"entities": ["v1", "v2"], "fields": ["local_position", "global_position", "lin_vel"]}
+
+    # CALL_SCRIPT reports the missing function, the install source defines and calls it
+    assert evaluate(lua, CALL_SCRIPT, {"name": script.name, "args": args}).missing
+    installed = evaluate(lua, script.install_source, args).result
+    called = evaluate(lua, CALL_SCRIPT, {"name": script.name, "args": args}).result
+    for states in (installed, called):
+        assert states[2].local_position.y == 2 and states[2].lin_vel.x == 4
+        assert states[1].global_position is None
+
+    assert evaluate(lua, simulator.FIND_VEHICLES_SCRIPT.source, None)[1].id == 7
+    images = evaluate(lua, simulator.CAPTURE_ALL_SCRIPT.source, ["cam1", "cam2"])
+    assert list(images.values()) == ["image of cam1", "image of cam2"]
+
+
+@pytest.mark.skipif(lupa is None, reason="needs lupa")
+def test_spawn_many_reports_failed_spawns():
+    lua = lupa.LuaRuntime()
+    lua.execute(FAKE_SIM)
+    specs = [spec.to_dict() for spec in (
+        simulator.SpawnSpec.uav(1, [0, 0, 0]),
+        simulator.SpawnSpec("obstacle", {"mesh": "rock"}),
+        simulator.SpawnSpec("road", {"src": {"x": 0, "y": 0}, "dst": {"x": 1, "y": 0}}),
+        simulator.SpawnSpec("goal", {"position": {"x": 0, "y": 0, "z": 0}, "radius": 1, "height": 2}),
+    )]
+    result = evaluate(lua, simulator.SPAWN_MANY_SCRIPT.source, specs)
+
+    assert result[1] == "uav1"
+    assert "no mesh rock" in result[2].error
+    assert result[3] is False
+    assert result[4] == "goal"
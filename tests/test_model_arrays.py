@@ -0,0 +1,97 @@
+import json
+import aiohttp
+import numpy as np
+import pytest
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.binary_codec import pack_frame, unpack_frame
+from intrepid_python_sdk.intrepid_types import TYPE_MAP, Rotor3, Rotor3Array, Vec3, Vec3Array
+
+
+def test_vec3_array_wire_roundtrip():
+    points = Vec3Array.from_wire([{"x": 1, "y": 2, "z": 3}, {"x": 4, "y": 5, "z": 6}])
+
+    assert points.shape == (2, 3)
+    assert points.y.tolist() == [2.0, 5.0]
+    assert points.to_wire() == [{"x": 1.0, "y": 2.0, "z": 3.0}, {"x": 4.0, "y": 5.0, "z": 6.0}]
+    assert isinstance(points * 2, Vec3Array)
+    assert np.array_equal(Vec3Array.from_buffer(points.to_buffer()), points)
+
+
+
+def test_vec3_array_rows_and_reductions_are_plain_arrays():
+    points = Vec3Array([[1, 2, 3], [4, 5, 6]])
+
+    row = points[0]
+    assert type(row) is np.ndarray and row.tolist() == [1.0, 2.0, 3.0]
+    assert type(points[:, 0]) is np.ndarray
+    assert type(points[0, 1]) is np.float64
+    assert isinstance(points[1:], Vec3Array) and points[1:].x.tolist() == [4.0]
+
+    total = points.sum(axis=0)
+    assert type(total) is np.ndarray and total.tolist() == [5.0, 7.0, 9.0]
+    assert type(points.mean(axis=1)) is np.ndarray
+    assert points.sum() == 21.0 and np.ndim(points.sum()) == 0
+    assert isinstance(points - points.mean(axis=0), Vec3Array)
+
+def test_rotor3_array_models():
+    rotors = [Rotor3(s=1, yz=0, zx=0, xy=0), Rotor3(s=0, yz=1, zx=0, xy=0)]
+    array = Rotor3Array.from_models(rotors)
+
+    assert array.s.tolist() == [1.0, 0.0]
+    assert array.to_models() == rotors
+    assert Rotor3Array().shape == (0, 4)
+
+
+def test_array_types_share_wire_names():
+    assert TYPE_MAP[Vec3Array] == TYPE_MAP[Vec3] == "vec3"
+    assert TYPE_MAP[Rotor3Array] == TYPE_MAP[Rotor3] == "rotor3"
+    with pytest.raises(ValueError):
+        Vec3Array(np.zeros((2, 4)))
+
+
+@pytest.mark.asyncio
+async def test_node_server_vec3_array_pins():
+    def translate(points: Vec3Array, offset: Vec3) -> Vec3Array:
+        return points + [offset.x, offset.y, offset.z]
+
+    runtime = Intrepid()
+    runtime.register_node(translate, name="test/translate")
+    spec = runtime.all_nodes["test/translate"].spec
+    assert spec.inputs[1].container.value == "array"
+    assert spec.inputs[1].type.data_type == "vec3"
+
+    port = await runtime.start_server("127.0.0.1", 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{port}/") as ws:
+                await ws.send_str(json.dumps({
+                    "id": 1,
+                    "node": 1,
+                    "init": {
+                        "node_id": "translate",
+                        "node_type": "test/translate",
+                        "exec_inputs": [{"label": "", "exec_id": 0}],
+                        "exec_outputs": [{"label": "", "exec_id": 0}],
+                        "data_inputs": [{"label": "points", "type": "vec3"}, {"label": "offset", "type": "vec3"}],
+                        "data_outputs": [{"label": "out", "type": "vec3"}],
+                    },
+                }))
+                assert "init_ok" in json.loads((await ws.receive()).data)
+
+                offset = {"x": 1.0, "y": 0.0, "z": 0.0}
+                await ws.send_str(json.dumps({"id": 2, "node": 1, "exec": {
+                    "exec_id": 0, "time": 0, "inputs": [[{"x": 0.0, "y": 1.0, "z": 2.0}], offset],
+                }}))
+                reply = json.loads((await ws.receive()).data)
+                assert reply["exec_ok"]["outputs"] == [[{"x": 1.0, "y": 1.0, "z": 2.0}]]
+
+                points = Vec3Array(np.arange(30.0).reshape(10, 3))
+                header = json.dumps({"id": 3, "node": 1, "exec": {
+                    "exec_id": 0, "time": 0, "inputs": [{"$buffer": 0}, offset],
+                }})
+                await ws.send_bytes(pack_frame(header, [points.to_buffer()]))
+                header, buffers = unpack_frame((await ws.receive()).data)
+                assert json.loads(header)["exec_ok"]["outputs"] == [{"$buffer": 0}]
+                assert np.array_equal(Vec3Array.from_buffer(buffers[0]), points + [1.0, 0.0, 0.0])
+    finally:
+        await runtime.stop_server()
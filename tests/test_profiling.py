@@ -0,0 +1,123 @@
+import asyncio
+import functools
+import os
+import signal
+import time
+import aiohttp
+import pytest
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.profiling import NodeProfiler
+
+
+def busy(x):
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        x += 1
+    return x
+
+
+class Scaler:
+    def __call__(self, x):
+        return 2 * x
+
+
+def test_watch_accepts_any_callable():
+    profiler = NodeProfiler("sampling", signum=None)
+    profiler.watch("partial", functools.partial(busy, 1))
+    profiler.watch("object", Scaler())
+    profiler.watch("busy", busy)
+
+
+@pytest.mark.asyncio
+async def test_sampling_attributes_stacks_to_node_types(tmp_path):
+    profiler = NodeProfiler("sampling", interval=0.001, output_dir=str(tmp_path), signum=None)
+    profiler.watch("busy", busy)
+    profiler.start()
+    try:
+        assert await profiler.run("busy", busy, [0]) > 0
+    finally:
+        profiler.stop()
+
+    assert profiler.calls["busy"] == 1
+    assert profiler.node_types() == ["busy"]
+    assert all(line.startswith("busy;") for line in profiler.collapsed("busy").splitlines())
+    (path,) = profiler.dump()
+    assert path == os.path.join(str(tmp_path), "busy.collapsed")
+
+
+@pytest.mark.asyncio
+async def test_cprofile_report_and_dump(tmp_path):
+    profiler = NodeProfiler("cprofile", sample_rate=1.0, output_dir=str(tmp_path), signum=None)
+    await profiler.run("scaler", Scaler(), [3])
+    await profiler.run("scaler", Scaler(), [4])
+    assert profiler.profiled_calls["scaler"] == 2
+    assert "__call__" in profiler.report("scaler")
+    assert [os.path.basename(p) for p in profiler.dump()] == ["scaler.pstats"]
+
+
+
+def other_task_work():
+    return busy(0)
+
+
+@pytest.mark.asyncio
+async def test_cprofile_async_node_excludes_other_tasks():
+    async def waiting(x):
+        await asyncio.sleep(0.01)
+        return x + 1
+
+    async def other():
+        await asyncio.sleep(0)
+        other_task_work()
+
+    profiler = NodeProfiler("cprofile", sample_rate=1.0, signum=None)
+    task = asyncio.create_task(other())
+    assert await profiler.run("waiting", waiting, [1]) == 2
+    await task
+
+    report = profiler.report("waiting")
+    assert "waiting" in report
+    assert "other_task_work" not in report
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        await profiler.run("failing", failing, [])
+    assert profiler.profiled_calls["failing"] == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_route_dumps_on_post(tmp_path):
+    profiler = NodeProfiler("cprofile", sample_rate=1.0, output_dir=str(tmp_path), signum=None)
+    await profiler.run("scaler", Scaler(), [3])
+    runtime = Intrepid(profile=profiler)
+    port = await runtime.start_server("127.0.0.1", 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/profile") as response:
+                assert await response.json() == {"node_types": ["scaler"]}
+            assert not os.path.exists(tmp_path / "scaler.pstats")
+
+            async with session.post(f"http://127.0.0.1:{port}/profile") as response:
+                assert await response.json() == {"files": [os.path.join(str(tmp_path), "scaler.pstats")]}
+            assert os.path.exists(tmp_path / "scaler.pstats")
+    finally:
+        await runtime.stop_server()
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 not available")
+@pytest.mark.asyncio
+async def test_signal_dumps_outside_the_handler(tmp_path):
+    profiler = NodeProfiler("cprofile", sample_rate=1.0, output_dir=str(tmp_path), signum=signal.SIGUSR1)
+    profiler.start()
+    try:
+        await profiler.run("busy", busy, [0])
+        os.kill(os.getpid(), signal.SIGUSR1)
+        for _ in range(100):
+            if os.path.exists(tmp_path / "busy.pstats"):
+                break
+            await asyncio.sleep(0.01)
+        assert os.path.exists(tmp_path / "busy.pstats")
+    finally:
+        profiler.stop()
@@ -0,0 +1,55 @@
+import pytest
+from intrepid_python_sdk.simulator import Position, Rotation, Simulator, StandInSimulator
+
+
+@pytest.mark.asyncio
+async def test_get_vehicle_uses_registry():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        stand_in.add_entity("vehicle", robot_id=7)
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+
+        spawned = [await sim.spawn_uav(i, Position(i, 0, 0), Rotation()) for i in range(5)]
+        assert sim.num_vehicles() == 5
+        stand_in.rpc_counts.clear()
+
+        for vehicle in spawned:
+            assert await sim.get_vehicle(vehicle.id()) is vehicle
+        assert sum(stand_in.rpc_counts.values()) == 0
+
+        # unknown ids refresh the registry once
+        external = await sim.get_vehicle(7)
+        assert external is not None and external.id() == 7
+        assert stand_in.rpc_counts["script.eval:find_vehicles"] == 1
+        assert sim.num_vehicles() == 6
+
+        await spawned[0].despawn()
+        assert sim.num_vehicles() == 5
+        assert sim.num_entities() == 5
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_get_entities_fills_registry():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        for i in range(3):
+            stand_in.add_entity("obstacle", position=(i, 0, 0))
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+
+        vehicle = await sim.spawn_ugv(1, Position(), Rotation())
+        entities = await sim.get_entities()
+        assert sim.num_entities() == 4
+        assert vehicle in entities
+
+        stand_in.entities.pop(entities[0].entity())
+        await sim.get_entities()
+        assert sim.num_entities() == 3
+
+        await sim.reset()
+        assert sim.num_entities() == 0
+
+        await sim.disconnect()
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from intrepid_python_sdk.simulator import Position, Rotation, Simulator, StandInSimulator
+from intrepid_python_sdk.simulator.scripts import CALL_SCRIPT, LuaScript
+
+
+def test_script_sources():
+    script = LuaScript("answer", "return ARGS.x * 2")
+    assert script.source.startswith("-- intrepid:answer\n")
+    assert '_INTREPID["answer"] = function(ARGS)' in script.install_source
+    assert len(CALL_SCRIPT) < len(script.install_source)
+
+
+@pytest.mark.asyncio
+async def test_prepared_scripts_are_called_by_name():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        stand_in.register_script("answer", lambda args: args["x"] * 2)
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        client = sim.client()
+        script = LuaScript("answer", "return ARGS.x * 2")
+
+        assert [await client.run_script(script, {"x": i}) for i in range(3)] == [0, 2, 4]
+        assert stand_in.rpc_counts["script.eval:answer"] == 1
+        assert stand_in.rpc_counts["script.eval:call:answer"] == 2
+
+        # lost functions are installed again
+        stand_in.forget_scripts()
+        assert await client.run_script(script, {"x": 5}) == 10
+        assert stand_in.rpc_counts["script.eval:answer"] == 2
+        assert client.scripts().prepared
+
+        # a simulator that never keeps them gets full scripts
+        for i in range(4):
+            stand_in.forget_scripts()
+            assert await client.run_script(script, {"x": i}) == 2 * i
+        assert not client.scripts().prepared
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_abstract_sensor_uses_prepared_script():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        stand_in.add_entity("obstacle", position=(3, 0, 0))
+        stand_in.add_entity("obstacle", position=(30, 0, 0))
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        vehicle = await sim.spawn_uav(1, Position(), Rotation())
+        sensor = vehicle.spawn_abstract_sensor(radius=10.0, groups=["obstacle"])
+
+        for _ in range(3):
+            found = await sensor.capture(rotation=False)
+            assert [e["position"]["x"] for e in found.values()] == [3.0]
+        assert stand_in.rpc_counts["script.eval:abstract_sensor.10111"] == 1
+        assert stand_in.rpc_counts["script.eval:call:abstract_sensor.10111"] == 2
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_abstract_sensor_columnar_capture():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        for x in (3, 5, 30):
+            stand_in.add_entity("obstacle", position=(x, 1, 0))
+        stand_in.add_entity("vehicle", position=(0, 4, 0), robot_id=9)
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        vehicle = await sim.spawn_uav(1, Position(), Rotation())
+        sensor = vehicle.spawn_abstract_sensor(radius=10.0, groups=["obstacle", "vehicle"])
+
+        detections = await sensor.capture_arrays()
+        assert len(detections) == 3
+        assert list(detections.group) == ["obstacle", "obstacle", "vehicle"]
+        assert np.allclose(detections.position, [[3, 1, 0], [5, 1, 0], [0, 4, 0]])
+        assert np.allclose(detections.bbox_max - detections.bbox_min, 1.0)
+        assert np.allclose(detections.bsphere_center, detections.position)
+        assert list(detections.robot_id) == [-1, -1, 9]
+
+        obstacles = detections.mask(detections.group == "obstacle")
+        assert len(obstacles) == 2 and obstacles.position.shape == (2, 3)
+        assert dict(zip(detections.entity, detections.position[:, 0])) == {
+            e: found["position"]["x"] for e, found in (await sensor.capture()).items()
+        }
+
+        sensor = vehicle.spawn_abstract_sensor(radius=1.0, groups=["obstacle"])
+        empty = await sensor.capture_arrays(rotation=False)
+        assert len(empty) == 0 and empty.position.shape == (0, 3)
+
+        await sim.disconnect()
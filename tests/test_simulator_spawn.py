@@ -0,0 +1,80 @@
+import pytest
+from intrepid_python_sdk.simulator import Entity, ObstacleType, OBSTACLE_MESHES, Position, Rotation, \
+    Simulator, SpawnSpec, StandInSimulator, Vehicle, WorldEntity
+
+
+@pytest.mark.asyncio
+async def test_spawn_many_single_round_trip():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+
+        specs = []
+        for i in range(100):
+            specs.append(SpawnSpec.ugv(i, Position(i, 1, 0), Rotation(0, 0, 0)))
+            specs.append(SpawnSpec.road([i, 5], [i + 1, 5]))
+            specs.append(SpawnSpec.obstacle(ObstacleType.BUILDING2, [i, 7, 0]))
+        specs.append(SpawnSpec.goal(Position(0, 0, 10), radius=2.0))
+        stand_in.rpc_counts.clear()
+
+        handles = await sim.spawn_many(specs)
+        assert stand_in.rpc_counts["script.eval"] == 1
+        assert len(handles) == len(specs)
+
+        vehicles, roads, obstacles = handles[0:300:3], handles[1:300:3], handles[2:300:3]
+        assert all(isinstance(v, Vehicle) for v in vehicles)
+        assert [v.id() for v in vehicles] == list(range(100))
+        assert roads == [None] * 100
+        assert all(o.entity_type() == WorldEntity.OBSTACLE for o in obstacles)
+        assert handles[-1].entity_type() == WorldEntity.GOAL
+
+        assert sim.num_vehicles() == 100
+        assert await sim.get_vehicle(42) is vehicles[42]
+        assert stand_in.find(["obstacle"])[0].mesh == OBSTACLE_MESHES[ObstacleType.BUILDING2]
+
+        # batches are evaluated concurrently
+        stand_in.rpc_counts.clear()
+        handles = await sim.spawn_many([SpawnSpec.obstacle(ObstacleType.TREE1, [i, 0, 0]) for i in range(25)], batch_size=10)
+        assert stand_in.rpc_counts["script.eval"] == 3
+        assert len({h.entity() for h in handles}) == 25
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_spawn_entity_obstacle_types():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+
+        for obstacle_type in ObstacleType:
+            entity = await sim.spawn_entity(obstacle_type, Position(0, 0, 0), Rotation(0, 0, 0))
+            if obstacle_type in OBSTACLE_MESHES:
+                assert isinstance(entity, Entity) and entity.entity_type() == WorldEntity.OBSTACLE
+            else:
+                # no asset for this type
+                assert entity is None
+        assert [e.mesh for e in stand_in.find(["obstacle"])] == list(OBSTACLE_MESHES.values())
+        with pytest.raises(ValueError):
+            SpawnSpec.obstacle(ObstacleType.BENCH1, [0, 0, 0])
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_spawn_many_failed_item_does_not_abort_the_batch():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+
+        # robot id 1 is spawned twice, the simulator rejects the second one
+        handles = await sim.spawn_many([SpawnSpec.uav(1, [0, 0, 0]), SpawnSpec.uav(1, [1, 0, 0]),
+                                        SpawnSpec.obstacle(ObstacleType.TREE2, [2, 0, 0])])
+        assert isinstance(handles[0], Vehicle) and handles[1] is None
+        assert handles[2].entity_type() == WorldEntity.OBSTACLE
+        assert sim.num_vehicles() == 1
+
+        await sim.disconnect()
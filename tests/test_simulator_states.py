@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+from intrepid_python_sdk.intrepid_types import Vec3Array
+from intrepid_python_sdk.simulator import Position, Rotation, Simulator, StandInSimulator, TelemetryRecorder, \
+    read_telemetry
+
+
+@pytest.mark.asyncio
+async def test_get_states_single_rpc():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        stand_in.paused = True
+
+        vehicles = [await sim.spawn_uav(i, position=Position(i, 2 * i, 10), rotation=Rotation()) for i in range(40)]
+        stand_in.rpc_counts.clear()
+
+        states = await sim.get_states(vehicles, fields=("local_position", "lin_vel"))
+        assert stand_in.rpc_counts["script.eval"] == 1
+        assert list(states) == [v.entity() for v in vehicles]
+        assert states[vehicles[3].entity()]["local_position"] == {"x": 3.0, "y": 6.0, "z": 10.0}
+        assert set(states[vehicles[0].entity()]) == {"local_position", "lin_vel"}
+
+        arrays = await sim.get_states(vehicles, fields=("local_position", "rotation"), as_arrays=True)
+        assert isinstance(arrays["local_position"], Vec3Array)
+        assert arrays["local_position"].shape == (40, 3)
+        assert np.array_equal(arrays["local_position"].y, 2.0 * np.arange(40))
+        assert arrays["rotation"].shape == (40, 3)
+
+        # single entity reads go through the same script
+        position = await vehicles[5].local_position()
+        assert (position.x, position.y, position.z) == (5.0, 10.0, 10.0)
+
+        with pytest.raises(ValueError):
+            await sim.get_states(vehicles, fields=("altitude",))
+
+        await sim.disconnect()
+
+
+
+@pytest.mark.asyncio
+async def test_missing_state_fields_are_none(tmp_path):
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        stand_in.paused = True
+        vehicles = [await sim.spawn_uav(i, position=Position(i, 0, 0), rotation=Rotation()) for i in range(3)]
+        # no GPS: the simulator returns nil for the field
+        stand_in.vehicle(1).missing_fields.add("global_position")
+
+        assert await vehicles[1].global_position() is None
+        assert await vehicles[1].linear_velocity() == {"x": 0.0, "y": 0.0, "z": 0.0}
+        assert (await vehicles[1].local_position()).x == 1.0
+
+        states = await sim.get_states(vehicles, fields=("global_position",))
+        assert states[vehicles[1].entity()]["global_position"] is None
+        arrays = await sim.get_states(vehicles, fields=("global_position",), as_arrays=True)
+        assert np.isnan(arrays["global_position"][1]).all()
+        assert not np.isnan(arrays["global_position"][[0, 2]]).any()
+
+        path = tmp_path / "run.npz"
+        with TelemetryRecorder(str(path), vehicles, fields=("global_position",)) as recorder:
+            await recorder.capture(sim, tick=0)
+        telemetry = read_telemetry(str(path))
+        assert np.isnan(telemetry.vehicle(1)["global_position"]).all()
+        assert not np.isnan(telemetry.vehicle(2)["global_position"]).any()
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_state_cache_is_tick_scoped():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        stand_in.paused = True
+        vehicle = await sim.spawn_uav(1, position=Position(1, 2, 3), rotation=Rotation())
+        client = sim.client()
+        client.set_tick(1_000)
+        stand_in.rpc_counts.clear()
+
+        await vehicle.local_position()
+        await vehicle.rotation()
+        await vehicle.linear_velocity()
+        assert stand_in.rpc_counts["script.eval"] == 1
+        assert client.cache_stats()["hits"] == 2
+
+        # the next tick invalidates the snapshot
+        stand_in.vehicle(1).position[:] = [4, 5, 6]
+        client.set_tick(2_000)
+        position = await vehicle.local_position()
+        assert (position.x, position.y, position.z) == (4.0, 5.0, 6.0)
+        assert stand_in.rpc_counts["script.eval"] == 2
+        assert client.cache_stats()["misses"] == 2
+
+        # duplicates count once, whether missed or hit
+        other = await sim.spawn_uav(2, position=Position(0, 0, 0), rotation=Rotation())
+        client.set_tick(3_000)
+        states = await client.get_states([vehicle.entity(), other.entity(), vehicle.entity()], ("local_position",))
+        assert states[0] == states[2] == {"local_position": {"x": 4.0, "y": 5.0, "z": 6.0}}
+        assert client.cache_stats()["misses"] == 4
+        await client.get_states([other.entity(), other.entity()], ("local_position",))
+        assert client.cache_stats()["hits"] == 3
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_the_state_cache():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+        stand_in.paused = True
+        vehicle = await sim.spawn_uav(1, position=Position(1, 2, 3), rotation=Rotation())
+        client = sim.client()
+        client.set_tick(1_000)
+
+        # cached states are copies
+        state = await vehicle.state()
+        state["local_position"]["x"] = 42.0
+        assert (await vehicle.local_position()).x == 1.0
+
+        # a write in the same tick is visible to the next read
+        await vehicle.set_position(9, 9, 9)
+        position = await vehicle.local_position()
+        assert (position.x, position.y, position.z) == (9.0, 9.0, 9.0)
+
+        await vehicle.set_rotation(0.1, 0.2, 0.3)
+        rotation = await vehicle.rotation()
+        assert (rotation.roll, rotation.pitch, rotation.yaw) == pytest.approx((0.1, 0.2, 0.3))
+
+        await vehicle.local_position()
+        stand_in.rpc_counts.clear()
+        await vehicle.position_control(Position(0, 0, 1))
+        await vehicle.local_position()
+        assert stand_in.rpc_counts["script.eval"] == 1
+        await sim.disconnect()
@@ -0,0 +1,68 @@
+import asyncio
+import numpy as np
+import pytest
+from intrepid_python_sdk.simulator import Position, Rotation, Simulator, StandInSimulator, Velocity
+
+
+@pytest.mark.asyncio
+async def test_step_lockstep():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10, lockstep=True)
+        ticks = []
+
+        async def on_tick(sim):
+            ticks.append(sim._last_tick_received)
+
+        sim.sync(on_tick)
+        await sim.connect()
+        vehicle = await sim.spawn_uav(1, Position(0, 0, 0), Rotation(0, 0, 0))
+        await vehicle.velocity_control(0.0, Velocity(2.0, 0.0, 0.0))
+
+        start = stand_in.tick
+        for i in range(1, 21):
+            assert await sim.step() == start + i * 10_000
+            assert stand_in.tick == start + i * 10_000
+        assert await sim.step(5_000) == start + 205_000
+
+        # 0.205 s at 2 m/s, no callback ran while stepping
+        position = await vehicle.local_position()
+        assert np.isclose(position.x, 0.41)
+        assert ticks == []
+
+        stand_in.paused = True
+        with pytest.raises(asyncio.TimeoutError):
+            await sim.step(timeout=0.1)
+
+        # back to the sync loop
+        stand_in.paused = False
+        sim.set_lockstep(False)
+        await asyncio.sleep(0.1)
+        assert len(ticks) > 1
+
+        await sim.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_step_while_callback_runs():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10)
+        running = asyncio.Event()
+        calls = 0
+
+        async def on_tick(sim):
+            nonlocal calls
+            calls += 1
+            running.set()
+            await asyncio.sleep(0.1)
+
+        sim.sync(on_tick)
+        await sim.connect()
+        await running.wait()
+
+        # the running callback finishes, no further callback or sync publish follows
+        for _ in range(3):
+            reached = await sim.step()
+        await asyncio.sleep(0.2)
+        assert calls == 1
+        assert stand_in.tick == reached
+        await sim.disconnect()
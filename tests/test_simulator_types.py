@@ -0,0 +1,51 @@
+import math
+import numpy as np
+from intrepid_python_sdk.intrepid_types import Rotor3
+from intrepid_python_sdk.simulator import Position, Rotation, Velocity
+
+
+def test_vectors_are_slotted():
+    position = Position(1, 2, 3)
+    assert not hasattr(position, "__dict__")
+    assert isinstance(position + Position(1, 1, 1), Position)
+    assert isinstance(2 * Velocity(1, 0, 0), Velocity)
+
+
+def test_augmented_assignment_does_not_mutate_aliases():
+    position = Position(1, 2, 3)
+    alias = position
+    position += Position(1, 1, 1)
+    position *= 2
+    assert tuple(position) == (4, 6, 8)
+    assert position is not alias and tuple(alias) == (1, 2, 3)
+    assert isinstance(position, Position)
+
+    # explicit in place update
+    assert alias.set(0, 0, 1) is alias and tuple(alias) == (0, 0, 1)
+
+
+def test_batch_conversions():
+    positions = Position.from_array(np.arange(12.0).reshape(4, 3))
+    assert positions[1].to_dict() == {"x": 3.0, "y": 4.0, "z": 5.0}
+    assert Position.to_array(positions).tolist() == np.arange(12.0).reshape(4, 3).tolist()
+    assert Velocity.from_dict({"x": 1.0}).to_dict() == {"x": 1.0, "y": 0.0, "z": 0.0}
+
+
+def test_distance_helpers():
+    positions = [Position(0, 0, 0), Position(3, 4, 0)]
+    assert Position.distances(positions, Position(0, 0, 0)).tolist() == [0.0, 5.0]
+    matrix = Position.distance_matrix(positions, np.array([[0.0, 0.0, 0.0], [3.0, 4.0, 12.0]]))
+    assert matrix.tolist() == [[0.0, 13.0], [5.0, 12.0]]
+
+
+def test_rotation_rotor_roundtrip():
+    rotation = Rotation(roll=0.1, pitch=-0.2, yaw=0.3)
+    back = Rotation.from_rotor(rotation.to_rotor())
+    assert np.allclose([back.roll, back.pitch, back.yaw], [0.1, -0.2, 0.3])
+
+    # yaw only is a rotation in the xy plane
+    rotor = Rotation(yaw=math.pi / 2).to_rotor()
+    assert isinstance(rotor, Rotor3)
+    assert np.isclose(rotor.xy, -math.sin(math.pi / 4))
+    expected = rotation.to_rotor()
+    assert np.allclose(Rotation.to_rotors([rotation, rotation])[1], [expected.s, expected.yz, expected.zx, expected.xy])
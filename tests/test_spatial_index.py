@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from intrepid_python_sdk.simulator import ObstacleType, Position, Rotation, Simulator, SpatialIndex, StandInSimulator
+
+
+def brute_force(centers, radii, alive, center, radius):
+    distances = np.linalg.norm(centers - center, axis=1)
+    rows = np.flatnonzero(alive & (distances <= radius + radii))
+    return set(rows.tolist())
+
+
+def test_queries_match_brute_force():
+    rng = np.random.default_rng(11)
+    centers = rng.uniform(-100, 100, size=(2000, 3))
+    radii = rng.uniform(0, 3, size=2000)
+    groups = rng.choice(["obstacle", "tree"], size=2000)
+    alive = np.ones(2000, dtype=bool)
+
+    index = SpatialIndex()
+    index.insert_many([str(i) for i in range(1500)], centers[:1500], radii[:1500], groups[:1500])
+    index.rebuild()
+    # incremental changes, kept out of the tree until the next rebuild
+    index.insert_many([str(i) for i in range(1500, 1600)], centers[1500:1600], radii[1500:1600], groups[1500:1600])
+    alive[1600:] = False
+    for i in rng.choice(1600, size=100, replace=False):
+        assert index.remove(str(i))
+        alive[i] = False
+    assert len(index) == 1500 and index.rebuilds == 1
+
+    for center in rng.uniform(-100, 100, size=(20, 3)):
+        found = index.query_radius(center, 15.0)
+        assert {int(e) for e in found} == brute_force(centers, radii, alive, center, 15.0)
+
+        entities, distances = index.nearest(center, k=5, groups=["tree"], return_distance=True)
+        expected = np.flatnonzero(alive & (groups == "tree"))
+        expected = expected[np.argsort(np.linalg.norm(centers[expected] - center, axis=1))[:5]]
+        assert [int(e) for e in entities] == expected.tolist()
+        assert np.all(np.diff(distances) >= 0)
+
+    # enough changes trigger a rebuild on the next query
+    for i in range(1600, 2000):
+        index.insert(str(i), centers[i], radii[i], groups[i])
+    alive[1600:] = True
+    assert {int(e) for e in index.query_radius([0, 0, 0], 30.0)} == brute_force(centers, radii, alive, np.zeros(3), 30.0)
+    assert index.rebuilds == 2
+
+
+@pytest.mark.asyncio
+async def test_simulator_spatial_index():
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        for x in range(10):
+            stand_in.add_entity("obstacle", position=(x * 10, 0, 0))
+        stand_in.add_entity("vehicle", position=(0, 0, 0), robot_id=3)
+        sim = Simulator(stand_in.host, stand_in.port)
+        await sim.connect()
+
+        index = await sim.build_spatial_index()
+        assert len(index) == 10
+        stand_in.rpc_counts.clear()
+        near = index.query_radius([21, 0, 0], 2.0)
+        assert len(near) == 1 and stand_in.find(["obstacle"])[2].entity == near[0]
+        assert sum(stand_in.rpc_counts.values()) == 0
+
+        # spawns and despawns through the client update the index
+        tree = await sim.spawn_entity(ObstacleType.TREE1, Position(22, 0, 0), Rotation(0, 0, 0))
+        assert index.nearest([22.5, 0, 0]) == [tree.entity()]
+        await tree.despawn()
+        assert tree.entity() not in index
+        assert index.nearest([22.5, 0, 0]) == near
+
+        await sim.disconnect()
@@ -0,0 +1,68 @@
+import asyncio
+import numpy as np
+import pytest
+from intrepid_python_sdk.simulator import OverrunPolicy, Simulator, SpawnSpec, StandInSimulator, \
+    TelemetryRecorder, read_telemetry
+
+
+@pytest.mark.asyncio
+async def test_recorder_steps_in_chunks(tmp_path):
+    path = tmp_path / "run.npz"
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10, lockstep=True)
+        await sim.connect()
+        vehicles = await sim.spawn_many([SpawnSpec.uav(i, [i, 2 * i, 0]) for i in range(5)])
+        recorder = TelemetryRecorder(str(path), vehicles, fields=("local_position", "rotation"), chunk_size=8, dtype=np.float32)
+        sim.add_recorder(recorder)
+        ticks = [await sim.step() for _ in range(20)]
+        sim.remove_recorder(recorder)
+        await sim.step()
+        await sim.disconnect()
+    recorder.close()
+
+    telemetry = read_telemetry(str(path))
+    assert len(telemetry) == recorder.ticks == 20
+    assert telemetry.tick.tolist() == ticks
+    assert telemetry.entities == [v.entity() for v in vehicles]
+    assert telemetry.vehicle_ids.tolist() == list(range(5))
+    assert telemetry.fields["local_position"].shape == (20, 5, 3)
+    assert telemetry.fields["local_position"].dtype == np.float32
+    np.testing.assert_allclose(telemetry.vehicle(3)["local_position"], np.tile([3, 6, 0], (20, 1)))
+    np.testing.assert_allclose(telemetry.entity(vehicles[1])["rotation"], np.zeros((20, 3)))
+
+    only = read_telemetry(str(path), fields=["rotation"])
+    assert list(only.fields) == ["rotation"]
+    with pytest.raises(KeyError):
+        read_telemetry(str(path), fields=["lin_vel"])
+
+
+@pytest.mark.asyncio
+async def test_recorder_shares_the_state_read_with_controllers(tmp_path):
+    path = tmp_path / "run.npz"
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10, overrun_policy=OverrunPolicy.BLOCK)
+        await sim.connect()
+        vehicles = await sim.spawn_many([SpawnSpec.uav(i, [i, 0, 0]) for i in range(20)])
+
+        async def controller(vehicle, sim):
+            await vehicle.local_position()
+
+        with TelemetryRecorder(str(path), vehicles) as recorder:
+            sim.add_recorder(recorder)
+            for vehicle in vehicles:
+                sim.add_controller(vehicle, controller)
+            await asyncio.sleep(0.05)
+            start = sim.tick_stats().ticks
+            stand_in.rpc_counts.clear()
+            await asyncio.sleep(0.2)
+            await sim.disconnect()
+
+    ticks = sim.tick_stats().ticks - start
+    assert ticks > 2
+    state_reads = sum(n for key, n in stand_in.rpc_counts.items() if key.startswith("script.eval:") and "get_states" in key)
+    assert ticks - 1 <= state_reads <= ticks + 1
+
+    telemetry = read_telemetry(str(path))
+    assert len(telemetry) == recorder.ticks >= ticks
+    assert np.all(np.diff(telemetry.tick) > 0)
+    assert set(telemetry.fields) == {"global_position", "local_position", "rotation", "lin_vel", "ang_vel", "accel"}
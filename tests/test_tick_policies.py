@@ -0,0 +1,72 @@
+import asyncio
+import json
+import pytest
+from intrepid_python_sdk.simulator import OverrunPolicy, Simulator, StandInSimulator
+
+
+async def run_with_extra_ticks(policy):
+    """
+    Slow first callback while a free running simulator sends three more ticks.
+    """
+    async with StandInSimulator() as stand_in:
+        stand_in.paused = True
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10, overrun_policy=policy)
+        seen = []
+
+        async def on_tick(sim):
+            seen.append(sim._last_tick_received)
+            await sim.get_entities()
+            await asyncio.sleep(0.05)
+
+        sim.on_tick = on_tick
+        await sim.connect()
+        await asyncio.sleep(0.01)
+        for tick in (1_000, 2_000, 3_000):
+            await stand_in.publish("sync", tick)
+        await asyncio.sleep(0.15)
+        await sim.disconnect()
+        return seen, sim.tick_stats()
+
+
+@pytest.mark.asyncio
+async def test_skip_and_queue_latest():
+    seen, stats = await run_with_extra_ticks(OverrunPolicy.SKIP)
+    assert seen == [0]
+    assert stats.skipped == 3 and stats.ticks == 1
+
+    seen, stats = await run_with_extra_ticks(OverrunPolicy.QUEUE_LATEST)
+    assert seen == [0, 3_000]
+    assert stats.coalesced == 2 and stats.ticks == 2
+
+    samples = stats.samples()
+    assert list(samples["tick"]) == [0, 3_000]
+    assert all(samples["rpc_count"] == 1) and all(samples["rpc_ms"] > 0)
+    assert all(samples["callback_ms"] >= 50) and all(samples["slack_ms"] < 0)
+    assert stats.overruns == 2
+
+
+@pytest.mark.asyncio
+async def test_block_holds_simulator():
+    async with StandInSimulator() as stand_in:
+        sim = Simulator(stand_in.host, stand_in.port, step_duration=10, overrun_policy=OverrunPolicy.BLOCK)
+        held = []
+
+        async def on_tick(sim):
+            start = stand_in.tick
+            await asyncio.sleep(0.02)
+            held.append(stand_in.tick == start)
+
+        sim.on_tick = on_tick
+        await sim.connect()
+        await asyncio.sleep(0.3)
+        await sim.disconnect()
+
+    stats = sim.tick_stats()
+    assert len(held) > 3 and all(held)
+    assert stats.skipped == 0 and stats.blocked_ms >= 20 * (stats.ticks - 1)
+
+    summary = stats.summary()
+    assert summary["ticks"] == stats.ticks and summary["callback_ms"]["p50"] >= 20
+    counts, edges = stats.histogram("callback_ms")
+    assert counts.sum() == stats.ticks and len(edges) == len(counts) + 1
+    json.dumps(stats.to_dict())
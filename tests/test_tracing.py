@@ -0,0 +1,42 @@
+import json
+import aiohttp
+import pytest
+from intrepid_python_sdk import Intrepid
+from intrepid_python_sdk.tracing import Tracer
+
+
+def test_trace_file_is_a_json_array(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer(str(path), buffer_size=2)
+    tracer.name_connection(1, "connection 1")
+    for i in range(5):
+        frame = tracer.frame(1)
+        with frame.span("run"):
+            pass
+        frame.finish()
+    tracer.close()
+
+    events = json.loads(path.read_text())
+    assert len(events) == tracer.num_events == 11
+    assert all(event for event in events)
+    assert [event["name"] for event in events].count("frame") == 5
+
+
+@pytest.mark.asyncio
+async def test_frame_span_closed_when_handling_fails(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer(str(path))
+    runtime = Intrepid(tracer=tracer)
+    port = await runtime.start_server("127.0.0.1", 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(f"http://127.0.0.1:{port}/") as ws:
+                # not a valid command, the handler raises while parsing
+                await ws.send_str("not json")
+                await ws.receive(timeout=2)
+    finally:
+        await runtime.stop_server()
+    tracer.close()
+
+    names = [event["name"] for event in json.loads(path.read_text())]
+    assert "parse" in names and "frame" in names